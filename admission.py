@@ -0,0 +1,64 @@
+"""
+Venue capacity admission control.
+
+Event.headcount is the number of reserved seats. Seats are claimed with a
+single conditional UPDATE that only succeeds while the event still has room:
+
+    UPDATE events SET headcount = headcount + :seats
+    WHERE id = :event_id
+      AND (venue_capacity IS NULL OR headcount + :seats <= venue_capacity)
+
+The check and the increment happen in one statement under the row lock
+(MySQL/InnoDB) or the database write lock (SQLite). Two concurrent RSVPs
+therefore cannot both see the last free seats. counters.py calls this for
+every guest insert, guest_count change and move to another event. A failed
+reservation raises CapacityExceeded out of the flush, so the whole
+transaction rolls back.
+
+Lowering the capacity is the mirror image: set_capacity() updates
+venue_capacity only WHERE headcount <= :capacity, so a concurrent
+admission cannot slip in between the check and the change.
+"""
+
+from sqlalchemy import select, or_, true, update
+from models import Event
+
+
+class CapacityExceeded(Exception):
+    """Raised when reserving seats would take an event past its venue capacity"""
+
+    def __init__(self, event_id, requested, capacity, reserved):
+        self.event_id = event_id
+        self.requested = requested
+        self.capacity = capacity
+        self.reserved = reserved
+        super().__init__(
+            f'Adding {requested} guests would exceed venue capacity of {capacity}. '
+            f'Current guests: {reserved}'
+        )
+
+
+def has_room(seats):
+    """WHERE clause that holds only while `seats` more guests still fit"""
+    return or_(Event.venue_capacity.is_(None), Event.headcount + seats <= Event.venue_capacity)
+
+
+def fits_capacity(capacity):
+    """WHERE clause that holds while the seats already reserved fit in `capacity` (None: unlimited)"""
+    return true() if capacity is None else Event.headcount <= capacity
+
+
+def set_capacity(session, event_id, capacity):
+    """Change an event's venue capacity unless it would fall below its headcount; returns success"""
+    stmt = update(Event).where(Event.id == event_id, fits_capacity(capacity)).values(venue_capacity=capacity)
+    return session.execute(stmt, execution_options={'synchronize_session': False}).rowcount == 1
+
+
+def raise_capacity_exceeded(connection, event_id, seats):
+    """Explain a failed reservation; silently returns if the event does not exist"""
+    row = connection.execute(
+        select(Event.venue_capacity, Event.headcount).where(Event.id == event_id)
+    ).first()
+    if row is not None:
+        raise CapacityExceeded(event_id, seats, row.venue_capacity, row.headcount)
+
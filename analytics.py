@@ -0,0 +1,242 @@
+"""
+Booking spend analytics served from a rollup table.
+
+booking_rollups holds one row per (event, booking_type, status, month) with
+the number of bookings and their total cost. month is the booking date's
+month, or the creation month if the booking has no date. Session hooks keep
+it in step with booking writes:
+
+  before_flush   subtract the stored contribution of deleted and changed
+                 bookings, while the old values can still be loaded
+  after_flush    add the contribution of new and changed bookings, then
+                 write all deltas as upserts (INSERT ... ON CONFLICT /
+                 ON DUPLICATE KEY UPDATE), one per touched rollup row
+
+bulk.py applies the same deltas for set-based status and cost changes.
+Reports read only the rollups: the table grows with events x types x
+statuses x months, not with bookings. rebuild_rollups() recomputes it
+from scratch (flask rebuild-rollups).
+"""
+
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import case, delete, event, func, inspect, insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from models import db, Event, Booking, BookingRollup
+from counters import loaded_value
+
+COMMITTED_STATUSES = ('Confirmed', 'Paid')
+ROLLUP_ATTRIBUTES = ('event_id', 'booking_type', 'status', 'cost', 'booking_date', 'created_at')
+KEY_COLUMNS = ('event_id', 'booking_type', 'status', 'month')
+
+
+# ---- Incremental maintenance ----
+
+def booking_month(booking_date, created_at):
+    when = booking_date or created_at or datetime.utcnow()
+    return when.strftime('%Y-%m')
+
+
+def add_booking(deltas, values, sign=1):
+    """Accumulate one booking's signed contribution into {rollup key: [count, cost]}"""
+    if values['event_id'] is None:
+        return
+    key = (values['event_id'], values['booking_type'], values['status'] or 'Pending',
+           booking_month(values['booking_date'], values['created_at']))
+    row = deltas[key]
+    row[0] += sign
+    row[1] += sign * Decimal(str(values['cost'] or 0))
+
+
+def _upsert(dialect, key, count, cost):
+    values = dict(zip(KEY_COLUMNS, key), booking_count=count, cost_total=cost)
+    table = BookingRollup.__table__
+    increments = {'booking_count': table.c.booking_count + count,
+                  'cost_total': table.c.cost_total + cost}
+    if dialect == 'sqlite':
+        return sqlite_insert(table).values(**values).on_conflict_do_update(
+            index_elements=list(KEY_COLUMNS), set_=increments)
+    if dialect == 'mysql':
+        return mysql_insert(table).values(**values).on_duplicate_key_update(**increments)
+    return None
+
+
+def apply_rollup_deltas(connection, deltas):
+    """Write accumulated deltas, one upsert per rollup row, in key order"""
+    dialect = connection.dialect.name
+    for key, (count, cost) in sorted(deltas.items()):
+        if not count and not cost:
+            continue
+        stmt = _upsert(dialect, key, count, cost)
+        if stmt is not None:
+            connection.execute(stmt)
+            continue
+        table = BookingRollup.__table__
+        matched = connection.execute(
+            update(table)
+            .where(*[table.c[name] == value for name, value in zip(KEY_COLUMNS, key)])
+            .values(booking_count=table.c.booking_count + count, cost_total=table.c.cost_total + cost)
+        ).rowcount
+        if not matched:
+            connection.execute(insert(table).values(
+                **dict(zip(KEY_COLUMNS, key)), booking_count=count, cost_total=cost))
+
+
+def _is_rollup_change(obj):
+    state = inspect(obj)
+    if state.attrs.event.history.has_changes():
+        return True
+    return any(state.attrs[key].history.has_changes() for key in ROLLUP_ATTRIBUTES)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_rollup_changes(session, flush_context, instances):
+    deltas = session.info.setdefault('rollup_deltas', defaultdict(lambda: [0, Decimal('0')]))
+    pending = session.info.setdefault('rollup_pending', [])
+    deleted_events = session.info.setdefault('rollup_deleted_events', set())
+
+    for obj in session.deleted:
+        if isinstance(obj, Booking):
+            add_booking(deltas, {key: loaded_value(obj, key) for key in ROLLUP_ATTRIBUTES}, sign=-1)
+        elif isinstance(obj, Event) and obj.id is not None:
+            deleted_events.add(obj.id)
+
+    for obj in session.dirty:
+        if isinstance(obj, Booking) and _is_rollup_change(obj):
+            add_booking(deltas, {key: loaded_value(obj, key) for key in ROLLUP_ATTRIBUTES}, sign=-1)
+            pending.append(obj)
+
+    pending.extend(obj for obj in session.new if isinstance(obj, Booking))
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_rollup_changes(session, flush_context):
+    deltas = session.info.pop('rollup_deltas', None)
+    pending = session.info.pop('rollup_pending', [])
+    deleted_events = session.info.pop('rollup_deleted_events', set())
+    if deltas is None:
+        return
+    for obj in pending:
+        values = {key: getattr(obj, key) for key in ROLLUP_ATTRIBUTES}
+        if values['event_id'] is None and obj.event is not None:
+            values['event_id'] = obj.event.id
+        add_booking(deltas, values)
+
+    connection = session.connection()
+    if deleted_events:
+        # Their rollup rows go with them (ON DELETE CASCADE where foreign keys are enforced)
+        deltas = {key: row for key, row in deltas.items() if key[0] not in deleted_events}
+        connection.execute(delete(BookingRollup).where(BookingRollup.event_id.in_(deleted_events)))
+    if deltas:
+        apply_rollup_deltas(connection, deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_rollup_changes(session):
+    for key in ('rollup_deltas', 'rollup_pending', 'rollup_deleted_events'):
+        session.info.pop(key, None)
+
+
+def bulk_patch_deltas(rows, values):
+    """Rollup deltas for applying a bulk patch to already-selected booking rows"""
+    deltas = defaultdict(lambda: [0, Decimal('0')])
+    for row in rows:
+        old = {key: getattr(row, key) for key in ROLLUP_ATTRIBUTES}
+        add_booking(deltas, old, sign=-1)
+        add_booking(deltas, {**old, **{k: v for k, v in values.items() if k in ROLLUP_ATTRIBUTES}})
+    return deltas
+
+
+def rebuild_rollups(connection=None):
+    """Recompute booking_rollups from the bookings table (on `connection` if given, uncommitted)"""
+    commit = connection is None
+    connection = connection or db.session.connection()
+    when = func.coalesce(Booking.booking_date, Booking.created_at)
+    if connection.dialect.name == 'mysql':
+        month = func.date_format(when, '%Y-%m')
+    else:
+        month = func.strftime('%Y-%m', when)
+    status = func.coalesce(Booking.status, 'Pending')
+    grouped = (select(Booking.event_id, Booking.booking_type, status, month,
+                      func.count(Booking.id), func.coalesce(func.sum(Booking.cost), 0))
+               .group_by(Booking.event_id, Booking.booking_type, status, month))
+    connection.execute(delete(BookingRollup))
+    result = connection.execute(insert(BookingRollup).from_select(
+        list(KEY_COLUMNS) + ['booking_count', 'cost_total'], grouped))
+    if commit:
+        db.session.commit()
+    return result.rowcount
+
+
+# ---- Reports ----
+
+@dataclass
+class SpendBreakdown:
+    """Booking spend by type and by status, org-wide or for one event"""
+    by_type: dict = field(default_factory=dict)
+    by_status: dict = field(default_factory=dict)
+    bookings: int = 0
+
+    @property
+    def committed(self):
+        return sum(self.by_status.get(status, 0.0) for status in COMMITTED_STATUSES)
+
+    @property
+    def paid(self):
+        return self.by_status.get('Paid', 0.0)
+
+    @property
+    def planned(self):
+        return sum(cost for status, cost in self.by_status.items() if status != 'Cancelled')
+
+
+def spend_breakdown(event_id=None):
+    """SpendBreakdown from one grouped query over the rollups"""
+    stmt = (select(BookingRollup.booking_type, BookingRollup.status,
+                   func.sum(BookingRollup.booking_count), func.sum(BookingRollup.cost_total))
+            .group_by(BookingRollup.booking_type, BookingRollup.status))
+    if event_id is not None:
+        stmt = stmt.where(BookingRollup.event_id == event_id)
+    breakdown = SpendBreakdown()
+    for booking_type, status, count, cost in db.session.execute(stmt):
+        cost = float(cost or 0)
+        breakdown.bookings += int(count or 0)
+        breakdown.by_status[status] = breakdown.by_status.get(status, 0.0) + cost
+        if status != 'Cancelled':
+            breakdown.by_type[booking_type] = breakdown.by_type.get(booking_type, 0.0) + cost
+    return breakdown
+
+
+def _month_start(months_back, today=None):
+    today = today or date.today()
+    index = today.year * 12 + today.month - 1 - months_back
+    return f'{index // 12:04d}-{index % 12 + 1:02d}'
+
+
+def monthly_spend(months=12, today=None):
+    """[(YYYY-MM, planned, committed)] for the last `months` months, oldest first, gaps filled"""
+    committed = case((BookingRollup.status.in_(COMMITTED_STATUSES), BookingRollup.cost_total), else_=0)
+    planned = case((BookingRollup.status != 'Cancelled', BookingRollup.cost_total), else_=0)
+    first, last = _month_start(months - 1, today), _month_start(0, today)
+    rows = {month: (float(p or 0), float(c or 0)) for month, p, c in db.session.execute(
+        select(BookingRollup.month, func.sum(planned), func.sum(committed))
+        .where(BookingRollup.month.between(first, last))
+        .group_by(BookingRollup.month)
+    )}
+    series = []
+    for back in range(months - 1, -1, -1):
+        month = _month_start(back, today)
+        series.append((month, *rows.get(month, (0.0, 0.0))))
+    return series
+
+
+def committed_spend_column():
+    """Correlated scalar subquery: committed booking spend of the outer query's event"""
+    return (select(func.coalesce(func.sum(BookingRollup.cost_total), 0))
+            .where(BookingRollup.event_id == Event.id,
+                   BookingRollup.status.in_(COMMITTED_STATUSES))
+            .scalar_subquery())
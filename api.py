@@ -0,0 +1,309 @@
+"""
+Versioned JSON API (/api/v1) for events, guests and bookings.
+
+    GET /api/v1/<resource>                  keyset-paginated list, with the same
+                                            filters as the HTML list pages
+    GET /api/v1/<resource>?ids=1,2,3        batch fetch in one IN query
+    GET /api/v1/<resource>/<id>             single object
+    GET /api/v1/events/nearby?lat=&lon=&radius_km=
+                                            events within a radius, nearest first
+    GET /api/v1/events/nearest?lat=&lon=&k=  the k nearest events (see geo.py)
+    POST|PATCH /api/v1/<guests|bookings>/bulk
+                                            {"ids": [...], "patch": {...}} applied
+                                            as one set-based UPDATE (see bulk.py)
+
+Every endpoint accepts ?fields=a,b,c to return only some fields. Only those
+columns are SELECTed, and the parent event is joined in only when
+event_name is requested. Responses carry a weak ETag derived from the (id,
+updated_at) of the rows returned, and of their event when event_name is
+included. It names the data rather than the bytes, which differ between
+the identity and compressed encodings (responses.py), so it is weak. A
+matching If-None-Match gets a 304 without serializing anything.
+
+Rows are read as plain column tuples rather than ORM objects. Money
+columns are coerced to float in the SELECT, so no Decimal objects are
+built, and the payload is encoded with orjson when it is installed.
+orjson writes dates and times natively.
+"""
+
+import hashlib
+import json
+from datetime import date, datetime, time
+from flask import Blueprint, Response, current_app, request, session, abort
+from sqlalchemy import Float, select, type_coerce
+from werkzeug.exceptions import HTTPException
+from models import db, Event, Guest, Booking
+from pagination import list_filters, paginate
+from admission import CapacityExceeded
+from bulk import BulkUpdateError, bulk_update, parse_ids, parse_patch
+from geo import InvalidPoint, events_within, nearest_events
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+
+
+class Resource:
+    """Field map, sort key and filters for one API collection"""
+
+    def __init__(self, model, sort, fields, filters):
+        self.model = model
+        self.sort = sort
+        self.fields = fields
+        self.filters = filters
+        self.sort_fields = [column.key for column in sort]
+
+    def column(self, name):
+        expr = self.fields[name]
+        if isinstance(getattr(expr, 'type', None), db.Numeric):
+            expr = type_coerce(expr, Float)
+        return expr.label(name)
+
+    def _columns(self, names):
+        needed = list(dict.fromkeys(names + self.sort_fields + ['updated_at']))
+        columns = [self.column(n) for n in needed]
+        join_event = 'event_name' in needed
+        if join_event:
+            # A renamed event changes the body, so its updated_at goes into the ETag
+            columns.append(Event.updated_at.label('event_updated_at'))
+        return columns, join_event
+
+    def query(self, names):
+        """Projection query selecting only the named fields (plus sort/ETag keys)"""
+        columns, join_event = self._columns(names)
+        query = db.session.query(*columns).select_from(self.model)
+        if join_event:
+            query = query.outerjoin(Event, Event.id == self.model.event_id)
+        return query
+
+    def select(self, names):
+        """The same projection as a Core SELECT, for sessions without Model.query (asgi.py)"""
+        columns, join_event = self._columns(names)
+        statement = select(*columns).select_from(self.model)
+        if join_event:
+            statement = statement.outerjoin(Event, Event.id == self.model.event_id)
+        return statement
+
+
+RESOURCES = {
+    'events': Resource(
+        Event, (Event.event_date, Event.id),
+        {
+            'id': Event.id, 'name': Event.name, 'description': Event.description,
+            'event_date': Event.event_date, 'event_time': Event.event_time,
+            'location': Event.location, 'latitude': Event.latitude, 'longitude': Event.longitude,
+            'venue_capacity': Event.venue_capacity, 'budget': Event.budget, 'status': Event.status,
+            'guest_count': Event.guest_row_count, 'headcount': Event.headcount,
+            'booking_count': Event.booking_count, 'booking_cost_total': Event.booking_cost_total,
+            'created_at': Event.created_at, 'updated_at': Event.updated_at,
+        },
+        {'status': Event.status}
+    ),
+    'guests': Resource(
+        Guest, (Guest.created_at, Guest.id),
+        {
+            'id': Guest.id, 'event_id': Guest.event_id, 'event_name': Event.name,
+            'name': Guest.name, 'email': Guest.email, 'phone': Guest.phone,
+            'rsvp_status': Guest.rsvp_status, 'guest_count': Guest.guest_count,
+            'dietary_requirements': Guest.dietary_requirements,
+            'created_at': Guest.created_at, 'updated_at': Guest.updated_at,
+        },
+        {'event_id': Guest.event_id, 'rsvp_status': Guest.rsvp_status}
+    ),
+    'bookings': Resource(
+        Booking, (Booking.created_at, Booking.id),
+        {
+            'id': Booking.id, 'event_id': Booking.event_id, 'event_name': Event.name,
+            'booking_type': Booking.booking_type, 'vendor_name': Booking.vendor_name,
+            'description': Booking.description, 'cost': Booking.cost,
+            'booking_date': Booking.booking_date, 'status': Booking.status,
+            'contact_info': Booking.contact_info, 'notes': Booking.notes,
+            'created_at': Booking.created_at, 'updated_at': Booking.updated_at,
+        },
+        {'event_id': Booking.event_id, 'booking_type': Booking.booking_type, 'status': Booking.status}
+    ),
+}
+
+
+# ---- Encoding ----
+
+def _json_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    raise TypeError(f'Cannot serialize {type(value).__name__}')
+
+
+def encode_json(payload):
+    """Serialize to JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, default=_json_default, separators=(',', ':')).encode()
+
+
+def json_response(payload, status=200, etag=None):
+    body = b'' if status == 304 else encode_json(payload)
+    response = Response(body, status=status, mimetype='application/json')
+    if etag:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def rows_etag(rows, *extra):
+    """ETag over the identity and last-modified time of every row returned (and of its joined event)"""
+    digest = hashlib.sha1(repr(extra).encode())
+    for row in rows:
+        digest.update(f'{row.id}:{row.updated_at}:{getattr(row, "event_updated_at", "")}|'.encode())
+    return digest.hexdigest()
+
+
+def serialize_rows(rows, names):
+    return [{name: getattr(row, name) for name in names} for row in rows]
+
+
+def requested_fields(resource, args=None):
+    """Field names from ?fields=, defaulting to all; 400 on unknown names"""
+    raw = (request.args if args is None else args).get('fields')
+    if not raw:
+        return list(resource.fields)
+    names = [name.strip() for name in raw.split(',') if name.strip()]
+    unknown = [name for name in names if name not in resource.fields]
+    if unknown:
+        abort(400, description=f'Unknown fields: {", ".join(unknown)}')
+    return names
+
+
+def requested_ids(args=None):
+    try:
+        ids = [int(value) for value in (request.args if args is None else args)['ids'].split(',')
+               if value.strip()]
+    except ValueError:
+        abort(400, description='ids must be a comma-separated list of integers')
+    if len(ids) > 1000:
+        abort(400, description='At most 1000 ids per request')
+    return ids
+
+
+def not_modified(etag):
+    return request.if_none_match.contains_weak(etag)
+
+
+# ---- Routes ----
+
+@api.before_request
+def require_login():
+    if 'user_id' not in session:
+        abort(401)
+
+
+@api.errorhandler(HTTPException)
+def api_error(error):
+    return json_response({'error': error.name, 'message': error.description}, status=error.code)
+
+
+@api.route('/<any(events, guests, bookings):resource_name>')
+def list_resources(resource_name):
+    """List a collection, or batch-fetch by ?ids="""
+    resource = RESOURCES[resource_name]
+    names = requested_fields(resource)
+    query = resource.query(names)
+
+    if 'ids' in request.args:
+        rows = query.filter(resource.model.id.in_(requested_ids())).order_by(resource.model.id).all()
+        etag = rows_etag(rows, names)
+        if not_modified(etag):
+            return json_response(None, status=304, etag=etag)
+        return json_response({'data': serialize_rows(rows, names)}, etag=etag)
+
+    query, filters = list_filters(query, resource.filters)
+    page = paginate(query, resource.sort)
+    etag = rows_etag(page.items, names, page.next_cursor, page.prev_cursor)
+    if not_modified(etag):
+        return json_response(None, status=304, etag=etag)
+    return json_response({
+        'data': serialize_rows(page.items, names),
+        'next_cursor': page.next_cursor,
+        'prev_cursor': page.prev_cursor,
+    }, etag=etag)
+
+
+@api.route('/<any(events, guests, bookings):resource_name>/<int:id>')
+def get_resource(resource_name, id):
+    """Fetch one object by id"""
+    resource = RESOURCES[resource_name]
+    names = requested_fields(resource)
+    row = resource.query(names).filter(resource.model.id == id).first()
+    if row is None:
+        abort(404)
+    etag = rows_etag([row], names)
+    if not_modified(etag):
+        return json_response(None, status=304, etag=etag)
+    return json_response({'data': serialize_rows([row], names)[0]}, etag=etag)
+
+
+@api.route('/<any(guests, bookings):resource_name>/bulk', methods=['POST', 'PATCH'])
+def bulk_update_resources(resource_name):
+    """Apply one patch to many rows in a single transaction"""
+    model = RESOURCES[resource_name].model
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict):
+        abort(400, description='Expected a JSON object with "ids" and "patch"')
+    try:
+        ids = parse_ids(body.get('ids'))
+        values = parse_patch(model, body.get('patch'))
+    except BulkUpdateError as e:
+        abort(400, description=str(e))
+    try:
+        updated = bulk_update(model, ids, values)
+    except CapacityExceeded as e:
+        abort(409, description=str(e))
+    return json_response({'requested': len(ids), 'updated': updated})
+
+
+def distance_response(hits, names):
+    """Events in `hits` order, each with its distance_km"""
+    rows = []
+    if hits:
+        ids = [event_id for _, event_id in hits]
+        rows = RESOURCES['events'].query(names).filter(Event.id.in_(ids)).all()
+    by_id = {row.id: row for row in rows}
+    data = []
+    for distance, event_id in hits:
+        row = by_id.get(event_id)
+        if row is not None:
+            item = {name: getattr(row, name) for name in names}
+            item['distance_km'] = round(distance, 3)
+            data.append(item)
+    return json_response({'data': data})
+
+
+def result_limit(name, default):
+    value = request.args.get(name, type=int) or default
+    return max(1, min(value, current_app.config['MAX_PAGE_SIZE']))
+
+
+@api.route('/events/nearby')
+def events_nearby():
+    """Events within radius_km of a point, nearest first"""
+    names = requested_fields(RESOURCES['events'])
+    try:
+        hits = events_within(request.args.get('lat', type=float), request.args.get('lon', type=float),
+                             request.args.get('radius_km', type=float),
+                             limit=result_limit('limit', current_app.config['PAGE_SIZE']))
+    except InvalidPoint as e:
+        abort(400, description=str(e))
+    return distance_response(hits, names)
+
+
+@api.route('/events/nearest')
+def events_nearest():
+    """The k events nearest a point"""
+    names = requested_fields(RESOURCES['events'])
+    try:
+        hits = nearest_events(request.args.get('lat', type=float), request.args.get('lon', type=float),
+                              result_limit('k', 10))
+    except InvalidPoint as e:
+        abort(400, description=str(e))
+    return distance_response(hits, names)
@@ -0,0 +1,226 @@
+"""
+Async serving mode (ASGI).
+
+    uvicorn asgi:create_asgi_app --factory          # profile from DB_PROFILE
+    gunicorn -k uvicorn.workers.UvicornWorker "asgi:create_asgi_app('production')"
+
+The read endpoints that spend their time waiting on the database are
+served natively by async handlers on SQLAlchemy's async engine, so one
+worker keeps hundreds of requests in flight instead of one per thread:
+
+    GET /api/v1/<resource>           (list and ?ids= batch fetch)
+    GET /api/v1/<resource>/<id>
+    GET /api/dashboard/stats
+
+They use the same models, projections (api.Resource.select), filters,
+keyset cursors, ETags and JSON encoding as the WSGI views, and the same
+signed session cookie. Every other route (HTML pages, forms, writes,
+geo queries) is passed to the Flask app from create_app() on a thread
+pool of ASGI_WSGI_THREADS: pages are CPU-bound template rendering and
+writes go through the synchronous session hooks (counters, cache
+invalidation, outbox), so they gain nothing from running on the event
+loop.
+
+The async engine connects to ASYNC_DATABASE_URL, which defaults to the
+app's database with an async driver: sqlite+aiosqlite, or mysql+asyncmy
+for MySQL. Pool sizes and SQLite PRAGMAs follow the deployment profile;
+requests beyond pool_size + max_overflow wait for a free session in
+order rather than failing with a pool timeout. With a read replica
+configured (see replicas.py) these reads go to it through a second async
+engine, except for clients the session cookie pins to the primary after
+a write.
+
+Its packages (starlette, a2wsgi, uvicorn, aiosqlite or asyncmy) are in requirements.txt.
+benchmarks/async_compare.py compares this mode with the threaded WSGI
+server at high connection counts.
+"""
+
+import asyncio
+import contextlib
+import time
+from itsdangerous import BadSignature
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from werkzeug.datastructures import MultiDict
+from werkzeug.exceptions import HTTPException, Unauthorized
+from werkzeug.http import parse_etags
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.responses import RedirectResponse, Response
+from starlette.routing import Mount, Route
+from flask import abort
+from app import create_app
+from api import RESOURCES, encode_json, requested_fields, requested_ids, rows_etag, serialize_rows
+from pagination import InvalidCursor, filter_values, keyset_page, keyset_statement, page_args
+from stats import build_dashboard_stats, dashboard_queries
+import db_tuning
+import replicas
+
+ASYNC_DRIVERS = {'sqlite': 'sqlite+aiosqlite', 'mysql': 'mysql+asyncmy'}
+
+
+def async_database_uri(uri):
+    """The same database addressed through an async driver"""
+    url = make_url(uri)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver configured for {backend}; set ASYNC_DATABASE_URL')
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
+
+
+class AsyncReads:
+    """Async handlers for the hot read endpoints, bound to one Flask app's config and session cookie"""
+
+    def __init__(self, flask_app):
+        config = flask_app.config
+        self.config = config
+        self.engine, self.sessions, self.db_slots = self._pool(
+            config.get('ASYNC_DATABASE_URI') or async_database_uri(config['SQLALCHEMY_DATABASE_URI']),
+            config['SQLALCHEMY_ENGINE_OPTIONS'])
+        self.replica_engine = None
+        if replicas.replica_configured(flask_app):
+            options = dict(config['SQLALCHEMY_BINDS'][replicas.REPLICA_BIND])
+            self.replica_engine, self.replica_sessions, self.replica_slots = self._pool(
+                async_database_uri(options.pop('url')), options)
+        self.cookie_name = config['SESSION_COOKIE_NAME']
+        self.cookie_max_age = int(flask_app.permanent_session_lifetime.total_seconds())
+        self.serializer = flask_app.session_interface.get_signing_serializer(flask_app)
+
+    def _pool(self, uri, options):
+        """(engine, sessionmaker, semaphore) for one database"""
+        engine = create_async_engine(uri, **options)
+        db_tuning.apply_sqlite_pragmas(engine.sync_engine, self.config.get('SQLITE_PRAGMAS'))
+        # Requests beyond the pool's capacity queue here instead of timing out in the pool
+        slots = asyncio.Semaphore(options.get('pool_size', 5) + max(options.get('max_overflow', 10), 0))
+        return engine, async_sessionmaker(engine, expire_on_commit=False), slots
+
+    # ---- Helpers ----
+
+    def cookie_session(self, request):
+        """Contents of the Flask session cookie, or {} if it is missing or invalid"""
+        cookie = request.cookies.get(self.cookie_name)
+        if not cookie or self.serializer is None:
+            return {}
+        try:
+            return self.serializer.loads(cookie, max_age=self.cookie_max_age)
+        except BadSignature:
+            return {}
+
+    def signed_in(self, request):
+        """True if the Flask session cookie is valid and carries a user"""
+        return 'user_id' in self.cookie_session(request)
+
+    @contextlib.asynccontextmanager
+    async def session(self, request):
+        """Session on the replica, or on the primary while the client is sticky after a write"""
+        if self.replica_engine is not None and self.cookie_session(request).get(replicas.STICKY_KEY, 0) < time.time():
+            slots, sessions = self.replica_slots, self.replica_sessions
+        else:
+            slots, sessions = self.db_slots, self.sessions
+        async with slots, sessions() as session:
+            yield session
+
+    async def fetch(self, request, statement):
+        async with self.session(request) as session:
+            return (await session.execute(statement)).all()
+
+    @staticmethod
+    def json_response(request, payload, etag=None):
+        """JSON response as api.json_response() builds it, or a 304 when If-None-Match matches"""
+        headers = {'ETag': f'W/"{etag}"'} if etag else {}
+        if etag and parse_etags(request.headers.get('if-none-match')).contains_weak(etag):
+            return Response(status_code=304, headers=headers)
+        return Response(encode_json(payload), media_type='application/json', headers=headers)
+
+    @staticmethod
+    def error_response(error):
+        body = encode_json({'error': error.name, 'message': error.description})
+        return Response(body, status_code=error.code, media_type='application/json')
+
+    # ---- Endpoints ----
+
+    async def list_resources(self, request):
+        """Async twin of api.list_resources"""
+        try:
+            if not self.signed_in(request):
+                raise Unauthorized()
+            resource = RESOURCES.get(request.path_params['resource_name']) or abort(404)
+            args = MultiDict(request.query_params.multi_items())
+            names = requested_fields(resource, args)
+            statement = resource.select(names)
+
+            if 'ids' in args:
+                statement = statement.where(resource.model.id.in_(requested_ids(args))).order_by(resource.model.id)
+                rows = await self.fetch(request, statement)
+                return self.json_response(request, {'data': serialize_rows(rows, names)}, rows_etag(rows, names))
+
+            try:
+                filters = filter_values(args, resource.filters)
+            except ValueError:
+                abort(400)
+            for name, value in filters.items():
+                statement = statement.where(resource.filters[name] == value)
+            paging = page_args(args, self.config)
+            try:
+                statement = keyset_statement(statement, resource.sort, **paging)
+            except InvalidCursor:
+                abort(400)
+            page = keyset_page(await self.fetch(request, statement), resource.sort, **paging)
+        except HTTPException as error:
+            return self.error_response(error)
+
+        return self.json_response(request, {
+            'data': serialize_rows(page.items, names),
+            'next_cursor': page.next_cursor,
+            'prev_cursor': page.prev_cursor,
+        }, rows_etag(page.items, names, page.next_cursor, page.prev_cursor))
+
+    async def get_resource(self, request):
+        """Async twin of api.get_resource"""
+        try:
+            if not self.signed_in(request):
+                raise Unauthorized()
+            resource = RESOURCES.get(request.path_params['resource_name']) or abort(404)
+            names = requested_fields(resource, MultiDict(request.query_params.multi_items()))
+            rows = await self.fetch(request, resource.select(names).where(resource.model.id == request.path_params['id']))
+            if not rows:
+                abort(404)
+        except HTTPException as error:
+            return self.error_response(error)
+        return self.json_response(request, {'data': serialize_rows(rows, names)[0]}, rows_etag(rows, names))
+
+    async def dashboard_stats(self, request):
+        """Async twin of main.dashboard_stats_api"""
+        if not self.signed_in(request):
+            return RedirectResponse('/login', status_code=302)
+        event_totals, rsvp_totals = dashboard_queries()
+        async with self.session(request) as session:
+            event_row = (await session.execute(event_totals)).one()
+            rsvp_counts = dict((await session.execute(rsvp_totals)).all())
+        return Response(encode_json(build_dashboard_stats(event_row, rsvp_counts).to_dict()),
+                        media_type='application/json')
+
+
+def create_asgi_app(profile=None):
+    """ASGI app: async read endpoints in front of the Flask app for the profile"""
+    flask_app = create_app(profile)
+    reads = AsyncReads(flask_app)
+    config = flask_app.config
+    compress = [Middleware(GZipMiddleware, minimum_size=config['COMPRESS_MIN_SIZE'],
+                           compresslevel=config['COMPRESS_LEVEL'])] if config['COMPRESS_RESPONSES'] else []
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        yield
+        await reads.engine.dispose()
+        if reads.replica_engine is not None:
+            await reads.replica_engine.dispose()
+
+    return Starlette(routes=[
+        Route('/api/v1/{resource_name}', reads.list_resources, methods=['GET', 'HEAD'], middleware=compress),
+        Route('/api/v1/{resource_name}/{id:int}', reads.get_resource, methods=['GET', 'HEAD'], middleware=compress),
+        Route('/api/dashboard/stats', reads.dashboard_stats, methods=['GET', 'HEAD'], middleware=compress),
+        Mount('/', WSGIMiddleware(flask_app, workers=config['ASGI_WSGI_THREADS'])),
+    ], lifespan=lifespan)
@@ -0,0 +1,236 @@
+"""
+Self-hosted, fingerprinted static assets.
+
+Sources live in static/: the app's stylesheets in static/css/ and pinned
+third-party files in static/vendor/. `flask assets-vendor` downloads the
+vendored files listed in VENDOR_ASSETS once, on a machine with network
+access, and records their SHA-256 in static/vendor/SHA256SUMS; commit both
+so deployments need no CDN. `flask assets-check` exits non-zero while a
+vendored file is missing or differs from its checksum, for deploy scripts.
+
+`flask assets-build` refuses to run while any of them is missing. It copies
+every source into static/dist/ under a content hash (css/app.css -> css/app.3f9c2a1b7e.css), rewrites url() references in
+stylesheets to the hashed names, precompresses text assets (.gz, plus .br
+when the brotli package is installed) and writes static/dist/manifest.json.
+Because a hashed name never changes content, /static/dist/ is served with
+a one-year immutable Cache-Control and the precompressed variant the client
+accepts, so repeat page loads make no asset requests at all.
+
+Templates link assets with asset_url('css/app.css'): the hashed URL when
+the manifest lists it, else the plain /static/ URL (no build, e.g. in
+development). Pages never link the CDN unless ASSET_CDN_FALLBACK is turned
+on: a vendored file that was never fetched keeps its /static/ URL, so pages
+still render (unstyled) and the app logs the missing files at startup.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import mimetypes
+import os
+import posixpath
+import re
+import shutil
+import urllib.request
+from functools import lru_cache
+from flask import current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Vendored file (relative to static/) -> pinned upstream URL
+VENDOR_ASSETS = {
+    'vendor/bootstrap/bootstrap.min.css':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/css/bootstrap.min.css',
+    'vendor/bootstrap/bootstrap.bundle.min.js':
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js',
+    'vendor/bootstrap-icons/bootstrap-icons.css':
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/bootstrap-icons.css',
+    'vendor/bootstrap-icons/fonts/bootstrap-icons.woff2':
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/fonts/bootstrap-icons.woff2',
+    'vendor/bootstrap-icons/fonts/bootstrap-icons.woff':
+        'https://cdn.jsdelivr.net/npm/bootstrap-icons@1.11.0/font/fonts/bootstrap-icons.woff',
+}
+
+VENDOR_CHECKSUMS = 'vendor/SHA256SUMS'
+DIST_DIR = 'dist'
+MANIFEST = 'manifest.json'
+PRECOMPRESS = ('.css', '.js', '.svg', '.json', '.txt')
+
+_CSS_URL = re.compile(r'''url\(\s*(['"]?)([^'")]+)\1\s*\)''')
+_SOURCE_MAP = re.compile(r'\n?/[*/]# sourceMappingURL=[^\n]*')
+
+
+# ---- Build ----
+
+def vendor_assets(static_folder, overwrite=False):
+    """Download VENDOR_ASSETS into static/ and record their checksums; returns the paths fetched"""
+    fetched = []
+    for path, url in VENDOR_ASSETS.items():
+        target = os.path.join(static_folder, path)
+        if os.path.exists(target) and not overwrite:
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with urllib.request.urlopen(url, timeout=30) as response:
+            data = response.read()
+        with open(target, 'wb') as f:
+            f.write(data)
+        fetched.append(path)
+    sums = {path: _sha256(os.path.join(static_folder, path)) for path in VENDOR_ASSETS
+            if os.path.exists(os.path.join(static_folder, path))}
+    with open(os.path.join(static_folder, VENDOR_CHECKSUMS), 'w') as f:
+        f.writelines(f'{digest}  {path}\n' for path, digest in sorted(sums.items()))
+    return fetched
+
+
+def _sha256(filename):
+    with open(filename, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def missing_vendor_assets(static_folder):
+    """VENDOR_ASSETS paths not present under static/"""
+    return [path for path in VENDOR_ASSETS if not os.path.exists(os.path.join(static_folder, path))]
+
+
+def vendor_checksums(static_folder):
+    """Path -> SHA-256 recorded by the last `flask assets-vendor`; empty if it never ran"""
+    try:
+        with open(os.path.join(static_folder, VENDOR_CHECKSUMS)) as f:
+            return {path: digest for digest, path in (line.split() for line in f if line.strip())}
+    except FileNotFoundError:
+        return {}
+
+
+def check_vendor_assets(static_folder):
+    """Problems with the vendored files: missing, unrecorded or not matching SHA256SUMS"""
+    sums = vendor_checksums(static_folder)
+    problems = [f'{path}: missing' for path in missing_vendor_assets(static_folder)]
+    for path in VENDOR_ASSETS:
+        filename = os.path.join(static_folder, path)
+        if not os.path.exists(filename):
+            continue
+        if path not in sums:
+            problems.append(f'{path}: no checksum in {VENDOR_CHECKSUMS}')
+        elif _sha256(filename) != sums[path]:
+            problems.append(f'{path}: checksum mismatch')
+    return problems
+
+
+def _sources(static_folder):
+    """Asset paths relative to static/, stylesheets last so their url()s can be rewritten"""
+    paths = []
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = [d for d in dirs if not (root == static_folder and d == DIST_DIR)]
+        for name in files:
+            paths.append(os.path.relpath(os.path.join(root, name), static_folder).replace(os.sep, '/'))
+    return sorted(paths, key=lambda path: (path.endswith('.css'), path))
+
+
+def _rewrite_css(css, path, manifest):
+    """Point url() references at the hashed names of the assets they resolve to"""
+    def replace(match):
+        quote, ref = match.groups()
+        if ref.startswith(('data:', 'http:', 'https:', '//', '#', '/')):
+            return match.group(0)
+        target = posixpath.normpath(posixpath.join(posixpath.dirname(path), re.split(r'[?#]', ref)[0]))
+        if target not in manifest:
+            return match.group(0)
+        hashed = posixpath.relpath(manifest[target], posixpath.dirname(manifest[path] if path in manifest else path))
+        return f'url({quote}{hashed}{quote})'
+    return _CSS_URL.sub(replace, css)
+
+
+def _hashed_name(path, data):
+    stem, ext = posixpath.splitext(path)
+    return f'{stem}.{hashlib.sha256(data).hexdigest()[:10]}{ext}'
+
+
+def build_assets(static_folder):
+    """Write fingerprinted, precompressed copies of every asset to static/dist/"""
+    missing = missing_vendor_assets(static_folder)
+    if missing:
+        raise FileNotFoundError(f'Vendored assets missing (run flask assets-vendor): {", ".join(missing)}')
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    manifest = {}
+    for path in _sources(static_folder):
+        with open(os.path.join(static_folder, path), 'rb') as f:
+            data = f.read()
+        if path.endswith(('.css', '.js')):
+            text = _SOURCE_MAP.sub('', data.decode('utf-8'))
+            if path.endswith('.css'):
+                # The hashed name of a stylesheet is not known yet; rewrite relative to its directory
+                text = _rewrite_css(text, path, manifest)
+            data = text.encode('utf-8')
+        hashed = manifest[path] = _hashed_name(path, data)
+        target = os.path.join(dist, hashed)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+        if hashed.endswith(PRECOMPRESS):
+            with open(target + '.gz', 'wb') as f:
+                f.write(gzip.compress(data, compresslevel=9, mtime=0))
+            if brotli is not None:
+                with open(target + '.br', 'wb') as f:
+                    f.write(brotli.compress(data, quality=11))
+    with open(os.path.join(dist, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    _load_manifest.cache_clear()
+    return manifest
+
+
+# ---- Serving ----
+
+@lru_cache(maxsize=None)
+def _load_manifest(static_folder):
+    """Manifest and the set of vendored files present; read once per process, on first use"""
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST)) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        manifest = {}
+    return manifest, set(missing_vendor_assets(static_folder))
+
+
+def asset_url(path):
+    """URL of a static asset: fingerprinted if built, else plain (or, if allowed, a missing file's CDN copy)"""
+    manifest, missing = _load_manifest(current_app.static_folder)
+    if path in manifest:
+        return url_for('asset', filename=manifest[path])
+    if path in missing and current_app.config['ASSET_CDN_FALLBACK']:
+        return VENDOR_ASSETS[path]
+    return url_for('static', filename=path)
+
+
+def serve_asset(filename):
+    """A fingerprinted asset, precompressed if the client accepts it, cached for good"""
+    dist = os.path.join(current_app.static_folder, DIST_DIR)
+    max_age = current_app.config['ASSET_MAX_AGE']
+    for encoding, suffix in (('br', '.br'), ('gzip', '.gz')):
+        if request.accept_encodings[encoding] and os.path.isfile(os.path.join(dist, filename + suffix)):
+            response = send_from_directory(dist, filename + suffix, max_age=max_age,
+                                           mimetype=mimetypes.guess_type(filename)[0])
+            response.content_encoding = encoding
+            break
+    else:
+        response = send_from_directory(dist, filename, max_age=max_age)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+def init_app(app):
+    """Serve /static/dist/ and install the asset_url() template global"""
+    problems = check_vendor_assets(app.static_folder)
+    if problems and not app.config['ASSET_CDN_FALLBACK']:
+        logger.error('Vendored assets not as fetched by flask assets-vendor, pages may render without them: %s',
+                     '; '.join(problems))
+    app.add_url_rule(f'{app.static_url_path}/{DIST_DIR}/<path:filename>', 'asset', serve_asset)
+    app.add_template_global(asset_url)
@@ -0,0 +1,166 @@
+"""
+Authentication routes and the login_required decorator.
+
+Login attempts are throttled (ratelimit.py) before any password hash is
+checked: per client IP, per account and client IP, and per account across
+all IPs with a looser cap. The username or email typed is resolved to the
+account first, so both forms share its buckets, and one client's failures
+cannot lock the account out for clients elsewhere. Identifiers that match
+no account are bucketed by their lowercased text. A successful login resets
+the account's buckets and upgrades the stored hash if the hashing settings
+have changed (passwords.py).
+"""
+
+import math
+from functools import wraps
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, current_app
+from models import db, User
+from passwords import needs_rehash
+from ratelimit import limiter
+
+auth_bp = Blueprint('auth', __name__)
+
+
+# Login required decorator
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            flash('Please login to access this page.', 'error')
+            return redirect(url_for('auth.login'))
+        return f(*args, **kwargs)
+    return decorated_function
+
+
+def _find_user(identifier):
+    """The user whose username or email is identifier, or None"""
+    return User.query.filter(
+        (User.username == identifier) | (User.email == identifier)
+    ).first()
+
+
+def _account_key(user, identifier):
+    if user is not None:
+        return f'id:{user.id}'
+    return f'name:{(identifier or "").strip().lower()}'
+
+
+def _user_buckets(account):
+    """(per account and client IP, per account) bucket keys"""
+    return f'login:user:{account}:{request.remote_addr}', f'login:account:{account}'
+
+
+def _wait(allowed, retry_after):
+    return 0 if allowed else max(1, math.ceil(retry_after))
+
+
+def login_throttle(identifier):
+    """(seconds until another attempt is allowed or 0, the user identifier names or None)"""
+    config = current_app.config
+    wait = _wait(*limiter.take(f'login:ip:{request.remote_addr}',
+                               config['LOGIN_IP_PER_MINUTE'], config['LOGIN_IP_BURST']))
+    if wait:
+        return wait, None
+    user = _find_user(identifier)
+    user_ip_bucket, account_bucket = _user_buckets(_account_key(user, identifier))
+    wait = _wait(*limiter.take(user_ip_bucket, config['LOGIN_USER_PER_MINUTE'], config['LOGIN_USER_BURST']))
+    if wait:
+        return wait, user
+    return _wait(*limiter.take(account_bucket,
+                               config['LOGIN_ACCOUNT_PER_MINUTE'], config['LOGIN_ACCOUNT_BURST'])), user
+
+
+@auth_bp.route('/login', methods=['GET', 'POST'])
+def login():
+    """User login"""
+    if 'user_id' in session:
+        return redirect(url_for('main.dashboard'))
+    
+    if request.method == 'POST':
+        username = request.form.get('username')
+        password = request.form.get('password')
+        
+        retry_after, user = login_throttle(username)
+        if retry_after:
+            current_app.logger.warning('login throttled for %s from %s', username, request.remote_addr)
+            flash(f'Too many login attempts. Try again in {retry_after} seconds.', 'error')
+            return render_template('auth/login.html'), 429, {'Retry-After': str(retry_after)}
+        
+        if user and user.check_password(password):
+            limiter.reset(*_user_buckets(_account_key(user, username)))
+            if needs_rehash(user.password_hash):
+                user.set_password(password)
+                db.session.commit()
+            session['user_id'] = user.id
+            session['username'] = user.username
+            session['full_name'] = user.full_name
+            flash(f'Welcome back, {user.full_name}!', 'success')
+            return redirect(url_for('main.dashboard'))
+        else:
+            flash('Invalid username/email or password', 'error')
+    
+    return render_template('auth/login.html')
+
+
+@auth_bp.route('/register', methods=['GET', 'POST'])
+def register():
+    """User registration"""
+    if 'user_id' in session:
+        return redirect(url_for('main.dashboard'))
+    
+    if request.method == 'POST':
+        try:
+            username = request.form.get('username')
+            email = request.form.get('email')
+            password = request.form.get('password')
+            confirm_password = request.form.get('confirm_password')
+            full_name = request.form.get('full_name')
+            
+            # Validate passwords match
+            if password != confirm_password:
+                flash('Passwords do not match', 'error')
+                return render_template('auth/register.html')
+            
+            # Validate Gmail only
+            if not email.lower().endswith('@gmail.com'):
+                flash('Invalid email! Only @gmail.com addresses are allowed.', 'error')
+                return render_template('auth/register.html')
+            
+            # Check if username exists
+            if User.query.filter_by(username=username).first():
+                flash('Username already exists', 'error')
+                return render_template('auth/register.html')
+            
+            # Check if email exists
+            if User.query.filter_by(email=email).first():
+                flash('Email already registered', 'error')
+                return render_template('auth/register.html')
+            
+            # Create new user
+            user = User(
+                username=username,
+                email=email,
+                full_name=full_name
+            )
+            user.set_password(password)
+            
+            db.session.add(user)
+            db.session.commit()
+            
+            flash('Account created successfully! Please login.', 'success')
+            return redirect(url_for('auth.login'))
+            
+        except Exception as e:
+            flash(f'Error creating account: {str(e)}', 'error')
+            db.session.rollback()
+    
+    return render_template('auth/register.html')
+
+
+@auth_bp.route('/logout')
+def logout():
+    """User logout"""
+    session.clear()
+    flash('You have been logged out successfully', 'success')
+    return redirect(url_for('auth.login'))
+
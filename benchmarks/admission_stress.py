@@ -0,0 +1,96 @@
+"""
+Concurrency check for venue capacity admission control.
+
+Starts a scratch SQLite database, creates one event with a small venue
+capacity and fires many concurrent RSVPs (guest_create) and guest_count
+edits (guest_edit) at it through the Flask test client. Afterwards the
+event must never be over capacity and its headcount counter must equal
+SUM(guests.guest_count).
+
+Usage:
+    python benchmarks/admission_stress.py [--threads 200] [--capacity 150]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=200)
+    parser.add_argument('--capacity', type=int, default=150)
+    args = parser.parse_args()
+
+    db_path = os.path.join(tempfile.mkdtemp(), 'admission.db')
+    os.environ['DB_TYPE'] = 'sqlite'
+    os.environ['DATABASE_URL'] = f'sqlite:///{db_path}'
+
+    from app import create_app
+    app = create_app()
+    from models import db, Event, Guest
+    from sqlalchemy import func
+    from datetime import date
+
+    with app.app_context():
+        db.create_all()
+        event = Event(name='Stress', event_date=date(2030, 1, 1), venue_capacity=args.capacity)
+        db.session.add(event)
+        db.session.commit()
+        event_id = event.id
+        seed = [Guest(event_id=event_id, name=f'Seed {i}', guest_count=1) for i in range(10)]
+        db.session.add_all(seed)
+        db.session.commit()
+        seed_ids = [g.id for g in seed]
+
+    barrier = threading.Barrier(args.threads)
+    outcomes = {'created': 0, 'edited': 0, 'other': 0}
+    lock = threading.Lock()
+
+    def worker(n):
+        client = app.test_client()
+        barrier.wait()
+        if n % 10 == 0:
+            guest_id = random.choice(seed_ids)
+            response = client.post(f'/guests/{guest_id}/edit', data={
+                'name': f'Seed {guest_id}', 'event_id': event_id,
+                'guest_count': random.randint(1, 5)
+            })
+            kind = 'edited'
+        else:
+            response = client.post('/guests/create', data={
+                'name': f'Guest {n}', 'event_id': event_id,
+                'guest_count': random.randint(1, 3)
+            })
+            kind = 'created'
+        with lock:
+            outcomes[kind if response.status_code == 302 else 'other'] += 1
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(args.threads)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    with app.app_context():
+        event = db.session.get(Event, event_id)
+        actual = db.session.query(func.coalesce(func.sum(Guest.guest_count), 0)).filter_by(event_id=event_id).scalar()
+        rows = Guest.query.filter_by(event_id=event_id).count()
+
+    print(f'threads={args.threads} capacity={args.capacity} outcomes={outcomes}')
+    print(f'headcount counter={event.headcount} SUM(guest_count)={actual} '
+          f'guest rows={rows} (counter {event.guest_row_count})')
+
+    ok = (event.headcount == actual <= args.capacity) and rows == event.guest_row_count
+    print('OK' if ok else 'FAILED: capacity or counters inconsistent')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Async (ASGI) versus threaded (WSGI) serving at high connection counts.
+
+Starts each server in its own process against the same seeded database:
+
+  wsgi - app.create_app() on gunicorn with threaded workers (--threads each)
+  asgi - asgi.create_asgi_app() on uvicorn (async read endpoints)
+
+and drives it from an asyncio client holding --connections keep-alive
+connections open at once, each issuing requests back to back for
+--duration seconds across the async read endpoints (API lists, single
+objects and dashboard stats). It reports throughput, p50/p95/p99/max
+latency and errors per mode. Connections are opened before the clock
+starts, so accept backlog limits do not count as request latency.
+
+The gap grows with database round-trip time: against a local SQLite file
+every query is CPU work in the server process, against MySQL the async
+server overlaps the waits that block a WSGI thread each.
+
+Needs gunicorn and uvicorn, plus the packages asgi.py needs (all in requirements.txt).
+
+Usage:
+    python benchmarks/seed.py --guests 100000 --database-url sqlite:////tmp/bench.db
+    python benchmarks/async_compare.py --database-url sqlite:////tmp/bench.db
+        [--connections 1000] [--duration 20] [--modes wsgi,asgi] [--profile production]
+        [--workers 1] [--threads 32]
+        [--save results.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from run import percentile
+
+
+# ---- Servers ----
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_command(mode, port, args):
+    """gunicorn with threaded workers for WSGI, uvicorn for ASGI; same worker count and backlog"""
+    if mode == 'wsgi':
+        return [sys.executable, '-m', 'gunicorn', 'app:create_app()', '--bind', f'127.0.0.1:{port}',
+                '--worker-class', 'gthread', '--workers', str(args.workers), '--threads', str(args.threads),
+                '--worker-connections', str(args.connections + 100), '--backlog', '2048',
+                '--keep-alive', '30', '--log-level', 'warning']
+    return [sys.executable, '-m', 'uvicorn', 'asgi:create_asgi_app', '--factory', '--port', str(port),
+            '--workers', str(args.workers), '--backlog', '2048', '--log-level', 'warning', '--no-access-log']
+
+
+def start_server(mode, port, args, env):
+    process = subprocess.Popen(server_command(mode, port, args), cwd=ROOT, env=env)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return process
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit(f'{mode} server exited with {process.returncode}')
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f'{mode} server did not start')
+
+
+# ---- Client ----
+
+async def read_response(reader):
+    """(status, body, closing) of one HTTP/1.1 response"""
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    status = int(lines[0].split(' ', 2)[1])
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        chunks = []
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            chunks.append(await reader.readexactly(size + 2))
+            if size == 0:
+                return status, b''.join(chunks), headers.get('connection') == 'close'
+    body = await reader.readexactly(int(headers.get('content-length', 0)))
+    return status, body, headers.get('connection') == 'close'
+
+
+async def login(port, username, password):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    body = urlencode({'username': username, 'password': password})
+    writer.write((f'POST /login HTTP/1.1\r\nHost: bench\r\nContent-Type: application/x-www-form-urlencoded\r\n'
+                  f'Content-Length: {len(body)}\r\nConnection: close\r\n\r\n{body}').encode())
+    head = (await reader.read()).decode('latin-1')
+    writer.close()
+    for line in head.split('\r\n'):
+        if line.lower().startswith('set-cookie:'):
+            return line.split(':', 1)[1].strip().split(';', 1)[0]
+    raise SystemExit('Benchmark login failed; did seed.py create the bench user?')
+
+
+async def fetch_json(port, cookie, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'GET {path} HTTP/1.1\r\nHost: bench\r\nCookie: {cookie}\r\n\r\n'.encode())
+    status, body, _ = await read_response(reader)
+    writer.close()
+    return json.loads(body)
+
+
+def request_paths(event_ids, rng, count=500):
+    """A fixed mix of read requests against the async endpoints"""
+    makers = [
+        lambda: '/api/v1/guests?per_page=20',
+        lambda: f'/api/v1/guests?event_id={rng.choice(event_ids)}&per_page=20',
+        lambda: f'/api/v1/events/{rng.choice(event_ids)}',
+        lambda: '/api/v1/events?fields=id,name,event_date,status&per_page=50',
+        lambda: f'/api/v1/bookings?event_id={rng.choice(event_ids)}',
+        lambda: '/api/dashboard/stats',
+    ]
+    return [rng.choice(makers)() for _ in range(count)]
+
+
+async def drive(port, cookie, paths, connections, duration):
+    """Latencies (ms) and error count with `connections` concurrent keep-alive connections"""
+    latencies, errors = [], [0]
+    opened = []
+    for start in range(0, connections, 100):
+        opened += await asyncio.gather(*[asyncio.open_connection('127.0.0.1', port)
+                                         for _ in range(start, min(connections, start + 100))])
+
+    async def worker(index, reader, writer, deadline):
+        i = index
+        while time.perf_counter() < deadline:
+            path = paths[i % len(paths)]
+            i += connections
+            started = time.perf_counter()
+            try:
+                writer.write(f'GET {path} HTTP/1.1\r\nHost: bench\r\nCookie: {cookie}\r\n\r\n'.encode())
+                status, _, closing = await read_response(reader)
+                if closing:
+                    writer.close()
+                    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            except (OSError, asyncio.IncompleteReadError, ValueError):
+                errors[0] += 1
+                return
+            latencies.append((time.perf_counter() - started) * 1000)
+            if status >= 400:
+                errors[0] += 1
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(i, reader, writer, started + duration)
+                           for i, (reader, writer) in enumerate(opened)])
+    elapsed = time.perf_counter() - started
+    return latencies, errors[0], elapsed
+
+
+def run_mode(mode, args, env):
+    port = free_port()
+    process = start_server(mode, port, args, env)
+    try:
+        async def measure():
+            cookie = await login(port, 'bench', 'bench')
+            events = await fetch_json(port, cookie, '/api/v1/events?fields=id&per_page=200')
+            paths = request_paths([row['id'] for row in events['data']], random.Random(args.seed))
+            return await drive(port, cookie, paths, args.connections, args.duration)
+        latencies, errors, elapsed = asyncio.run(measure())
+    finally:
+        process.terminate()
+        process.wait()
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'p50_ms': round(percentile(latencies, 50) or 0, 1),
+        'p95_ms': round(percentile(latencies, 95) or 0, 1),
+        'p99_ms': round(percentile(latencies, 99) or 0, 1),
+        'max_ms': round(latencies[-1] if latencies else 0, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database-url', help='Defaults to the configured database')
+    parser.add_argument('--connections', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=20)
+    parser.add_argument('--modes', default='wsgi,asgi')
+    parser.add_argument('--workers', type=int, default=1, help='Server processes for both modes')
+    parser.add_argument('--threads', type=int, default=32, help='Threads per WSGI worker')
+    parser.add_argument('--profile', default='production', help='DB_PROFILE for both servers')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save', help='Write the results as JSON')
+    args = parser.parse_args()
+
+    env = dict(os.environ, DB_PROFILE=args.profile, RATELIMIT_BACKEND='null', SLOW_QUERY_MS='60000',
+               PYTHONPATH=ROOT)
+    if args.database_url:
+        env['DATABASE_URL'] = args.database_url
+
+    results = {}
+    for mode in args.modes.split(','):
+        print(f'{mode}: {args.connections} connections for {args.duration:g}s ...', flush=True)
+        results[mode] = run_mode(mode, args, env)
+
+    print(f"\n{'mode':<6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for mode, r in results.items():
+        print(f"{mode:<6} {r['throughput_rps']:>9} {r['p50_ms']:>9} {r['p95_ms']:>9} "
+              f"{r['p99_ms']:>9} {r['max_ms']:>9} {r['errors']:>7}")
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'connections': args.connections, 'duration': args.duration,
+                       'profile': args.profile, 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,401 @@
+"""
+Route benchmark harness with baseline comparison.
+
+Drives every route of the app against a seeded database (benchmarks/seed.py)
+and records, per route, p50/p95/p99 latency, SQL statements per request
+(from the Server-Timing header written by db_metrics.py) and errors. It
+also records the peak RSS of the process. Two transports are available:
+
+  client - the Flask test client, one per worker thread (app + DB cost only)
+  server - a threaded local WSGI server on 127.0.0.1, driven over keep-alive
+           HTTP connections (adds the HTTP stack and real concurrency)
+
+Destructive or side-effecting routes (deletes, creates, invitations, OTP
+sends, logout) are not driven. The write scenarios resubmit unchanged
+values, so repeated runs see the same data. Endpoints that have neither a
+scenario nor a skip entry are reported, so new routes cannot be silently
+left out.
+
+--save-baseline writes the results as JSON. --baseline compares against
+such a file and exits non-zero when a route's p95 grows by more than
+--tolerance (ignoring changes under --noise-ms), when a route issues more
+queries than before, when peak RSS grows by more than --rss-tolerance, or
+when any request fails.
+
+benchmarks/baseline.json is the reference baseline: default options on the
+reference seed below (100,000 guests, --seed 42), client mode, one CPU.
+Latencies depend on the machine; regenerate it with --save-baseline on
+your own hardware before comparing p95s, and commit it when a change
+moves the numbers on purpose.
+
+Usage:
+    python benchmarks/seed.py --guests 100000 --database-url sqlite:////tmp/bench.db
+    python benchmarks/run.py --database-url sqlite:////tmp/bench.db --baseline benchmarks/baseline.json
+    python benchmarks/run.py --database-url sqlite:////tmp/bench.db --save-baseline benchmarks/baseline.json
+        [--mode client|server] [--concurrency 8] [--requests 200] [--cache null|memory]
+"""
+
+import argparse
+import http.client
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None
+
+# Endpoints that are deliberately not driven, and why
+SKIPPED = {
+    'static': 'static files, not app work',
+    'asset': 'static files, not app work',
+    'auth.logout': 'ends the benchmark session',
+    'events.event_delete': 'destructive',
+    'guests.guest_delete': 'destructive',
+    'bookings.booking_delete': 'destructive',
+    'events.event_invite': 'queues notifications',
+    'guests.guest_send_otp': 'queues notifications',
+}
+QUERIES_RE = re.compile(r'db;[^,]*desc="(\d+) queries"')
+
+
+class Scenario:
+    """One benchmarked request shape; `make` returns (path, form, json) for a request"""
+
+    def __init__(self, name, endpoint, method, make):
+        self.name = name
+        self.endpoint = endpoint
+        self.method = method
+        self.make = make
+
+
+def build_scenarios(samples):
+    """Request scenarios for every non-skipped endpoint, using sample ids from the database"""
+    ev, gu, bo, guest_forms = samples['events'], samples['guests'], samples['bookings'], samples['guest_forms']
+
+    def get(name, endpoint, path):
+        return Scenario(name, endpoint, 'GET', lambda rng: (path(rng) if callable(path) else path, None, None))
+
+    def edit_guest(rng):
+        guest_id, form = rng.choice(guest_forms)
+        return f'/guests/{guest_id}/edit', form, None
+
+    def bulk_rsvp(rng):
+        return '/api/v1/guests/bulk', None, {'ids': samples['bulk_ids'], 'patch': {'rsvp_status': 'Accepted'}}
+
+    return [
+        get('login_form', 'auth.login', '/login'),
+        get('register_form', 'auth.register', '/register'),
+        get('dashboard', 'main.dashboard', '/dashboard'),
+        get('dashboard_stats_api', 'main.dashboard_stats_api', '/api/dashboard/stats'),
+        get('cache_stats', 'main.cache_stats', '/cache/stats'),
+        get('reports', 'main.reports', '/reports'),
+        get('events_list', 'events.events_list', '/events'),
+        get('events_list_filtered', 'events.events_list', '/events?status=Confirmed'),
+        get('event_detail', 'events.event_detail', lambda rng: f'/events/{rng.choice(ev)}'),
+        get('event_create_form', 'events.event_create', '/events/create'),
+        get('event_edit_form', 'events.event_edit', lambda rng: f'/events/{rng.choice(ev)}/edit'),
+        get('guests_list', 'guests.guests_list', '/guests'),
+        get('guests_list_by_event', 'guests.guests_list', lambda rng: f'/guests?event_id={rng.choice(ev)}'),
+        get('guest_create_form', 'guests.guest_create', '/guests/create'),
+        get('guest_import_form', 'guests.guest_import', '/guests/import'),
+        get('guest_edit_form', 'guests.guest_edit', lambda rng: f'/guests/{rng.choice(gu)}/edit'),
+        Scenario('guest_edit_submit', 'guests.guest_edit', 'POST', edit_guest),
+        get('guest_verify_form', 'guests.guest_verify', lambda rng: f'/guests/{rng.choice(gu)}/verify'),
+        get('bookings_list', 'bookings.bookings_list', '/bookings'),
+        get('booking_create_form', 'bookings.booking_create', '/bookings/create'),
+        get('booking_edit_form', 'bookings.booking_edit', lambda rng: f'/bookings/{rng.choice(bo)}/edit'),
+        get('search_all', 'main.search_page', lambda rng: '/search?q=' + rng.choice(['sharma', 'priya', 'catering', 'delhi'])),
+        get('search_guests', 'main.search_page', lambda rng: '/search?type=guests&q=' + rng.choice(['rah', 'patel', 'gmail'])),
+        get('export_guests_csv', 'main.export_data', lambda rng: f'/export/guests.csv?event_id={rng.choice(ev)}'),
+        get('export_bookings_jsonl', 'main.export_data', lambda rng: f'/export/bookings.jsonl?event_id={rng.choice(ev)}'),
+        get('api_events', 'api.list_resources', '/api/v1/events'),
+        get('api_guests_fields', 'api.list_resources', '/api/v1/guests?fields=id,name,event_name'),
+        get('api_guests_batch', 'api.list_resources',
+            lambda rng: '/api/v1/guests?' + urlencode({'ids': ','.join(map(str, rng.sample(gu, min(50, len(gu)))))})),
+        get('api_booking', 'api.get_resource', lambda rng: f'/api/v1/bookings/{rng.choice(bo)}'),
+        Scenario('api_bulk_rsvp', 'api.bulk_update_resources', 'PATCH', bulk_rsvp),
+        get('api_nearby', 'api.events_nearby',
+            lambda rng: f'/api/v1/events/nearby?lat={rng.uniform(12, 29):.4f}&lon={rng.uniform(72, 88):.4f}&radius_km=50'),
+        get('api_nearest', 'api.events_nearest',
+            lambda rng: f'/api/v1/events/nearest?lat={rng.uniform(12, 29):.4f}&lon={rng.uniform(72, 88):.4f}&k=10'),
+    ]
+
+
+def load_samples(app, seed, size=200):
+    """Deterministic sample ids (and current guest form values) from the seeded database"""
+    from models import db, Event, Guest, Booking
+    rng = random.Random(seed)
+    with app.app_context():
+        def ids(model):
+            all_ids = [row[0] for row in db.session.query(model.id).order_by(model.id).limit(100000)]
+            if not all_ids:
+                raise SystemExit('Seed the database first: python benchmarks/seed.py --database-url ...')
+            return rng.sample(all_ids, min(size, len(all_ids)))
+
+        samples = {'events': ids(Event), 'guests': ids(Guest), 'bookings': ids(Booking)}
+        guests = Guest.query.filter(Guest.id.in_(samples['guests'][:50])).all()
+        samples['guest_forms'] = [(g.id, {
+            'event_id': str(g.event_id), 'name': g.name, 'email': g.email or '', 'phone': g.phone or '',
+            'rsvp_status': g.rsvp_status, 'guest_count': str(g.guest_count),
+            'dietary_requirements': g.dietary_requirements or '',
+        }) for g in guests]
+        samples['bulk_ids'] = sorted(samples['guests'][:100])
+        # Make the resubmitted values the stored ones, so writes do not change the data set
+        db.session.query(Guest).filter(Guest.id.in_(samples['bulk_ids'])).update(
+            {'rsvp_status': 'Accepted'}, synchronize_session=False)
+        db.session.commit()
+    return samples
+
+
+# ---- Transports ----
+
+class ClientSession:
+    """Flask test client, logged in"""
+
+    def __init__(self, app, username, password):
+        self.client = app.test_client()
+        response = self.client.post('/login', data={'username': username, 'password': password})
+        if response.status_code != 302:
+            raise SystemExit('Benchmark login failed; did seed.py create the bench user?')
+
+    def request(self, method, path, form=None, json_body=None):
+        response = self.client.open(path, method=method, data=form, json=json_body)
+        response.get_data()  # drain streamed responses
+        return response.status_code, response.headers.get('Server-Timing', '')
+
+
+class HTTPSession:
+    """Keep-alive HTTP connection to the local server, sharing one login cookie"""
+
+    def __init__(self, port, cookie):
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+        self.cookie = cookie
+
+    def request(self, method, path, form=None, json_body=None):
+        headers = {'Cookie': self.cookie}
+        body = None
+        if form is not None:
+            body = urlencode(form)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        elif json_body is not None:
+            body = json.dumps(json_body)
+            headers['Content-Type'] = 'application/json'
+        self.connection.request(method, path, body=body, headers=headers)
+        response = self.connection.getresponse()
+        response.read()
+        return response.status, response.getheader('Server-Timing', '')
+
+
+def start_server(app):
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, app, threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def server_login(port, username, password):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    connection.request('POST', '/login', body=urlencode({'username': username, 'password': password}),
+                       headers={'Content-Type': 'application/x-www-form-urlencoded'})
+    response = connection.getresponse()
+    response.read()
+    cookie = response.getheader('Set-Cookie', '')
+    if response.status != 302 or not cookie:
+        raise SystemExit('Benchmark login failed; did seed.py create the bench user?')
+    return cookie.split(';', 1)[0]
+
+
+# ---- Measurement ----
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return usage / (1024 * 1024) if sys.platform == 'darwin' else usage / 1024
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values) + 0.5) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(scenario, sessions, requests, warmup, seed):
+    """Run one scenario on every session concurrently; returns its metrics"""
+    latencies, queries, errors = [], [], [0]
+    lock = threading.Lock()
+    per_worker = max(1, requests // len(sessions))
+
+    def worker(index, session):
+        rng = random.Random(f'{seed}:{scenario.name}:{index}')
+        local_latencies, local_queries, local_errors = [], [], 0
+        for i in range(warmup + per_worker):
+            path, form, json_body = scenario.make(rng)
+            started = time.perf_counter()
+            status, timing = session.request(scenario.method, path, form, json_body)
+            elapsed = (time.perf_counter() - started) * 1000
+            if i < warmup:
+                continue
+            if status >= 400:
+                local_errors += 1
+            local_latencies.append(elapsed)
+            match = QUERIES_RE.search(timing)
+            if match:
+                local_queries.append(int(match.group(1)))
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            errors[0] += local_errors
+
+    threads = [threading.Thread(target=worker, args=(i, s)) for i, s in enumerate(sessions)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors[0],
+        'throughput_rps': round(len(latencies) / wall, 1) if wall else None,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'queries_median': statistics.median(queries) if queries else None,
+        'queries_max': max(queries) if queries else None,
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def compare(results, baseline, tolerance, noise_ms, rss_tolerance):
+    """List of human-readable regressions of `results` against `baseline`"""
+    problems = []
+    for name, current in results['routes'].items():
+        if current['errors']:
+            problems.append(f'{name}: {current["errors"]} failed request(s)')
+        before = baseline['routes'].get(name)
+        if before is None:
+            continue
+        if (current['p95_ms'] > before['p95_ms'] * (1 + tolerance)
+                and current['p95_ms'] - before['p95_ms'] > noise_ms):
+            problems.append(f'{name}: p95 {before["p95_ms"]:.2f}ms -> {current["p95_ms"]:.2f}ms')
+        if (current['queries_max'] is not None and before.get('queries_max') is not None
+                and current['queries_max'] > before['queries_max']):
+            problems.append(f'{name}: queries/request {before["queries_max"]} -> {current["queries_max"]}')
+    rss, rss_before = results.get('peak_rss_mb'), baseline.get('peak_rss_mb')
+    if rss and rss_before and rss > rss_before * (1 + rss_tolerance):
+        problems.append(f'peak RSS {rss_before:.0f}MB -> {rss:.0f}MB')
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--database-url', help='Seeded database (defaults to the configured one)')
+    parser.add_argument('--mode', choices=('client', 'server'), default='client')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per route')
+    parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per worker first')
+    parser.add_argument('--cache', choices=('null', 'memory'), default='null',
+                        help='CACHE_BACKEND; null measures the database path of every request')
+    parser.add_argument('--only', help='Comma-separated scenario names to run')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', help='Compare against this results file')
+    parser.add_argument('--save-baseline', help='Write results to this file')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed relative p95 growth')
+    parser.add_argument('--noise-ms', type=float, default=1.0, help='Ignore p95 changes smaller than this')
+    parser.add_argument('--rss-tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+    os.environ['CACHE_BACKEND'] = args.cache
+    os.environ['SERVER_TIMING'] = 'True'
+    os.environ['ENFORCE_QUERY_BUDGETS'] = 'False'
+    os.environ['RATELIMIT_BACKEND'] = 'null'  # every worker thread logs in from 127.0.0.1
+
+    from app import create_app
+    app = create_app()
+    app.logger.disabled = True
+
+    samples = load_samples(app, args.seed)
+    scenarios = build_scenarios(samples)
+    covered = {scenario.endpoint for scenario in scenarios}
+    missing = sorted({rule.endpoint for rule in app.url_map.iter_rules()} - covered - set(SKIPPED))
+    if missing:
+        print(f'WARNING: routes without a benchmark scenario: {", ".join(missing)}')
+    if args.only:
+        wanted = set(args.only.split(','))
+        scenarios = [scenario for scenario in scenarios if scenario.name in wanted]
+
+    if args.mode == 'server':
+        server = start_server(app)
+        cookie = server_login(server.port, 'bench', 'bench')
+        sessions = [HTTPSession(server.port, cookie) for _ in range(args.concurrency)]
+    else:
+        sessions = [ClientSession(app, 'bench', 'bench') for _ in range(args.concurrency)]
+
+    results = {
+        'meta': {
+            'mode': args.mode, 'concurrency': args.concurrency, 'requests': args.requests,
+            'cache': args.cache, 'python': platform.python_version(),
+            'database': app.config['SQLALCHEMY_DATABASE_URI'].split('@')[-1],
+            'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'routes': {},
+    }
+    print(f'{"route":<26} {"req/s":>8} {"p50":>8} {"p95":>8} {"p99":>8} {"queries":>8} {"errors":>7}')
+    for scenario in scenarios:
+        metrics = run_scenario(scenario, sessions, args.requests, args.warmup, args.seed)
+        results['routes'][scenario.name] = metrics
+        print(f'{scenario.name:<26} {metrics["throughput_rps"]:>8} {metrics["p50_ms"]:>6.2f}ms '
+              f'{metrics["p95_ms"]:>6.2f}ms {metrics["p99_ms"]:>6.2f}ms '
+              f'{metrics["queries_max"] if metrics["queries_max"] is not None else "-":>8} {metrics["errors"]:>7}')
+    results['peak_rss_mb'] = peak_rss_mb()
+    if results['peak_rss_mb'] is not None:
+        print(f'peak RSS: {results["peak_rss_mb"]:.0f}MB')
+
+    if args.mode == 'server':
+        server.shutdown()
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f'Saved results to {args.save_baseline}')
+
+    problems = [f'{name}: {metrics["errors"]} failed request(s)'
+                for name, metrics in results['routes'].items() if metrics['errors']]
+    if args.baseline:
+        with open(args.baseline) as f:
+            problems = compare(results, json.load(f), args.tolerance, args.noise_ms, args.rss_tolerance)
+    if problems:
+        print('\nREGRESSIONS:')
+        for problem in problems:
+            print(f'  {problem}')
+        raise SystemExit(1)
+    print('No regressions' if args.baseline else 'Done')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+"""
+Synthetic data generator for load tests and benchmarks.
+
+Fills a database with a deterministic data set at a chosen scale (1k to
+10M guests) using multi-row Core INSERTs in batches, bypassing the ORM unit
+of work. Derived data is filled in afterwards in bulk:
+
+  * per-event counters are computed while generating rows
+  * booking rollups, the full-text index and the spatial index are rebuilt
+    once at the end (on SQLite the sync triggers are dropped during the
+    load and recreated by the rebuild, instead of firing per row)
+
+Also creates a login for the benchmark harness (bench / bench).
+
+Usage:
+    python benchmarks/seed.py --guests 100000 [--database-url sqlite:////tmp/bench.db]
+                              [--guests-per-event 200] [--bookings-per-event 5]
+                              [--seed 42] [--batch-size 10000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, time as clock, timedelta
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIRST_NAMES = ['Aarav', 'Priya', 'Rahul', 'Ananya', 'Vikram', 'Neha', 'Arjun', 'Kavya', 'Rohan',
+               'Isha', 'Amit', 'Sneha', 'Karan', 'Meera', 'Sanjay', 'Pooja', 'Aditya', 'Divya']
+LAST_NAMES = ['Sharma', 'Patel', 'Kumar', 'Singh', 'Verma', 'Gupta', 'Mehta', 'Reddy', 'Nair',
+              'Iyer', 'Joshi', 'Rao', 'Das', 'Kapoor', 'Malhotra', 'Chopra', 'Bose', 'Menon']
+CITIES = [('Delhi', 28.61, 77.21), ('Mumbai', 19.08, 72.88), ('Bengaluru', 12.97, 77.59),
+          ('Chennai', 13.08, 80.27), ('Kolkata', 22.57, 88.36), ('Hyderabad', 17.39, 78.49),
+          ('Pune', 18.52, 73.86), ('Jaipur', 26.91, 75.79), ('Ahmedabad', 23.02, 72.57)]
+EVENT_KINDS = ['Conference', 'Wedding', 'Gala Dinner', 'Product Launch', 'Workshop', 'Reunion',
+               'Award Night', 'Meetup', 'Festival', 'Retreat']
+VENDORS = {
+    'Venue': ['Grand Hotel', 'Convention Center', 'Royal Banquets', 'Lakeside Resort'],
+    'Catering': ['Royal Caterers', 'Spice Route Kitchen', 'Annapurna Foods', 'Tandoor Tales'],
+    'Photography': ['Candid Frames', 'Pixel Story', 'Golden Hour Studio'],
+    'Music': ['Rhythm Band', 'DJ Nights', 'Sufi Strings'],
+    'Decoration': ['Bloom Decor', 'Fairy Lights Co', 'Marigold Events'],
+    'Other': ['Event Security', 'Valet Services', 'Print Hub'],
+}
+RSVP_STATUSES = ['Pending', 'Accepted', 'Accepted', 'Declined']
+EVENT_STATUSES = ['Planning', 'Planning', 'Confirmed', 'Completed', 'Cancelled']
+BOOKING_STATUSES = ['Pending', 'Confirmed', 'Confirmed', 'Paid', 'Cancelled']
+
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def generate_events(rng, count, now):
+    today = now.date()
+    for i in range(1, count + 1):
+        city, lat, lon = rng.choice(CITIES)
+        yield {
+            'id': i,
+            'name': f'{city} {rng.choice(EVENT_KINDS)} {i}',
+            'description': f'{rng.choice(EVENT_KINDS)} for {rng.randint(50, 2000)} people in {city}',
+            'event_date': today + timedelta(days=rng.randint(-365, 365)),
+            'event_time': clock(rng.randint(8, 21), rng.choice([0, 30])),
+            'location': f'{rng.choice(VENDORS["Venue"])}, {city}',
+            'latitude': lat + rng.uniform(-0.3, 0.3),
+            'longitude': lon + rng.uniform(-0.3, 0.3),
+            'venue_capacity': None,  # filled once the headcount is known
+            'budget': Decimal(rng.randint(50, 5000) * 1000),
+            'status': rng.choice(EVENT_STATUSES),
+            'created_at': now - timedelta(days=rng.randint(0, 730)),
+            'updated_at': now,
+        }
+
+
+def generate_guests(rng, events, total, now, counters):
+    for i in range(1, total + 1):
+        event_id = (i - 1) % events + 1
+        first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        guest_count = rng.choice([1, 1, 1, 2, 2, 3, 4])
+        counters[event_id][0] += 1
+        counters[event_id][1] += guest_count
+        yield {
+            'event_id': event_id,
+            'name': f'{first} {last}',
+            'email': f'{first.lower()}.{last.lower()}{i}@gmail.com',
+            'phone': f'{rng.choice("6789")}{i % 10 ** 9:09d}',
+            'rsvp_status': rng.choice(RSVP_STATUSES),
+            'guest_count': guest_count,
+            'dietary_requirements': rng.choice([None, None, None, 'Vegetarian', 'Vegan', 'Jain']),
+            'otp_attempts': 0,
+            'otp_verified': False,
+            'created_at': now - timedelta(seconds=rng.randint(0, 730 * 86400)),
+            'updated_at': now,
+        }
+
+
+def generate_bookings(rng, events, per_event, now, counters):
+    for event_id in range(1, events + 1):
+        for _ in range(per_event):
+            booking_type = rng.choice(list(VENDORS))
+            cost = Decimal(rng.randint(5, 500) * 1000)
+            counters[event_id][2] += 1
+            counters[event_id][3] += cost
+            yield {
+                'event_id': event_id,
+                'booking_type': booking_type,
+                'vendor_name': rng.choice(VENDORS[booking_type]),
+                'description': f'{booking_type} services',
+                'cost': cost,
+                'booking_date': (now - timedelta(days=rng.randint(0, 365))).date(),
+                'status': rng.choice(BOOKING_STATUSES),
+                'contact_info': f'contact@{booking_type.lower()}.example.com',
+                'notes': rng.choice([None, 'Advance paid', 'Awaiting contract', 'Negotiated rate']),
+                'created_at': now - timedelta(days=rng.randint(0, 730)),
+                'updated_at': now,
+            }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--guests', type=int, default=10000)
+    parser.add_argument('--guests-per-event', type=int, default=200)
+    parser.add_argument('--bookings-per-event', type=int, default=5)
+    parser.add_argument('--database-url', help='Defaults to the configured database')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--batch-size', type=int, default=10000)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ['DATABASE_URL'] = args.database_url
+
+    from sqlalchemy import bindparam, insert, text, update
+    from app import create_app
+    app = create_app()
+    from models import db, User, Event, Guest, Booking
+    from schema import upgrade
+    from analytics import rebuild_rollups
+    from search import rebuild_search_index
+    from geo import rebuild_geo_index
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    event_count = max(1, args.guests // args.guests_per_event)
+    counters = {i: [0, 0, 0, Decimal(0)] for i in range(1, event_count + 1)}
+
+    with app.app_context():
+        upgrade()
+        if db.session.query(Event.id).first() is not None:
+            raise SystemExit('Database already has events; seed an empty database')
+        engine = db.engine
+        started = time.perf_counter()
+
+        if engine.dialect.name == 'sqlite':
+            with engine.begin() as conn:
+                for (name,) in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'trigger'")).all():
+                    conn.execute(text(f'DROP TRIGGER {name}'))
+
+        plan = [
+            ('events', Event, generate_events(rng, event_count, now)),
+            ('guests', Guest, generate_guests(rng, event_count, args.guests, now, counters)),
+            ('bookings', Booking, generate_bookings(rng, event_count, args.bookings_per_event, now, counters)),
+        ]
+        for label, model, rows in plan:
+            inserted = 0
+            for batch in batched(rows, args.batch_size):
+                with engine.begin() as conn:
+                    conn.execute(insert(model.__table__), batch)
+                inserted += len(batch)
+                print(f'\r{label}: {inserted:,}', end='', flush=True)
+            print(f'\r{label}: {inserted:,} ({time.perf_counter() - started:.1f}s)')
+
+        with engine.begin() as conn:
+            for event_ids in batched(counters.items(), args.batch_size):
+                conn.execute(update(Event.__table__).where(Event.__table__.c.id == bindparam('event_id')), [
+                    {'event_id': event_id, 'guest_row_count': rows, 'headcount': heads,
+                     'venue_capacity': heads + rng.randint(0, heads // 4 + 10),
+                     'booking_count': bookings, 'booking_cost_total': cost}
+                    for event_id, (rows, heads, bookings, cost) in event_ids
+                ])
+        print(f'counters ({time.perf_counter() - started:.1f}s)')
+
+        rebuild_rollups()
+        rebuild_search_index()
+        rebuild_geo_index()
+        print(f'rollups, search and spatial indexes ({time.perf_counter() - started:.1f}s)')
+
+        if User.query.filter_by(username='bench').first() is None:
+            user = User(username='bench', email='bench@gmail.com', full_name='Benchmark')
+            user.set_password('bench')
+            db.session.add(user)
+            db.session.commit()
+
+    print(f'Seeded {event_count:,} events, {args.guests:,} guests and '
+          f'{event_count * args.bookings_per_event:,} bookings in {time.perf_counter() - started:.1f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Mixed read/write throughput of SQLite with and without the tuning profile.
+
+Runs the same workload twice against fresh scratch databases:
+
+  baseline - SQLite and pool defaults (rollback journal, synchronous=FULL)
+  tuned    - the SQLITE_PROFILES / ENGINE_PROFILES settings for --profile
+
+Each worker thread loops for --seconds, doing a guest-list read (keyset
+page joined to its event) or, with probability --write-ratio, inserting a
+guest and bumping the event counters in one transaction.
+
+Usage:
+    python benchmarks/sqlite_profiles.py [--threads 16] [--seconds 10] [--write-ratio 0.2]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sqlalchemy import create_engine, select, insert, update
+from sqlalchemy.exc import OperationalError
+from config import ENGINE_PROFILES, SQLITE_PROFILES, engine_options
+from db_tuning import apply_sqlite_pragmas
+from models import db, Event, Guest
+
+events_table = Event.__table__
+guests_table = Guest.__table__
+
+
+def make_engine(path, profile):
+    uri = f'sqlite:///{path}'
+    if profile is None:
+        return create_engine(uri)
+    engine = create_engine(uri, **engine_options(uri, profile))
+    apply_sqlite_pragmas(engine, SQLITE_PROFILES[profile])
+    return engine
+
+
+def seed(engine, events=50, guests_per_event=200):
+    db.metadata.create_all(engine)
+    now = datetime.utcnow()
+    with engine.begin() as conn:
+        conn.execute(insert(events_table), [
+            {'name': f'Event {i}', 'event_date': date(2030, 1, 1), 'created_at': now,
+             'guest_row_count': guests_per_event, 'headcount': guests_per_event}
+            for i in range(events)
+        ])
+        conn.execute(insert(guests_table), [
+            {'event_id': e + 1, 'name': f'Guest {e}-{g}', 'guest_count': 1,
+             'rsvp_status': 'Pending', 'created_at': now}
+            for e in range(events) for g in range(guests_per_event)
+        ])
+    return events
+
+
+def run(engine, event_count, threads, seconds, write_ratio):
+    stop = time.monotonic() + seconds
+    latencies = {'read': [], 'write': []}
+    errors = [0]
+    lock = threading.Lock()
+
+    read_stmt = (select(guests_table.c.id, guests_table.c.name, events_table.c.name)
+                 .join(events_table, events_table.c.id == guests_table.c.event_id)
+                 .order_by(guests_table.c.created_at.desc(), guests_table.c.id.desc())
+                 .limit(50))
+
+    def worker():
+        rng = random.Random()
+        local = {'read': [], 'write': []}
+        local_errors = 0
+        while time.monotonic() < stop:
+            event_id = rng.randint(1, event_count)
+            kind = 'write' if rng.random() < write_ratio else 'read'
+            started = time.perf_counter()
+            try:
+                if kind == 'read':
+                    with engine.connect() as conn:
+                        conn.execute(read_stmt.where(guests_table.c.event_id == event_id)).all()
+                else:
+                    with engine.begin() as conn:
+                        conn.execute(insert(guests_table).values(
+                            event_id=event_id, name='Bench', guest_count=1,
+                            rsvp_status='Pending', created_at=datetime.utcnow()))
+                        conn.execute(update(events_table).where(events_table.c.id == event_id).values(
+                            guest_row_count=events_table.c.guest_row_count + 1,
+                            headcount=events_table.c.headcount + 1))
+            except OperationalError:
+                local_errors += 1
+                continue
+            local[kind].append(time.perf_counter() - started)
+        with lock:
+            for k in local:
+                latencies[k].extend(local[k])
+            errors[0] += local_errors
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return latencies, errors[0]
+
+
+def p95(values):
+    return statistics.quantiles(values, n=20)[-1] * 1000 if len(values) >= 20 else float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    parser.add_argument('--profile', choices=sorted(ENGINE_PROFILES), default='production')
+    args = parser.parse_args()
+
+    print(f'{"config":<10} {"ops/s":>9} {"reads/s":>9} {"writes/s":>9} '
+          f'{"read p95":>10} {"write p95":>10} {"errors":>7}')
+    for label, profile in (('baseline', None), ('tuned', args.profile)):
+        path = os.path.join(tempfile.mkdtemp(), 'bench.db')
+        engine = make_engine(path, profile)
+        event_count = seed(engine)
+        latencies, errors = run(engine, event_count, args.threads, args.seconds, args.write_ratio)
+        reads, writes = len(latencies['read']), len(latencies['write'])
+        print(f'{label:<10} {(reads + writes) / args.seconds:>9.0f} {reads / args.seconds:>9.0f} '
+              f'{writes / args.seconds:>9.0f} {p95(latencies["read"]):>8.1f}ms '
+              f'{p95(latencies["write"]):>8.1f}ms {errors:>7}')
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
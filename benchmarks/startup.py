@@ -0,0 +1,83 @@
+"""
+Startup time budget check.
+
+Boots the app the way a worker or CLI invocation does - a fresh
+interpreter running `import app; create_app()` - several times and reports
+the median and worst wall time of the import plus factory call, and of the
+whole process. Fails when the median boot exceeds --budget-ms or when
+creating the app opens a database connection (schema work belongs in
+`flask init-db`, not in every boot).
+
+The default budget of 1000ms leaves headroom over a typical ~0.5s boot,
+nearly all of it importing Flask and SQLAlchemy.
+
+Usage:
+    python benchmarks/startup.py [--runs 7] [--budget-ms 1000] [--profile production]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BOOT = '''
+import json, sys, time
+started = time.perf_counter()
+from sqlalchemy import event
+from sqlalchemy.pool import Pool
+connects = []
+event.listen(Pool, 'connect', lambda *args: connects.append(1))
+from app import create_app
+app = create_app(sys.argv[1] or None)
+print(json.dumps({'boot_ms': (time.perf_counter() - started) * 1000, 'connects': len(connects)}))
+'''
+
+
+def boot_once(profile):
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', BOOT, profile or ''], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    process_ms = (time.perf_counter() - started) * 1000
+    sample = json.loads(result.stdout.strip().splitlines()[-1])
+    sample['process_ms'] = process_ms
+    return sample
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--runs', type=int, default=7)
+    parser.add_argument('--budget-ms', type=float, default=1000.0,
+                        help='Maximum median time for import + create_app()')
+    parser.add_argument('--profile', help='Deployment profile passed to create_app()')
+    args = parser.parse_args()
+
+    boot_once(args.profile)  # warm the bytecode and OS file caches
+    samples = [boot_once(args.profile) for _ in range(args.runs)]
+    boot = sorted(s['boot_ms'] for s in samples)
+    process = sorted(s['process_ms'] for s in samples)
+    connects = max(s['connects'] for s in samples)
+
+    print(f'import + create_app(): median {statistics.median(boot):.0f}ms, max {boot[-1]:.0f}ms '
+          f'(budget {args.budget_ms:.0f}ms)')
+    print(f'whole process:         median {statistics.median(process):.0f}ms, max {process[-1]:.0f}ms')
+    print(f'database connections during boot: {connects}')
+
+    problems = []
+    if statistics.median(boot) > args.budget_ms:
+        problems.append(f'median boot {statistics.median(boot):.0f}ms is over the {args.budget_ms:.0f}ms budget')
+    if connects:
+        problems.append('creating the app connected to the database')
+    if problems:
+        for problem in problems:
+            print(f'FAIL: {problem}')
+        raise SystemExit(1)
+    print('Within budget')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Vendor booking routes.
+"""
+
+from datetime import datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from models import db, Event, Booking, with_event_name, event_choices
+from pagination import list_filters, paginate
+
+bookings_bp = Blueprint('bookings', __name__)
+
+
+@bookings_bp.route('/bookings')
+def bookings_list():
+    """List all bookings"""
+    query, filters = list_filters(Booking.query.options(with_event_name(Booking.event)), {
+        'event_id': Booking.event_id,
+        'booking_type': Booking.booking_type,
+        'status': Booking.status
+    })
+    bookings = paginate(query, (Booking.created_at, Booking.id))
+    return render_template('bookings/list.html', bookings=bookings, filters=filters,
+                         events=event_choices())
+
+
+@bookings_bp.route('/bookings/create', methods=['GET', 'POST'])
+def booking_create():
+    """Create a new booking"""
+    if request.method == 'POST':
+        try:
+            # Automatically set status to Confirmed instead of Pending
+            booking = Booking(
+                event_id=int(request.form['event_id']),
+                booking_type=request.form['booking_type'],
+                vendor_name=request.form['vendor_name'],
+                description=request.form.get('description'),
+                cost=float(request.form.get('cost', 0)),
+                booking_date=datetime.strptime(request.form['booking_date'], '%Y-%m-%d').date() if request.form.get('booking_date') else None,
+                status='Confirmed',  # Auto-confirm bookings
+                contact_info=request.form.get('contact_info'),
+                notes=request.form.get('notes')
+            )
+            db.session.add(booking)
+            db.session.commit()
+            flash('Booking created and automatically confirmed!', 'success')
+            return redirect(url_for('bookings.bookings_list'))
+        except Exception as e:
+            flash(f'Error creating booking: {str(e)}', 'error')
+            db.session.rollback()
+    
+    events = Event.query.all()
+    return render_template('bookings/create.html', events=events)
+
+
+@bookings_bp.route('/bookings/<int:id>/edit', methods=['GET', 'POST'])
+def booking_edit(id):
+    """Edit a booking"""
+    booking = Booking.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        try:
+            booking.event_id = int(request.form['event_id'])
+            booking.booking_type = request.form['booking_type']
+            booking.vendor_name = request.form['vendor_name']
+            booking.description = request.form.get('description')
+            booking.cost = float(request.form.get('cost', 0))
+            booking.booking_date = datetime.strptime(request.form['booking_date'], '%Y-%m-%d').date() if request.form.get('booking_date') else None
+            booking.status = request.form.get('status', 'Pending')
+            booking.contact_info = request.form.get('contact_info')
+            booking.notes = request.form.get('notes')
+            
+            db.session.commit()
+            flash('Booking updated successfully!', 'success')
+            return redirect(url_for('bookings.bookings_list'))
+        except Exception as e:
+            flash(f'Error updating booking: {str(e)}', 'error')
+            db.session.rollback()
+    
+    events = Event.query.all()
+    return render_template('bookings/edit.html', booking=booking, events=events)
+
+
+@bookings_bp.route('/bookings/<int:id>/delete', methods=['POST'])
+def booking_delete(id):
+    """Delete a booking"""
+    try:
+        booking = Booking.query.get_or_404(id)
+        db.session.delete(booking)
+        db.session.commit()
+        flash('Booking deleted successfully!', 'success')
+    except Exception as e:
+        flash(f'Error deleting booking: {str(e)}', 'error')
+        db.session.rollback()
+    
+    return redirect(url_for('bookings.bookings_list'))
@@ -0,0 +1,148 @@
+"""
+Set-based bulk updates of guests and bookings.
+
+A patch such as {"rsvp_status": "Accepted"} is applied to a list of ids
+with a single UPDATE ... WHERE id IN (...), in one transaction, instead of
+loading and saving each row through the ORM.
+
+Fields that feed the per-event counters (guest_count, cost) are handled
+without touching individual rows as well. One grouped SELECT (locking the
+rows on MySQL) gives the current per-event totals, and the differences are
+written with counters.apply_deltas. Extra seats therefore go through the
+same venue capacity check as single edits. Booking status and cost changes
+also update the spend rollups (analytics.py). Cached pages for every
+affected event are invalidated on commit.
+"""
+
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+from sqlalchemy import func, select, update
+from models import db, Guest, Booking
+from counters import apply_deltas
+from cache import mark_events_dirty
+from deletion import event_not_deleted
+from validators import validate_guest_count
+from analytics import ROLLUP_ATTRIBUTES, apply_rollup_deltas, bulk_patch_deltas
+
+MAX_BULK_IDS = 10000
+
+# Fields a bulk patch may set, per model
+BULK_FIELDS = {
+    Guest: ('rsvp_status', 'dietary_requirements', 'guest_count'),
+    Booking: ('status', 'notes', 'cost'),
+}
+
+# Patchable field -> Event counter column it feeds
+COUNTER_FIELDS = {
+    Guest: {'guest_count': 'headcount'},
+    Booking: {'cost': 'booking_cost_total'},
+}
+
+
+class BulkUpdateError(ValueError):
+    """Raised for an invalid id list or patch"""
+
+
+def parse_ids(ids):
+    """Validate a list of ids; returns them de-duplicated and sorted"""
+    if not isinstance(ids, list) or not ids:
+        raise BulkUpdateError('ids must be a non-empty list of integers')
+    if len(ids) > MAX_BULK_IDS:
+        raise BulkUpdateError(f'At most {MAX_BULK_IDS} ids per request')
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in ids):
+        raise BulkUpdateError('ids must be a non-empty list of integers')
+    return sorted(set(ids))
+
+
+def parse_patch(model, patch):
+    """Validate a {field: value} patch against the model's bulk-editable fields"""
+    if not isinstance(patch, dict) or not patch:
+        raise BulkUpdateError('patch must be a non-empty object')
+    unknown = [name for name in patch if name not in BULK_FIELDS[model]]
+    if unknown:
+        raise BulkUpdateError(f'Fields cannot be bulk-updated: {", ".join(unknown)}')
+
+    values = {}
+    for name, value in patch.items():
+        column = getattr(model, name)
+        choices = getattr(column.type, 'enums', None)
+        if choices is not None:
+            if value not in choices:
+                raise BulkUpdateError(f'{name} must be one of: {", ".join(choices)}')
+        elif name == 'guest_count':
+            if not validate_guest_count(value):
+                raise BulkUpdateError('guest_count must be a positive integer')
+        elif name == 'cost':
+            try:
+                value = Decimal(str(value))
+            except InvalidOperation:
+                raise BulkUpdateError('cost must be a number')
+            if not value.is_finite() or value < 0:
+                raise BulkUpdateError('cost must be a non-negative number')
+        elif value is not None and not isinstance(value, str):
+            raise BulkUpdateError(f'{name} must be a string or null')
+        values[name] = value
+    return values
+
+
+def _counter_deltas(model, id_filter, values):
+    """Per-event counter changes the patch will cause, from current row totals"""
+    fields = [name for name in COUNTER_FIELDS[model] if name in values]
+    columns = [func.coalesce(func.sum(getattr(model, name)), 0) for name in fields]
+    rows = db.session.execute(
+        select(model.event_id, func.count(model.id), *columns)
+        .where(id_filter)
+        .group_by(model.event_id)
+        .with_for_update()
+    )
+    deltas = defaultdict(dict)
+    event_ids = set()
+    for event_id, matched, *totals in rows:
+        event_ids.add(event_id)
+        for name, total in zip(fields, totals):
+            if name == 'cost':
+                delta = matched * values[name] - Decimal(str(total))
+            else:
+                delta = matched * values[name] - int(total)
+            if delta:
+                deltas[event_id][COUNTER_FIELDS[model][name]] = delta
+    return deltas, event_ids
+
+
+def bulk_update(model, ids, values):
+    """
+    Apply a validated patch to every existing row in `ids`, in one transaction.
+
+    Returns the number of rows matched. Raises CapacityExceeded (after
+    rolling back) if a guest_count increase does not fit an event's venue.
+    """
+    id_filter = model.id.in_(ids)
+    session = db.session
+    try:
+        if any(name in values for name in COUNTER_FIELDS[model]):
+            deltas, event_ids = _counter_deltas(model, id_filter, values)
+            apply_deltas(session.connection(), deltas)
+        else:
+            event_ids = set(session.scalars(select(model.event_id).where(id_filter).distinct()))
+
+        rollup_deltas = None
+        if model is Booking and any(name in values for name in ROLLUP_ATTRIBUTES):
+            rows = session.execute(
+                select(*[getattr(Booking, name) for name in ROLLUP_ATTRIBUTES])
+                .where(id_filter).with_for_update()
+            ).all()
+            rollup_deltas = bulk_patch_deltas(rows, values)
+
+        result = session.execute(
+            # The SELECTs above skip rows of soft-deleted events (loader criteria); so must the UPDATE
+            update(model).where(id_filter, event_not_deleted(model)).values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        if rollup_deltas:
+            apply_rollup_deltas(session.connection(), rollup_deltas)
+        mark_events_dirty(session, event_ids)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return result.rowcount
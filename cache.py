@@ -0,0 +1,390 @@
+"""
+Read-through cache for hot read routes.
+
+Backends:
+    memory  - in-process LRU with TTL (default outside production). One cache
+              per process, and invalidation only reaches the process that
+              committed: run a single worker process with it
+    socket  - client for a shared LRU served over a local Unix socket by
+              `flask cache-server`, so several gunicorn workers share entries
+              and invalidations (default for the production profile; without
+              a running server every lookup is a miss)
+    null    - caching disabled
+
+Entries are invalidated when a transaction that touched an event, or one of
+its guests or bookings, commits. Keys carry a generation counter that the
+commit bumps: per-event pages that event's own counter, so only its entries
+are retired, and the dashboard and list pages a counter shared by all
+events. Deleting the keys instead would race with a reader that computed
+from the state before the commit and stores its value after the delete;
+with versioned keys that value lands under a retired key and is never
+served.
+
+With a read replica (see replicas.py), entries missed within
+REPLICA_STICKY_SECONDS of an invalidation are recomputed on the primary:
+the replica may not have the write yet, and a stale value would otherwise
+be served until it expires.
+"""
+
+import contextlib
+import os
+import pickle
+import socket
+import socketserver
+import struct
+import threading
+import time
+from collections import OrderedDict
+from types import SimpleNamespace
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from models import Event, Guest, Booking
+from replicas import replica_configured, use_primary
+
+_MISSING = object()
+_SOCKET_MISS = '\x00cache-miss'
+
+# Generation counters bumped whenever any event-related row changes, and per event
+LIST_GENERATION_KEY = 'gen:events'
+EVENT_GENERATION_KEY = 'gen:event:{}'
+RECENT_WRITE_KEY = 'gen:events:recent'
+
+
+class LRUCache:
+    """Thread-safe LRU cache with a per-entry time to live"""
+
+    def __init__(self, max_entries=1024, ttl=300):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key in self._counters:
+                return self._counters[key]
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_many(self, keys):
+        """{key: value} for the keys that are cached"""
+        found = {}
+        for key in keys:
+            value = self.get(key, _MISSING)
+            if value is not _MISSING:
+                found[key] = value
+        return found
+
+    def set_many(self, mapping, ttl=None):
+        for key, value in mapping.items():
+            self.set(key, value, ttl)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def incr(self, key):
+        # Counters live outside the LRU so a generation can never be evicted and reset
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._counters = {k: v + 1 for k, v in self._counters.items()}
+
+    def stats(self):
+        with self._lock:
+            return {
+                'backend': 'memory',
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+
+class NullCache:
+    """Backend that never stores anything"""
+
+    def get(self, key, default=None):
+        return default
+
+    def set(self, key, value, ttl=None):
+        pass
+
+    def get_many(self, keys):
+        return {}
+
+    def set_many(self, mapping, ttl=None):
+        pass
+
+    def delete(self, *keys):
+        pass
+
+    def incr(self, key):
+        return 0
+
+    def clear(self):
+        pass
+
+    def stats(self):
+        return {'backend': 'null'}
+
+
+# ---- Shared cache over a Unix socket ----
+#
+# Frames are a 4-byte big-endian length followed by a pickled payload.
+# Requests are (method, args) tuples; responses are (ok, result) tuples.
+
+def _send(sock, payload):
+    data = pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)
+    sock.sendall(struct.pack('>I', len(data)) + data)
+
+
+def _recv(sock):
+    header = _recv_exactly(sock, 4)
+    if header is None:
+        return None
+    (length,) = struct.unpack('>I', header)
+    return pickle.loads(_recv_exactly(sock, length))
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+class _CacheRequestHandler(socketserver.BaseRequestHandler):
+    ALLOWED = {'get', 'set', 'get_many', 'set_many', 'delete', 'incr', 'clear', 'stats'}
+    BUCKET_METHODS = {'take', 'reset'}  # shared login rate limits (ratelimit.py)
+
+    def handle(self):
+        while True:
+            message = _recv(self.request)
+            if message is None:
+                return
+            method, args = message
+            if method in self.ALLOWED:
+                target = self.server.backend
+            elif method in self.BUCKET_METHODS:
+                target = self.server.buckets
+            else:
+                _send(self.request, (False, f'unknown method {method}'))
+                continue
+            _send(self.request, (True, getattr(target, method)(*args)))
+
+
+class _CacheServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve_cache(path, max_entries=1024, ttl=300):
+    """Run a shared LRU cache (and rate limit buckets) on a Unix socket until interrupted"""
+    from ratelimit import TokenBuckets
+
+    if os.path.exists(path):
+        os.unlink(path)
+    server = _CacheServer(path, _CacheRequestHandler)
+    os.chmod(path, 0o600)
+    server.backend = LRUCache(max_entries, ttl)
+    server.buckets = TokenBuckets()
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(path)
+
+
+class SocketCache:
+    """Client for serve_cache(); one connection per thread, misses if the server is down"""
+
+    def __init__(self, path, timeout=0.5):
+        self.path = path
+        self.timeout = timeout
+        self.errors = 0
+        self._local = threading.local()
+
+    def _call(self, method, *args, default=None):
+        for attempt in range(2):
+            sock = getattr(self._local, 'sock', None)
+            try:
+                if sock is None:
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                    sock.settimeout(self.timeout)
+                    sock.connect(self.path)
+                    self._local.sock = sock
+                _send(sock, (method, args))
+                response = _recv(sock)
+                if response is None:
+                    raise ConnectionError('cache server closed the connection')
+                ok, result = response
+                return result if ok else default
+            except OSError:
+                if sock is not None:
+                    sock.close()
+                self._local.sock = None
+        self.errors += 1
+        return default
+
+    def get(self, key, default=None):
+        # Sentinels don't survive pickling, so misses come back as a marker string
+        value = self._call('get', key, _SOCKET_MISS, default=_SOCKET_MISS)
+        return default if value == _SOCKET_MISS else value
+
+    def set(self, key, value, ttl=None):
+        self._call('set', key, value, ttl)
+
+    def get_many(self, keys):
+        return self._call('get_many', list(keys), default={}) or {}
+
+    def set_many(self, mapping, ttl=None):
+        self._call('set_many', mapping, ttl)
+
+    def delete(self, *keys):
+        self._call('delete', *keys)
+
+    def incr(self, key):
+        return self._call('incr', key, default=0)
+
+    def clear(self):
+        self._call('clear')
+
+    def stats(self):
+        stats = self._call('stats', default={}) or {}
+        stats.update(backend='socket', path=self.path, client_errors=self.errors)
+        return stats
+
+
+class Cache:
+    """Facade over the configured backend; safe to import before init_app()"""
+
+    def __init__(self):
+        self.backend = NullCache()
+        self.replica_lag = 0
+
+    def init_app(self, app):
+        self.replica_lag = app.config['REPLICA_STICKY_SECONDS'] if replica_configured(app) else 0
+        kind = app.config.get('CACHE_BACKEND', 'memory')
+        if kind == 'memory':
+            self.backend = LRUCache(app.config.get('CACHE_MAX_ENTRIES', 1024),
+                                    app.config.get('CACHE_TTL', 300))
+        elif kind == 'socket':
+            self.backend = SocketCache(app.config['CACHE_SOCKET_PATH'])
+        elif kind == 'null':
+            self.backend = NullCache()
+        else:
+            raise ValueError(f'Unknown CACHE_BACKEND: {kind}')
+
+    def get_or_set(self, key, compute, ttl=None):
+        """Return the cached value for key, computing and storing it on a miss"""
+        value = self.backend.get(key, _MISSING)
+        if value is _MISSING:
+            recent_write = self.replica_lag and self.backend.get(RECENT_WRITE_KEY)
+            with use_primary() if recent_write else contextlib.nullcontext():
+                value = compute()
+            self.backend.set(key, value, ttl)
+        return value
+
+    def list_key(self, name, *parts):
+        """Key for a list/aggregate view, versioned by the event generation counter"""
+        generation = self.backend.get(LIST_GENERATION_KEY, 0)
+        return ':'.join([name, str(generation)] + [str(p) for p in parts])
+
+    def event_key(self, name, event_id):
+        """Key for a per-event view, versioned by that event's generation counter"""
+        generation = self.backend.get(EVENT_GENERATION_KEY.format(event_id), 0)
+        return f'{name}:{event_id}:{generation}'
+
+    def invalidate_events(self, event_ids):
+        """Retire these events' entries and every list/aggregate entry"""
+        for event_id in event_ids:
+            self.backend.incr(EVENT_GENERATION_KEY.format(event_id))
+        self.backend.incr(LIST_GENERATION_KEY)
+        if self.replica_lag:
+            self.backend.set(RECENT_WRITE_KEY, True, self.replica_lag)
+
+    def stats(self):
+        return self.backend.stats()
+
+
+cache = Cache()
+
+
+def snapshot(obj):
+    """Plain, picklable copy of an ORM object's loaded column values"""
+    state = inspect(obj)
+    return SimpleNamespace(**{
+        attr.key: state.dict[attr.key]
+        for attr in state.mapper.column_attrs if attr.key in state.dict
+    })
+
+
+# ---- Invalidation on commit ----
+
+def _affected_event_ids(obj):
+    """Old and new event ids touched by a flushed object, read without lazy loads"""
+    state = inspect(obj)
+    if isinstance(obj, Event):
+        return set(state.identity or ())
+    if isinstance(obj, (Guest, Booking)):
+        return set(state.attrs.event_id.history.sum())
+    return set()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_dirty_events(session, flush_context):
+    dirty = session.info.setdefault('cache_dirty_events', set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        dirty.update(_affected_event_ids(obj))
+    dirty.discard(None)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_on_commit(session):
+    dirty = session.info.pop('cache_dirty_events', None)
+    if dirty:
+        cache.invalidate_events(dirty)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_dirty_events(session):
+    session.info.pop('cache_dirty_events', None)
+
+
+def mark_events_dirty(session, event_ids):
+    """Invalidate these events on commit; for writes that bypass the ORM unit of work"""
+    session.info.setdefault('cache_dirty_events', set()).update(event_ids)
@@ -0,0 +1,261 @@
+"""
+Flask CLI commands (flask <command>).
+
+Schema management is explicit: `flask init-db` (or `flask db upgrade`)
+runs the Alembic migrations in migrations/, which create missing tables
+together with their search and spatial indexes. Nothing touches the
+database while the app is being created.
+"""
+
+import time
+import click
+from flask import current_app
+from flask.cli import AppGroup, with_appcontext
+from models import db, Event
+import schema
+from counters import rebuild_event_counters
+from guest_import import import_guests, detect_format, FORMATS
+import db_metrics
+from cache import serve_cache
+import notifications
+import deletion
+from search import rebuild_search_index
+from geo import rebuild_geo_index
+from analytics import rebuild_rollups
+import assets
+import replicas
+
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create the database or migrate it to the latest schema"""
+    schema.upgrade()
+    print('Database schema is up to date')
+
+
+db_command = AppGroup('db', help='Schema migrations (Alembic, see schema.py)')
+
+
+@db_command.command('upgrade')
+@click.argument('revision', default='head')
+def db_upgrade_command(revision):
+    """Apply migrations up to REVISION (default: head)"""
+    schema.upgrade(revision)
+
+
+@db_command.command('downgrade')
+@click.argument('revision')
+def db_downgrade_command(revision):
+    """Revert migrations down to REVISION"""
+    from alembic import command
+    command.downgrade(schema.alembic_config(), revision)
+
+
+@db_command.command('current')
+def db_current_command():
+    """Show the revision the database is at"""
+    from alembic import command
+    command.current(schema.alembic_config())
+
+
+@db_command.command('history')
+def db_history_command():
+    """List the migrations"""
+    from alembic import command
+    command.history(schema.alembic_config())
+
+
+@db_command.command('stamp')
+@click.argument('revision')
+def db_stamp_command(revision):
+    """Record REVISION as applied without running any migration"""
+    from alembic import command
+    command.stamp(schema.alembic_config(), revision)
+
+
+@db_command.command('revision')
+@click.option('-m', '--message', required=True)
+@click.option('--autogenerate', is_flag=True, help='Diff the models against the database')
+def db_revision_command(message, autogenerate):
+    """Create a new migration script in migrations/versions"""
+    from alembic import command
+    command.revision(schema.alembic_config(), message=message, autogenerate=autogenerate)
+
+
+@click.command('explain-indexes')
+@with_appcontext
+def explain_indexes_command():
+    """Fail if a hot query does not use its index (see schema.ACCESS_PATHS)"""
+    failures = schema.check_access_paths()
+    if failures:
+        raise SystemExit(f'{len(failures)} access path(s) not served by their index')
+    print('All access paths use their indexes')
+
+
+@click.command('rebuild-counters')
+@with_appcontext
+def rebuild_counters_command():
+    """Recompute per-event guest/booking counters from scratch"""
+    updated = rebuild_event_counters()
+    print(f'Rebuilt counters for {updated} events')
+
+
+def budget_sample_args():
+    """url_for() arguments for the budgeted routes that need them, from the first event; None if unseeded"""
+    sample_event = db.session.query(Event.id, Event.latitude, Event.longitude).first()
+    if sample_event is None:
+        return None
+    return {
+        'events.event_detail': {'id': sample_event.id},
+        'api.list_resources': {'resource_name': 'guests'},
+        'api.get_resource': {'resource_name': 'events', 'id': sample_event.id},
+        'api.events_nearby': {'lat': sample_event.latitude or 28.61, 'lon': sample_event.longitude or 77.21,
+                              'radius_km': 50},
+        'main.search_page': {'q': 'event'},
+    }
+
+
+@click.command('check-query-budgets')
+@with_appcontext
+def check_query_budgets_command():
+    """Fail if any budgeted route issues more SQL statements than allowed"""
+    sample_args = budget_sample_args()
+    if sample_args is None:
+        raise SystemExit('Seed the database first (python setup_database_sqlite.py)')
+    failures = db_metrics.check_query_budgets(current_app, sample_args)
+    if failures:
+        raise SystemExit(f'{len(failures)} route(s) over query budget or with an unexpected status')
+    print('All routes within query budget')
+
+
+@click.command('cache-server')
+@with_appcontext
+def cache_server_command():
+    """Serve a shared cache on CACHE_SOCKET_PATH for CACHE_BACKEND=socket workers"""
+    path = current_app.config['CACHE_SOCKET_PATH']
+    print(f'Serving cache on {path}')
+    serve_cache(path, current_app.config['CACHE_MAX_ENTRIES'], current_app.config['CACHE_TTL'])
+
+
+@click.command('import-guests')
+@with_appcontext
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(FORMATS), help='Defaults to the file extension')
+@click.option('--batch-size', type=int, help='Rows per insert batch (default IMPORT_BATCH_SIZE)')
+def import_guests_command(path, fmt, batch_size):
+    """Bulk-import guests from a CSV or JSONL file"""
+    with open(path, 'rb') as stream:
+        report = import_guests(stream, fmt or detect_format(path),
+                               batch_size=batch_size or current_app.config['IMPORT_BATCH_SIZE'],
+                               max_errors=current_app.config['IMPORT_MAX_ERRORS'])
+    for error in report.errors:
+        print(f"line {error['line']}: {error['error']}")
+    print(f'Imported {report.imported} guests, rejected {report.rejected}')
+
+
+@click.command('search-rebuild')
+@with_appcontext
+def search_rebuild_command():
+    """Create missing full-text indexes and repopulate them"""
+    rebuild_search_index()
+    print('Search index rebuilt')
+
+
+@click.command('geo-rebuild')
+@with_appcontext
+def geo_rebuild_command():
+    """Create the spatial index for event venues if missing and repopulate it"""
+    rebuild_geo_index()
+    print('Spatial index rebuilt')
+
+
+@click.command('rebuild-rollups')
+@with_appcontext
+def rebuild_rollups_command():
+    """Recompute the booking spend rollups from scratch"""
+    rows = rebuild_rollups()
+    print(f'Rebuilt {rows} rollup rows')
+
+
+@click.command('outbox-worker')
+@with_appcontext
+@click.option('--processes', default=1, show_default=True, help='Worker processes to run')
+@click.option('--once', is_flag=True, help='Exit when no messages are due')
+def outbox_worker_command(processes, once):
+    """Deliver queued invitations and OTP codes"""
+    notifications.run_workers(current_app._get_current_object(), processes=processes, once=once)
+
+
+@click.command('purge-worker')
+@with_appcontext
+@click.option('--once', is_flag=True, help='Exit when no deleted events are left')
+def purge_worker_command(once):
+    """Purge soft-deleted events and their guests and bookings in batches"""
+    deletion.run_purger(current_app._get_current_object(), once=once)
+
+
+@click.command('assets-vendor')
+@with_appcontext
+@click.option('--overwrite', is_flag=True, help='Download files that are already present again')
+def assets_vendor_command(overwrite):
+    """Download the pinned third-party assets into static/vendor/"""
+    fetched = assets.vendor_assets(current_app.static_folder, overwrite=overwrite)
+    print(f'Fetched {len(fetched)} of {len(assets.VENDOR_ASSETS)} vendored assets')
+
+
+@click.command('assets-check')
+@with_appcontext
+def assets_check_command():
+    """Fail unless every vendored asset is present and matches static/vendor/SHA256SUMS"""
+    problems = assets.check_vendor_assets(current_app.static_folder)
+    for problem in problems:
+        print(problem)
+    if problems:
+        raise click.ClickException(f'{len(problems)} vendored asset problem(s); run flask assets-vendor')
+    print(f'All {len(assets.VENDOR_ASSETS)} vendored assets present and verified')
+
+
+@click.command('assets-build')
+@with_appcontext
+def assets_build_command():
+    """Fingerprint and precompress static assets into static/dist/"""
+    try:
+        manifest = assets.build_assets(current_app.static_folder)
+    except FileNotFoundError as e:
+        raise click.ClickException(str(e))
+    print(f'Built {len(manifest)} assets')
+
+
+@click.command('replica-sync')
+@with_appcontext
+@click.option('--interval', type=float, help='Keep syncing every INTERVAL seconds')
+def replica_sync_command(interval):
+    """Refresh a local SQLite replica from the primary file (development stand-in for replication)"""
+    if not replicas.replica_configured(current_app):
+        raise click.ClickException('REPLICA_DATABASE_URL is not set')
+    primary = replicas.sqlite_path(current_app.config['SQLALCHEMY_DATABASE_URI'])
+    replica = replicas.sqlite_path(current_app.config['REPLICA_DATABASE_URI'])
+    if primary is None or replica is None:
+        raise click.ClickException('replica-sync copies SQLite files; use database replication for servers')
+    timeout = current_app.config['SQLITE_PRAGMAS'].get('busy_timeout', 5000) / 1000
+    while True:
+        elapsed = replicas.sync_sqlite_replica(primary, replica, timeout=timeout)
+        print(f'Copied {primary} to {replica} in {elapsed * 1000:.0f} ms')
+        if not interval:
+            return
+        time.sleep(interval)
+
+
+COMMANDS = [
+    init_db_command, db_command, explain_indexes_command, rebuild_counters_command, check_query_budgets_command, cache_server_command,
+    import_guests_command, search_rebuild_command, geo_rebuild_command, rebuild_rollups_command,
+    outbox_worker_command, purge_worker_command, assets_vendor_command, assets_check_command, assets_build_command,
+    replica_sync_command,
+]
+
+
+def init_app(app):
+    """Register the CLI commands on app"""
+    for command in COMMANDS:
+        app.cli.add_command(command)
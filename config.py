@@ -5,6 +5,86 @@ from urllib.parse import quote_plus
 # Load environment variables
 load_dotenv()
 
+
+# Connection pool settings per deployment profile (DB_PROFILE)
+ENGINE_PROFILES = {
+    'development': {
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_recycle': 3600,
+        'pool_pre_ping': False,
+    },
+    'production': {
+        'pool_size': 20,
+        'max_overflow': 20,
+        'pool_timeout': 10,
+        'pool_recycle': 280,  # below MySQL's default wait_timeout on managed hosts
+        'pool_pre_ping': True,
+    },
+    'testing': {
+        'pool_size': 2,
+        'max_overflow': 0,
+        'pool_recycle': -1,
+        'pool_pre_ping': False,
+    },
+}
+
+# PRAGMAs applied to every new SQLite connection, per deployment profile.
+# WAL lets readers run alongside the single writer; synchronous=NORMAL is
+# durable across application crashes in WAL mode; busy_timeout makes
+# writers queue instead of failing with "database is locked"; foreign_keys
+# turns on ON DELETE CASCADE (see deletion.py).
+SQLITE_PROFILES = {
+    'development': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 5000,
+        'cache_size': -16000,       # KiB (negative = size, not pages)
+        'mmap_size': 67108864,
+        'foreign_keys': 'ON',
+    },
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 10000,
+        'cache_size': -64000,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'foreign_keys': 'ON',
+    },
+    'testing': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'busy_timeout': 5000,
+        'foreign_keys': 'ON',
+    },
+}
+
+
+def engine_options(uri, profile):
+    """SQLALCHEMY_ENGINE_OPTIONS for a database URI under a deployment profile"""
+    options = dict(ENGINE_PROFILES[profile])
+    if uri.startswith('sqlite'):
+        if ':memory:' in uri or uri.rstrip('/') == 'sqlite:':
+            return {}  # in-memory databases use a static single-connection pool
+        # One local file: there is no server to drop idle connections
+        options.pop('pool_recycle', None)
+        options.pop('pool_pre_ping', None)
+    return options
+
+
+def cache_backend(profile):
+    """CACHE_BACKEND, or the profile default: production runs several workers, which must share one cache"""
+    return os.getenv('CACHE_BACKEND') or ('socket' if profile == 'production' else 'memory')
+
+
+def database_binds(replica_uri, profile):
+    """SQLALCHEMY_BINDS: the read replica (see replicas.py), if one is configured"""
+    if not replica_uri:
+        return {}
+    return {'replica': dict(engine_options(replica_uri, profile), url=replica_uri)}
+
+
 class Config:
     """Application configuration class"""
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -28,5 +108,134 @@ class Config:
         # SQLAlchemy configuration
         SQLALCHEMY_DATABASE_URI = f'mysql+pymysql://{DB_USER}:{encoded_password}@{DB_HOST}/{DB_NAME}'
     
+    # Explicit connection URL (e.g. a scratch SQLite file for load tests) overrides the above
+    SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', SQLALCHEMY_DATABASE_URI)
+    
+    # Deployment profile: 'development', 'production' or 'testing'
+    DB_PROFILE = os.getenv('DB_PROFILE', 'development')
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI, DB_PROFILE)
+    SQLITE_PRAGMAS = SQLITE_PROFILES[DB_PROFILE]
+    
+    # Read replica (see replicas.py): GET requests read from it; a client that
+    # wrote reads from the primary for REPLICA_STICKY_SECONDS afterwards
+    REPLICA_DATABASE_URI = os.getenv('REPLICA_DATABASE_URL')
+    SQLALCHEMY_BINDS = database_binds(REPLICA_DATABASE_URI, DB_PROFILE)
+    REPLICA_STICKY_SECONDS = float(os.getenv('REPLICA_STICKY_SECONDS', 5))
+    
     SQLALCHEMY_TRACK_MODIFICATIONS = False
-    SQLALCHEMY_ECHO = True
+    # Statement echo is for local debugging only; use the slow query log instead
+    SQLALCHEMY_ECHO = os.getenv('SQLALCHEMY_ECHO', 'False').lower() == 'true'
+    
+    # Request instrumentation (see db_metrics.py)
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+    SERVER_TIMING = os.getenv('SERVER_TIMING', 'True').lower() == 'true'
+    
+    # List pagination (keyset/cursor based)
+    PAGE_SIZE = int(os.getenv('PAGE_SIZE', 50))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 200))
+    
+    # Maximum SQL statements per request, per endpoint (see db_metrics.py)
+    QUERY_BUDGETS = {
+        'main.dashboard': 4,
+        'main.reports': 3,
+        'events.events_list': 1,
+        'events.event_detail': 4,
+        'guests.guests_list': 2,
+        'bookings.bookings_list': 2,
+        'api.list_resources': 1,
+        'api.get_resource': 1,
+        'api.events_nearby': 2,
+        'main.search_page': 3,
+    }
+    ENFORCE_QUERY_BUDGETS = os.getenv('ENFORCE_QUERY_BUDGETS', 'False').lower() == 'true'
+    
+    # Read-through cache for hot read routes: 'memory', 'socket' or 'null'.
+    # 'memory' is per process and only invalidated in the worker that wrote, so it is
+    # for single-process servers; the production profile defaults to 'socket'.
+    CACHE_BACKEND = cache_backend(DB_PROFILE)
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    CACHE_TTL = int(os.getenv('CACHE_TTL', 300))
+    CACHE_SOCKET_PATH = os.getenv('CACHE_SOCKET_PATH', '/tmp/nexus-event-cache.sock')
+    
+    # Template rendering (see rendering.py): shared bytecode cache ('' disables)
+    # and cached list-row fragments: 'memory', 'socket' or 'null'
+    TEMPLATE_CACHE_DIR = os.getenv('TEMPLATE_CACHE_DIR', '/tmp/nexus-event-jinja')
+    FRAGMENT_CACHE_BACKEND = os.getenv('FRAGMENT_CACHE_BACKEND', 'memory')
+    FRAGMENT_CACHE_MAX_ENTRIES = int(os.getenv('FRAGMENT_CACHE_MAX_ENTRIES', 20000))
+    FRAGMENT_CACHE_TTL = int(os.getenv('FRAGMENT_CACHE_TTL', 3600))
+    
+    # Static assets (see assets.py) and response compression (see responses.py).
+    # Without the fallback (the default) a vendored file that was never fetched is not a CDN link.
+    ASSET_MAX_AGE = int(os.getenv('ASSET_MAX_AGE', 365 * 24 * 3600))
+    ASSET_CDN_FALLBACK = os.getenv('ASSET_CDN_FALLBACK', 'False').lower() == 'true'
+    COMPRESS_RESPONSES = os.getenv('COMPRESS_RESPONSES', 'True').lower() == 'true'
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', 500))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.getenv('COMPRESS_BROTLI_QUALITY', 4))
+    
+    # Async serving mode (see asgi.py); the async URL defaults to the database above
+    ASYNC_DATABASE_URI = os.getenv('ASYNC_DATABASE_URL')
+    ASGI_WSGI_THREADS = int(os.getenv('ASGI_WSGI_THREADS', 16))
+    
+    # Full-text search (see search.py)
+    SEARCH_PAGE_SIZE = int(os.getenv('SEARCH_PAGE_SIZE', 20))
+    SEARCH_PREVIEW_SIZE = int(os.getenv('SEARCH_PREVIEW_SIZE', 5))
+    SEARCH_MAX_PAGES = int(os.getenv('SEARCH_MAX_PAGES', 50))
+    
+    # Bulk guest import
+    IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', 1000))
+    IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', 1000))
+    
+    # Event deletion (see deletion.py): events with more guest and booking rows than
+    # this are soft-deleted and purged in batches by `flask purge-worker`
+    EVENT_SOFT_DELETE_ROWS = int(os.getenv('EVENT_SOFT_DELETE_ROWS', 5000))
+    PURGE_BATCH_SIZE = int(os.getenv('PURGE_BATCH_SIZE', 1000))
+    PURGE_POLL_SECONDS = float(os.getenv('PURGE_POLL_SECONDS', 5))
+    
+    # Rows fetched per round trip when streaming exports
+    EXPORT_BATCH_SIZE = int(os.getenv('EXPORT_BATCH_SIZE', 1000))
+    
+    # Notification outbox (see notifications.py); transports: 'file', 'smtp', 'msg91'
+    NOTIFY_EMAIL_TRANSPORT = os.getenv('NOTIFY_EMAIL_TRANSPORT', 'file')
+    NOTIFY_SMS_TRANSPORT = os.getenv('NOTIFY_SMS_TRANSPORT', 'file')
+    OUTBOX_SPOOL_DIR = os.getenv('OUTBOX_SPOOL_DIR', 'instance/outbox')
+    OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 100))
+    OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 8))
+    OUTBOX_BACKOFF_SECONDS = float(os.getenv('OUTBOX_BACKOFF_SECONDS', 30))
+    OUTBOX_BACKOFF_MAX_SECONDS = float(os.getenv('OUTBOX_BACKOFF_MAX_SECONDS', 3600))
+    OUTBOX_LEASE_SECONDS = int(os.getenv('OUTBOX_LEASE_SECONDS', 300))
+    OUTBOX_POLL_SECONDS = float(os.getenv('OUTBOX_POLL_SECONDS', 2))
+    MAIL_SENDER = os.getenv('MAIL_SENDER', 'events@localhost')
+    SMTP_HOST = os.getenv('SMTP_HOST', 'localhost')
+    SMTP_PORT = int(os.getenv('SMTP_PORT', 1025))
+    SMTP_USERNAME = os.getenv('SMTP_USERNAME')
+    SMTP_PASSWORD = os.getenv('SMTP_PASSWORD')
+    SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', 'False').lower() == 'true'
+    MSG91_AUTH_KEY = os.getenv('MSG91_AUTH_KEY')
+    MSG91_TEMPLATE_ID = os.getenv('MSG91_TEMPLATE_ID')
+    
+    # Password hashing for new hashes: 'scrypt', 'pbkdf2' or 'argon2' (see passwords.py).
+    # Stored hashes with other settings are upgraded on the user's next login.
+    PASSWORD_HASH_METHOD = os.getenv('PASSWORD_HASH_METHOD', 'scrypt')
+    PASSWORD_SCRYPT_N = int(os.getenv('PASSWORD_SCRYPT_N', 16384))
+    PASSWORD_SCRYPT_R = int(os.getenv('PASSWORD_SCRYPT_R', 8))
+    PASSWORD_SCRYPT_P = int(os.getenv('PASSWORD_SCRYPT_P', 1))
+    PASSWORD_PBKDF2_ITERATIONS = int(os.getenv('PASSWORD_PBKDF2_ITERATIONS', 600000))
+    PASSWORD_ARGON2_TIME_COST = int(os.getenv('PASSWORD_ARGON2_TIME_COST', 2))
+    PASSWORD_ARGON2_MEMORY_COST = int(os.getenv('PASSWORD_ARGON2_MEMORY_COST', 19456))  # KiB
+    PASSWORD_ARGON2_PARALLELISM = int(os.getenv('PASSWORD_ARGON2_PARALLELISM', 1))
+    
+    # Login throttling (see ratelimit.py): 'memory', 'socket' (shared via cache-server) or 'null'
+    RATELIMIT_BACKEND = os.getenv('RATELIMIT_BACKEND', 'memory')
+    LOGIN_IP_BURST = int(os.getenv('LOGIN_IP_BURST', 20))
+    LOGIN_IP_PER_MINUTE = float(os.getenv('LOGIN_IP_PER_MINUTE', 10))
+    # Per account and client IP, so one client cannot lock an account out for everyone else
+    LOGIN_USER_BURST = int(os.getenv('LOGIN_USER_BURST', 5))
+    LOGIN_USER_PER_MINUTE = float(os.getenv('LOGIN_USER_PER_MINUTE', 2))
+    # Per account across all IPs: a looser cap against distributed guessing
+    LOGIN_ACCOUNT_BURST = int(os.getenv('LOGIN_ACCOUNT_BURST', 50))
+    LOGIN_ACCOUNT_PER_MINUTE = float(os.getenv('LOGIN_ACCOUNT_PER_MINUTE', 20))
+    
+    # Guest one-time verification codes
+    OTP_TTL_SECONDS = int(os.getenv('OTP_TTL_SECONDS', 600))
+    OTP_MAX_ATTEMPTS = int(os.getenv('OTP_MAX_ATTEMPTS', 5))
@@ -0,0 +1,170 @@
+"""
+Denormalized per-event counters.
+
+Event.guest_row_count, Event.headcount, Event.booking_count and
+Event.booking_cost_total are kept in step with the guests and bookings
+tables by session hooks, so list pages and capacity checks read a column
+instead of loading child collections. Headcount increases go through the
+venue capacity check in admission.py. rebuild_event_counters() recomputes
+them from scratch if they ever drift (e.g. after manual SQL edits).
+"""
+
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import event, func, select, update, inspect
+from sqlalchemy.orm import Session
+from models import db, Event, Guest, Booking
+from admission import has_room, raise_capacity_exceeded
+
+COUNTER_COLUMNS = ('guest_row_count', 'headcount', 'booking_count', 'booking_cost_total')
+
+# Attributes whose change affects a counter, per tracked model
+TRACKED_ATTRIBUTES = {
+    Guest: ('event_id', 'guest_count'),
+    Booking: ('event_id', 'cost'),
+}
+
+
+def _to_decimal(value):
+    if value is None:
+        return Decimal('0')
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def loaded_value(obj, key):
+    """Value of an attribute as last loaded from the database"""
+    history = inspect(obj).attrs[key].load_history()
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return None
+
+
+def _contribution(obj, values):
+    """Counter contribution of one guest/booking row, given its attribute values"""
+    if isinstance(obj, Guest):
+        return {'guest_row_count': 1, 'headcount': values.get('guest_count') or 0}
+    return {'booking_count': 1, 'booking_cost_total': _to_decimal(values.get('cost'))}
+
+
+def _event_id_of(obj):
+    if obj.event_id is not None:
+        return obj.event_id
+    return obj.event.id if obj.event is not None else None
+
+
+def _is_counter_change(obj):
+    state = inspect(obj)
+    if state.attrs.event.history.has_changes():
+        return True
+    return any(state.attrs[key].history.has_changes() for key in TRACKED_ATTRIBUTES[type(obj)])
+
+
+def add_delta(deltas, event_id, contribution, sign=1):
+    """Accumulate a signed contribution into a {event_id: {column: delta}} map"""
+    if event_id is None:
+        return
+    row = deltas[event_id]
+    for column, value in contribution.items():
+        row[column] = row.get(column, 0) + sign * value
+
+
+def apply_deltas(connection, deltas):
+    """
+    Apply accumulated deltas as relative UPDATEs, one per event.
+
+    Events that gain headcount are updated through the admission check and
+    raise CapacityExceeded when full. Each event has one net delta, so a
+    release never frees seats for another event's claim; events are visited
+    strictly in id order, so transactions take their row locks in the same
+    order and cannot deadlock on each other.
+    """
+    for event_id, row in sorted(deltas.items()):
+        values = {column: getattr(Event, column) + delta
+                  for column, delta in row.items() if delta}
+        if not values:
+            continue
+        stmt = update(Event).where(Event.id == event_id).values(**values)
+        seats = row.get('headcount', 0)
+        if seats > 0:
+            stmt = stmt.where(has_room(seats))
+        if connection.execute(stmt).rowcount == 0 and seats > 0:
+            raise_capacity_exceeded(connection, event_id, seats)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_counter_changes(session, flush_context, instances):
+    """Record removed contributions now, while the old values are still loadable"""
+    deltas = session.info.setdefault('counter_deltas', defaultdict(dict))
+    pending = session.info.setdefault('counter_pending', [])
+
+    for obj in session.deleted:
+        if type(obj) in TRACKED_ATTRIBUTES:
+            old = {key: loaded_value(obj, key) for key in TRACKED_ATTRIBUTES[type(obj)]}
+            add_delta(deltas, old['event_id'], _contribution(obj, old), sign=-1)
+
+    for obj in session.dirty:
+        if type(obj) in TRACKED_ATTRIBUTES and _is_counter_change(obj):
+            old = {key: loaded_value(obj, key) for key in TRACKED_ATTRIBUTES[type(obj)]}
+            add_delta(deltas, old['event_id'], _contribution(obj, old), sign=-1)
+            pending.append(obj)
+
+    for obj in session.new:
+        if type(obj) in TRACKED_ATTRIBUTES:
+            pending.append(obj)
+
+
+@event.listens_for(Session, 'after_flush')
+def _apply_counter_changes(session, flush_context):
+    """Add contributions of new/changed rows (ids are assigned now) and write all deltas"""
+    deltas = session.info.pop('counter_deltas', None)
+    if deltas is None:
+        deltas = defaultdict(dict)
+    for obj in session.info.pop('counter_pending', []):
+        current = {key: getattr(obj, key) for key in TRACKED_ATTRIBUTES[type(obj)]}
+        add_delta(deltas, _event_id_of(obj), _contribution(obj, current))
+
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+        session.info.setdefault('counter_stale_events', set()).update(deltas)
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _expire_stale_counters(session, flush_context):
+    """Make in-session Event objects reload the counters we just changed"""
+    stale = session.info.pop('counter_stale_events', None)
+    if not stale:
+        return
+    for obj in list(session.identity_map.values()):
+        if isinstance(obj, Event) and obj.id in stale:
+            session.expire(obj, COUNTER_COLUMNS)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_counter_changes(session):
+    for key in ('counter_deltas', 'counter_pending', 'counter_stale_events'):
+        session.info.pop(key, None)
+
+
+def rebuild_event_counters(event_ids=None, connection=None):
+    """Recompute every counter column from the guests and bookings tables (on `connection` if given, uncommitted)"""
+    guest_rows = select(func.count(Guest.id)).where(Guest.event_id == Event.id).scalar_subquery()
+    headcount = select(func.coalesce(func.sum(Guest.guest_count), 0)).where(Guest.event_id == Event.id).scalar_subquery()
+    booking_count = select(func.count(Booking.id)).where(Booking.event_id == Event.id).scalar_subquery()
+    booking_cost = select(func.coalesce(func.sum(Booking.cost), 0)).where(Booking.event_id == Event.id).scalar_subquery()
+
+    stmt = update(Event).values(
+        guest_row_count=guest_rows,
+        headcount=headcount,
+        booking_count=booking_count,
+        booking_cost_total=booking_cost
+    )
+    if event_ids is not None:
+        stmt = stmt.where(Event.id.in_(list(event_ids)))
+
+    if connection is not None:
+        return connection.execute(stmt).rowcount
+    result = db.session.execute(stmt.execution_options(synchronize_session=False))
+    db.session.commit()
+    return result.rowcount
@@ -10,10 +10,19 @@ CREATE TABLE IF NOT EXISTS events (
     event_date DATE NOT NULL,
     event_time TIME,
     location VARCHAR(255),
+    latitude DOUBLE,
+    longitude DOUBLE,
+    venue_capacity INT,
     budget DECIMAL(10, 2) DEFAULT 0.00,
     status ENUM('Planning', 'Confirmed', 'Completed', 'Cancelled') DEFAULT 'Planning',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    deleted_at TIMESTAMP NULL,  -- soft-deleted, waiting for flask purge-worker
+    -- Denormalized counters (recompute with: flask rebuild-counters)
+    guest_row_count INT NOT NULL DEFAULT 0,
+    headcount INT NOT NULL DEFAULT 0,
+    booking_count INT NOT NULL DEFAULT 0,
+    booking_cost_total DECIMAL(12, 2) NOT NULL DEFAULT 0.00
 );
 
 -- Guests Table
@@ -23,6 +32,10 @@ CREATE TABLE IF NOT EXISTS guests (
     name VARCHAR(200) NOT NULL,
     email VARCHAR(255),
     phone VARCHAR(20),
+    otp_hash VARCHAR(64),
+    otp_expires_at DATETIME,
+    otp_attempts INT NOT NULL DEFAULT 0,
+    otp_verified BOOLEAN DEFAULT FALSE,
     rsvp_status ENUM('Pending', 'Accepted', 'Declined') DEFAULT 'Pending',
     guest_count INT DEFAULT 1,
     dietary_requirements TEXT,
@@ -48,15 +61,56 @@ CREATE TABLE IF NOT EXISTS bookings (
     FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
 );
 
+-- Booking spend rollups (recompute with: flask rebuild-rollups)
+CREATE TABLE IF NOT EXISTS booking_rollups (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    event_id INT NOT NULL,
+    booking_type VARCHAR(20) NOT NULL,
+    status VARCHAR(20) NOT NULL,
+    month CHAR(7) NOT NULL,
+    booking_count INT NOT NULL DEFAULT 0,
+    cost_total DECIMAL(14, 2) NOT NULL DEFAULT 0.00,
+    UNIQUE KEY uq_booking_rollup (event_id, booking_type, status, month),
+    INDEX ix_booking_rollups_month (month),
+    FOREIGN KEY (event_id) REFERENCES events(id) ON DELETE CASCADE
+);
+
+-- Notification outbox, drained by: flask outbox-worker
+CREATE TABLE IF NOT EXISTS outbox_messages (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    idempotency_key VARCHAR(191) NOT NULL UNIQUE,
+    channel ENUM('email', 'sms') NOT NULL,
+    kind VARCHAR(50) NOT NULL,
+    recipient VARCHAR(255) NOT NULL,
+    subject VARCHAR(255),
+    body TEXT,
+    guest_id INT,
+    status ENUM('pending', 'sending', 'sent', 'failed') NOT NULL DEFAULT 'pending',
+    attempts INT NOT NULL DEFAULT 0,
+    next_attempt_at DATETIME NOT NULL,
+    claimed_by VARCHAR(32),
+    lease_expires_at DATETIME,
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sent_at DATETIME,
+    INDEX ix_outbox_due (status, next_attempt_at)
+);
+
 -- Create indexes for better performance
-CREATE INDEX idx_event_date ON events(event_date);
+-- (kept in step with models.py and migrations/; check plans with: flask explain-indexes)
+CREATE INDEX ix_events_date_id ON events(event_date, id);
 CREATE INDEX idx_event_status ON events(status);
-CREATE INDEX idx_guest_event ON guests(event_id);
+CREATE INDEX ix_events_lat_lon ON events(latitude, longitude);
+CREATE INDEX ix_events_deleted_at ON events(deleted_at);
+CREATE INDEX ix_guests_event_rsvp ON guests(event_id, rsvp_status);
+CREATE INDEX ix_guests_event_guest_count ON guests(event_id, guest_count);
+CREATE INDEX ix_guests_created_id ON guests(created_at, id);
 CREATE INDEX idx_guest_rsvp ON guests(rsvp_status);
-CREATE INDEX idx_booking_event ON bookings(event_id);
+CREATE INDEX ix_bookings_event_status_cost ON bookings(event_id, status, cost);
+CREATE INDEX ix_bookings_created_id ON bookings(created_at, id);
 CREATE INDEX idx_booking_status ON bookings(status);
 
--- Insert sample data
+-- Insert sample data (counters are filled in by the UPDATE at the end)
 INSERT INTO events (name, description, event_date, event_time, location, budget, status) VALUES
 ('Annual Tech Conference 2025', 'A comprehensive technology conference featuring industry leaders', '2025-11-15', '09:00:00', 'Convention Center, Delhi', 500000.00, 'Planning'),
 ('Corporate Gala Dinner', 'Year-end celebration and awards ceremony', '2025-12-20', '19:00:00', 'Grand Hotel, Mumbai', 300000.00, 'Planning');
@@ -70,3 +124,16 @@ INSERT INTO bookings (event_id, booking_type, vendor_name, description, cost, bo
 (1, 'Venue', 'Convention Center Delhi', 'Main hall booking for 500 attendees', 150000.00, '2025-11-15', 'Confirmed', 'venue@convention.com'),
 (1, 'Catering', 'Royal Caterers', 'Full day catering with lunch and snacks', 200000.00, '2025-11-15', 'Pending', 'contact@royalcaterers.com'),
 (2, 'Venue', 'Grand Hotel Mumbai', 'Banquet hall for 150 guests', 100000.00, '2025-12-20', 'Confirmed', 'bookings@grandhotel.com');
+
+-- Populate denormalized event counters for the sample data
+UPDATE events e SET
+    guest_row_count = (SELECT COUNT(*) FROM guests g WHERE g.event_id = e.id),
+    headcount = (SELECT COALESCE(SUM(g.guest_count), 0) FROM guests g WHERE g.event_id = e.id),
+    booking_count = (SELECT COUNT(*) FROM bookings b WHERE b.event_id = e.id),
+    booking_cost_total = (SELECT COALESCE(SUM(b.cost), 0) FROM bookings b WHERE b.event_id = e.id);
+
+-- Populate booking spend rollups for the sample data
+INSERT INTO booking_rollups (event_id, booking_type, status, month, booking_count, cost_total)
+SELECT event_id, booking_type, status, DATE_FORMAT(COALESCE(booking_date, created_at), '%Y-%m'), COUNT(*), SUM(cost)
+FROM bookings
+GROUP BY event_id, booking_type, status, DATE_FORMAT(COALESCE(booking_date, created_at), '%Y-%m');
@@ -0,0 +1,168 @@
+"""
+Per-request SQL instrumentation and query budgets.
+
+Cursor execution events on every engine record, for the request being
+handled (in flask.g):
+
+  * the number of statements executed
+  * total time spent in the database
+  * statements slower than SLOW_QUERY_MS, logged with the *shape* of
+    their bound parameters (types and counts, never values)
+
+Responses carry a Server-Timing header with these figures so they show up
+in browser dev tools. Endpoints listed in QUERY_BUDGETS may not exceed
+their budget: with ENFORCE_QUERY_BUDGETS on, an over-budget request fails
+loudly, and `flask check-query-budgets` drives every budgeted GET route
+and exits non-zero if one of them regresses (e.g. a new N+1 lazy load).
+tests/test_query_budgets.py runs the same check on every pytest run.
+"""
+
+import time
+from flask import g, has_app_context, request, url_for, current_app
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from werkzeug.routing import BuildError
+
+
+class QueryBudgetExceeded(RuntimeError):
+    """Raised when a request issues more SQL statements than its budget allows"""
+
+
+def _tracking():
+    return has_app_context() and 'db_query_count' in g
+
+
+def parameter_shape(parameters, executemany=False):
+    """Describe bound parameters by type only, e.g. {'id': 'int'} or '500 x (str, int)'"""
+    if executemany and isinstance(parameters, (list, tuple)):
+        first = parameter_shape(parameters[0]) if parameters else None
+        return f'{len(parameters)} x {first}'
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(type(value).__name__ for value in parameters) + ')'
+    return type(parameters).__name__
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_statement(conn, cursor, statement, parameters, context, executemany):
+    if _tracking():
+        g.db_query_count += 1
+        conn.info.setdefault('query_start', []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _end_statement(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get('query_start')
+    if not starts or not _tracking():
+        return
+    elapsed_ms = (time.perf_counter() - starts.pop()) * 1000
+    g.db_time_ms += elapsed_ms
+
+    threshold = current_app.config.get('SLOW_QUERY_MS')
+    if threshold is not None and elapsed_ms >= threshold:
+        record = {
+            'endpoint': request.endpoint if request else None,
+            'duration_ms': round(elapsed_ms, 2),
+            'statement': ' '.join(statement.split())[:1000],
+            'parameters': parameter_shape(parameters, executemany),
+        }
+        current_app.logger.warning('slow query %(duration_ms)sms in %(endpoint)s: '
+                                   '%(statement)s params=%(parameters)s', record, extra=record)
+        g.db_slow_queries += 1
+
+
+@event.listens_for(Engine, 'handle_error')
+def _discard_failed_statement(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get('query_start'):
+        connection.info['query_start'].pop()
+
+
+def query_count():
+    """Statements executed so far in the current request"""
+    return g.get('db_query_count', 0)
+
+
+def query_time_ms():
+    """Milliseconds spent executing statements so far in the current request"""
+    return g.get('db_time_ms', 0.0)
+
+
+def init_app(app):
+    """Start instrumenting each request; enforce budgets and emit Server-Timing"""
+
+    @app.before_request
+    def _start_request_metrics():
+        g.db_query_count = 0
+        g.db_time_ms = 0.0
+        g.db_slow_queries = 0
+        g.request_start = time.perf_counter()
+
+    @app.after_request
+    def _finish_request_metrics(response):
+        if 'request_start' not in g:
+            return response
+        budget = app.config.get('QUERY_BUDGETS', {}).get(request.endpoint)
+        if budget is not None and query_count() > budget:
+            message = f'{request.endpoint} issued {query_count()} queries (budget {budget})'
+            if app.config.get('ENFORCE_QUERY_BUDGETS'):
+                raise QueryBudgetExceeded(message)
+            app.logger.warning(message)
+
+        if app.config.get('SERVER_TIMING'):
+            total_ms = (time.perf_counter() - g.request_start) * 1000
+            response.headers['Server-Timing'] = ', '.join([
+                f'db;dur={query_time_ms():.2f};desc="{query_count()} queries"',
+                f'slow;desc="{g.db_slow_queries} slow"',
+                f'app;dur={total_ms:.2f}',
+            ])
+        return response
+
+
+def check_query_budgets(app, sample_args, expected_status=None):
+    """
+    Request every budgeted GET endpoint through the test client.
+
+    `sample_args` maps an endpoint that needs URL arguments (an <int:id> of
+    a row that exists, a resource name, query parameters) to url_for()
+    keyword arguments; an endpoint whose URL cannot be built fails. Every
+    route must answer with its status from `expected_status` (default 200):
+    a route that fails or redirects early would otherwise pass on the few
+    queries it ran. Returns a list of (endpoint, queries, budget, status)
+    for the routes that went over budget, answered with another status or
+    could not be requested (status None).
+    """
+    counts = {}
+    expected_status = expected_status or {}
+
+    def _record(response):
+        counts[request.endpoint] = query_count()
+        return response
+
+    # Not @app.after_request: the app may already have served requests (a second run, tests)
+    app.after_request_funcs.setdefault(None, []).append(_record)
+
+    failures = []
+    try:
+        client = app.test_client()
+        with client.session_transaction() as session:
+            session['user_id'] = 0
+        for endpoint, budget in sorted(app.config.get('QUERY_BUDGETS', {}).items()):
+            try:
+                with app.test_request_context():
+                    url = url_for(endpoint, **sample_args.get(endpoint, {}))
+            except BuildError:
+                print(f'{endpoint:<24} no URL: add its arguments to sample_args')
+                failures.append((endpoint, 0, budget, None))
+                continue
+            status = client.get(url).status_code
+            used = counts.get(endpoint, 0)
+            expected = expected_status.get(endpoint, 200)
+            print(f'{endpoint:<24} {used:>3} / {budget} queries  HTTP {status}'
+                  + (f' (expected {expected})' if status != expected else ''))
+            if used > budget or status != expected:
+                failures.append((endpoint, used, budget, status))
+    finally:
+        app.after_request_funcs[None].remove(_record)
+    return failures
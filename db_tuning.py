@@ -0,0 +1,32 @@
+"""
+Per-connection database tuning.
+
+SQLite keeps most performance settings per connection, so the PRAGMAs
+from Config.SQLITE_PRAGMAS are applied whenever the pool opens a new
+connection. Pool sizing for server databases is handled by
+SQLALCHEMY_ENGINE_OPTIONS (see config.py).
+"""
+
+from sqlalchemy import event
+
+
+def apply_sqlite_pragmas(engine, pragmas):
+    """Run `PRAGMA name=value` for each entry on every new connection of engine"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def init_app(app, db):
+    """Install connection tuning on every engine of the app"""
+    with app.app_context():
+        for engine in db.engines.values():
+            apply_sqlite_pragmas(engine, app.config.get('SQLITE_PRAGMAS'))
@@ -0,0 +1,127 @@
+"""
+Event deletion.
+
+Guests, bookings and booking rollups reference their event with ON DELETE
+CASCADE, and Event's relationships are passive_deletes, so deleting an
+event is one DELETE statement: the database removes the children without
+SQLAlchemy loading them (SQLite enforces this with PRAGMA foreign_keys,
+see config.SQLITE_PROFILES). The full-text index triggers still fire for
+the cascaded rows.
+
+A single DELETE still holds its locks until every child row is gone, so
+events with more than EVENT_SOFT_DELETE_ROWS guests and bookings are
+soft-deleted instead: the request only sets Event.deleted_at, and
+`flask purge-worker` deletes the children in batches of PURGE_BATCH_SIZE
+rows, one short transaction each, before deleting the event itself.
+
+Soft-deleted events, and the guests and bookings that belong to them, are
+hidden from every ORM query (pages, API, async reads, search, reports) by
+loader criteria; pass the execution option include_deleted=True to see
+them. Guests and bookings are checked with an EXISTS on their event's
+primary key; search, exports and the dashboard totals inner-join the
+event and filter in the join instead, see join_live_event(). Writes are not
+covered: set-based UPDATEs (bulk.py) add event_not_deleted() to their
+WHERE clause. Bookings of a soft-deleted event still count towards the
+booking rollups (analytics.py) until the purge reaches them.
+"""
+
+import logging
+import threading
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import and_, delete, event, select
+from sqlalchemy.orm import Session, with_loader_criteria
+from models import db, Event, Guest, Booking
+from cache import mark_events_dirty
+
+logger = logging.getLogger(__name__)
+
+# On the Core table, so the Event loader criterion is not applied twice, and
+# never correlated away when the outer query joins events itself
+_events = Event.__table__
+
+
+def event_not_deleted(cls):
+    """Guest or Booking criterion: its event is not soft-deleted (EXISTS on the event's primary key)"""
+    return (select(_events.c.id).where(_events.c.id == cls.event_id, _events.c.deleted_at.is_(None))
+            .correlate_except(_events).exists())
+
+
+def join_live_event(stmt, model):
+    """
+    Inner-join a Guest or Booking select to its event, skipping soft-deleted
+    events in the join condition. The join already does what the per-row
+    EXISTS criterion would, so the statement opts out of the loader criteria.
+    """
+    return (stmt.join(Event, and_(Event.id == model.event_id, Event.deleted_at.is_(None)))
+            .execution_options(include_deleted=True))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _hide_deleted_events(state):
+    if (state.is_select and not state.is_column_load and not state.is_relationship_load
+            and not state.execution_options.get('include_deleted', False)):
+        state.statement = state.statement.options(
+            with_loader_criteria(Event, lambda cls: cls.deleted_at.is_(None), include_aliases=True),
+            with_loader_criteria(Guest, event_not_deleted, include_aliases=True),
+            with_loader_criteria(Booking, event_not_deleted, include_aliases=True))
+
+
+def delete_event(event):
+    """Delete event and its children; returns False if the rows are left to the purge worker"""
+    if event.guest_row_count + event.booking_count > current_app.config['EVENT_SOFT_DELETE_ROWS']:
+        event.deleted_at = datetime.utcnow()
+        return False
+    db.session.delete(event)
+    return True
+
+
+def purge_event(event_id, batch_size):
+    """Delete a soft-deleted event's rows batch by batch, then the event; returns rows deleted"""
+    deleted = 0
+    for model in (Guest, Booking):
+        while True:
+            ids = db.session.scalars(
+                select(model.id).where(model.event_id == event_id).limit(batch_size),
+                execution_options={'include_deleted': True}).all()
+            if not ids:
+                break
+            db.session.execute(delete(model).where(model.id.in_(ids)), execution_options={'synchronize_session': False})
+            mark_events_dirty(db.session, [event_id])
+            db.session.commit()
+            deleted += len(ids)
+    db.session.execute(delete(Event).where(Event.id == event_id), execution_options={'synchronize_session': False})
+    mark_events_dirty(db.session, [event_id])
+    db.session.commit()
+    return deleted + 1
+
+
+def purge_deleted_events(batch_size):
+    """Purge every soft-deleted event, oldest first; returns the number of events purged"""
+    event_ids = db.session.scalars(
+        select(Event.id).where(Event.deleted_at.is_not(None)).order_by(Event.deleted_at),
+        execution_options={'include_deleted': True}).all()
+    db.session.rollback()
+    for event_id in event_ids:
+        rows = purge_event(event_id, batch_size)
+        logger.info('Purged event %s (%d rows)', event_id, rows)
+    return len(event_ids)
+
+
+def run_purger(app, once=False, stop=None):
+    """Purge soft-deleted events until stopped (or until none are left, with once=True)"""
+    stop = stop or threading.Event()
+    with app.app_context():
+        config = app.config
+        while not stop.is_set():
+            try:
+                purged = purge_deleted_events(config['PURGE_BATCH_SIZE'])
+            except Exception:
+                db.session.rollback()
+                logger.exception('Purge worker iteration failed')
+                purged = 0
+            if purged == 0:
+                if once:
+                    break
+                stop.wait(config['PURGE_POLL_SECONDS'])
+        db.session.remove()
@@ -0,0 +1,146 @@
+"""
+Event routes.
+"""
+
+from datetime import datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash
+from sqlalchemy.orm.attributes import set_committed_value
+from models import db, Event, Guest, Booking
+from pagination import list_filters, paginate
+from cache import cache, mark_events_dirty, snapshot
+from analytics import spend_breakdown
+from auth import login_required
+import notifications
+from deletion import delete_event
+from admission import set_capacity
+
+events_bp = Blueprint('events', __name__)
+
+
+@events_bp.route('/events')
+def events_list():
+    """List all events"""
+    def load_page():
+        query, filters = list_filters(Event.query, {'status': Event.status})
+        page = paginate(query, (Event.event_date, Event.id))
+        page.items = [snapshot(e) for e in page.items]
+        return page, filters
+    
+    key = cache.list_key('events_list', sorted(request.args.items()))
+    events, filters = cache.get_or_set(key, load_page)
+    return render_template('events/list.html', events=events, filters=filters)
+
+
+@events_bp.route('/events/create', methods=['GET', 'POST'])
+def event_create():
+    """Create a new event"""
+    if request.method == 'POST':
+        try:
+            event = Event(
+                name=request.form['name'],
+                description=request.form.get('description'),
+                event_date=datetime.strptime(request.form['event_date'], '%Y-%m-%d').date(),
+                event_time=datetime.strptime(request.form['event_time'], '%H:%M').time() if request.form.get('event_time') else None,
+                location=request.form.get('location'),
+                latitude=float(request.form.get('latitude')) if request.form.get('latitude') else None,
+                longitude=float(request.form.get('longitude')) if request.form.get('longitude') else None,
+                venue_capacity=int(request.form.get('venue_capacity')) if request.form.get('venue_capacity') else None,
+                budget=float(request.form.get('budget', 0)),
+                status=request.form.get('status', 'Planning')
+            )
+            db.session.add(event)
+            db.session.commit()
+            flash('Event created successfully!', 'success')
+            return redirect(url_for('events.events_list'))
+        except Exception as e:
+            flash(f'Error creating event: {str(e)}', 'error')
+            db.session.rollback()
+    
+    return render_template('events/create.html')
+
+
+@events_bp.route('/events/<int:id>')
+def event_detail(id):
+    """View event details"""
+    def load_event():
+        event = Event.query.get_or_404(id)
+        guests = Guest.query.filter_by(event_id=id).all()
+        bookings = Booking.query.filter_by(event_id=id).all()
+        return (snapshot(event), [snapshot(g) for g in guests], [snapshot(b) for b in bookings],
+                spend_breakdown(id))
+    
+    event, guests, bookings, spend = cache.get_or_set(cache.event_key('event_detail', id), load_event)
+    total_booking_cost = event.booking_cost_total
+    
+    return render_template('events/detail.html', 
+                         event=event, 
+                         guests=guests, 
+                         bookings=bookings,
+                         total_booking_cost=total_booking_cost,
+                         spend=spend)
+
+
+@events_bp.route('/events/<int:id>/edit', methods=['GET', 'POST'])
+def event_edit(id):
+    """Edit an event"""
+    event = Event.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        try:
+            event.name = request.form['name']
+            event.description = request.form.get('description')
+            event.event_date = datetime.strptime(request.form['event_date'], '%Y-%m-%d').date()
+            event.event_time = datetime.strptime(request.form['event_time'], '%H:%M').time() if request.form.get('event_time') else None
+            event.location = request.form.get('location')
+            event.latitude = float(request.form.get('latitude')) if request.form.get('latitude') else None
+            event.longitude = float(request.form.get('longitude')) if request.form.get('longitude') else None
+            capacity = int(request.form.get('venue_capacity')) if request.form.get('venue_capacity') else None
+            event.budget = float(request.form.get('budget', 0))
+            event.status = request.form.get('status', 'Planning')
+            
+            # Conditional UPDATE against the live headcount, not the one loaded above
+            if capacity != event.venue_capacity:
+                if not set_capacity(db.session, event.id, capacity):
+                    db.session.rollback()
+                    flash(f'Error: Venue capacity cannot be below the {event.headcount} guests already added', 'error')
+                    return render_template('events/edit.html', event=event)
+                set_committed_value(event, 'venue_capacity', capacity)
+                mark_events_dirty(db.session, [event.id])
+            
+            db.session.commit()
+            flash('Event updated successfully!', 'success')
+            return redirect(url_for('events.event_detail', id=id))
+        except Exception as e:
+            flash(f'Error updating event: {str(e)}', 'error')
+            db.session.rollback()
+    
+    return render_template('events/edit.html', event=event)
+
+
+@events_bp.route('/events/<int:id>/delete', methods=['POST'])
+def event_delete(id):
+    """Delete an event"""
+    try:
+        event = Event.query.get_or_404(id)
+        deleted = delete_event(event)
+        db.session.commit()
+        if deleted:
+            flash('Event deleted successfully!', 'success')
+        else:
+            flash('Event deleted; its guests and bookings are being removed in the background', 'success')
+    except Exception as e:
+        flash(f'Error deleting event: {str(e)}', 'error')
+        db.session.rollback()
+    
+    return redirect(url_for('events.events_list'))
+
+
+@events_bp.route('/events/<int:id>/invite', methods=['POST'])
+@login_required
+def event_invite(id):
+    """Queue invitation emails for every guest of an event"""
+    Event.query.get_or_404(id)
+    queued = notifications.enqueue_invitations(db.session, id)
+    db.session.commit()
+    flash(f'Queued {queued} invitation(s); guests already invited were skipped', 'success')
+    return redirect(url_for('events.event_detail', id=id))
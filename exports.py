@@ -0,0 +1,126 @@
+"""
+Streaming CSV / JSON Lines export of events, guests and bookings.
+
+Rows are read with a server-side cursor (stream_results + yield_per), the
+parent event name is joined into the same SELECT, and output is produced
+in chunks as rows arrive, optionally gzip-compressed on the fly. Memory use
+is constant in the number of rows and the first bytes go out immediately.
+"""
+
+import csv
+import io
+import json
+import zlib
+from datetime import date, datetime, time
+from decimal import Decimal
+from sqlalchemy import select
+from models import db, Event, Guest, Booking
+from deletion import join_live_event
+
+DATASETS = ('events', 'guests', 'bookings')
+FORMATS = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+# Rows are flushed to the client in chunks of roughly this many bytes
+CHUNK_SIZE = 64 * 1024
+
+
+def _dataset_columns():
+    return {
+        'events': [
+            Event.id, Event.name, Event.description, Event.event_date, Event.event_time,
+            Event.location, Event.latitude, Event.longitude, Event.venue_capacity,
+            Event.budget, Event.status, Event.guest_row_count, Event.headcount,
+            Event.booking_count, Event.booking_cost_total, Event.created_at
+        ],
+        'guests': [
+            Guest.id, Guest.event_id, Event.name.label('event_name'), Guest.name,
+            Guest.email, Guest.phone, Guest.rsvp_status, Guest.guest_count,
+            Guest.dietary_requirements, Guest.created_at
+        ],
+        'bookings': [
+            Booking.id, Booking.event_id, Event.name.label('event_name'),
+            Booking.booking_type, Booking.vendor_name, Booking.description, Booking.cost,
+            Booking.booking_date, Booking.status, Booking.contact_info, Booking.notes,
+            Booking.created_at
+        ],
+    }
+
+
+def export_query(dataset, event_id=None):
+    """SELECT for a dataset, with the event name joined in for child tables"""
+    columns = _dataset_columns()[dataset]
+    if dataset == 'events':
+        stmt = select(*columns).order_by(Event.id)
+        if event_id is not None:
+            stmt = stmt.where(Event.id == event_id)
+        return stmt
+
+    model = Guest if dataset == 'guests' else Booking
+    stmt = join_live_event(select(*columns), model).order_by(model.id)
+    if event_id is not None:
+        stmt = stmt.where(model.event_id == event_id)
+    return stmt
+
+
+def stream_rows(stmt, batch_size=1000):
+    """Yield the header, then rows, from a server-side cursor"""
+    result = db.session.execute(stmt.execution_options(stream_results=True, yield_per=batch_size))
+    yield list(result.keys())
+    for row in result:
+        yield row
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _csv_chunks(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    rows = iter(rows)
+    writer.writerow(next(rows))
+    yield buffer.getvalue()  # header goes out before the first batch is fetched
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow([_plain(v) for v in row])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def _jsonl_chunks(rows):
+    rows = iter(rows)
+    keys = next(rows)
+    parts, size = [], 0
+    for row in rows:
+        line = json.dumps({k: _plain(v) for k, v in zip(keys, row)}, separators=(',', ':')) + '\n'
+        parts.append(line)
+        size += len(line)
+        if size >= CHUNK_SIZE:
+            yield ''.join(parts)
+            parts, size = [], 0
+    yield ''.join(parts)
+
+
+def _gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def generate_export(dataset, fmt, event_id=None, gzip=False, batch_size=1000):
+    """Generator of encoded byte chunks for a full export"""
+    rows = stream_rows(export_query(dataset, event_id), batch_size)
+    chunks = _csv_chunks(rows) if fmt == 'csv' else _jsonl_chunks(rows)
+    encoded = (chunk.encode('utf-8') for chunk in chunks if chunk)
+    return _gzip_chunks(encoded) if gzip else encoded
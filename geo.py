@@ -0,0 +1,159 @@
+"""
+Proximity queries over event venues.
+
+Lookups run in two steps:
+
+  1. prefilter - candidates inside the bounding box of the search circle come
+     from a spatial index. On SQLite that is an R*Tree virtual table
+     (events_rtree), kept in sync with events.latitude/longitude by triggers.
+     Other databases range-scan the (latitude, longitude) index on events.
+  2. refine - exact great-circle (haversine) distances are computed for the
+     candidates in one vectorized pass (numpy when installed), then
+     filtered by radius and sorted.
+
+k-nearest queries start with a small radius and double it until k events
+lie within the circle. Anything outside the circle is farther away than
+everything inside it, so the first k by distance are exact.
+"""
+
+import math
+from sqlalchemy import DDL, and_, column, event, or_, select, table, text
+from models import db, Event
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover - optional speedup
+    numpy = None
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+RTREE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    "CREATE TRIGGER IF NOT EXISTS events_rtree_ai AFTER INSERT ON events "
+    "WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN "
+    "INSERT INTO events_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude); END",
+    "CREATE TRIGGER IF NOT EXISTS events_rtree_ad AFTER DELETE ON events BEGIN "
+    "DELETE FROM events_rtree WHERE id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS events_rtree_au AFTER UPDATE OF latitude, longitude ON events BEGIN "
+    "DELETE FROM events_rtree WHERE id = old.id; "
+    "INSERT INTO events_rtree SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude "
+    "WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL; END",
+]
+
+for _statement in RTREE_DDL:
+    event.listen(Event.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+
+events_rtree = table('events_rtree', column('id'), column('min_lat'), column('max_lat'),
+                     column('min_lon'), column('max_lon'))
+
+
+class InvalidPoint(ValueError):
+    """Raised for coordinates or radii outside their valid range"""
+
+
+def validate_point(lat, lon):
+    if lat is None or lon is None or not (-90 <= lat <= 90) or not (-180 <= lon <= 180):
+        raise InvalidPoint('lat must be in [-90, 90] and lon in [-180, 180]')
+
+
+def bounding_boxes(lat, lon, radius_km):
+    """(south, north, west, east) boxes covering a circle, split at the antimeridian"""
+    dlat = radius_km / KM_PER_DEGREE
+    south, north = max(lat - dlat, -90.0), min(lat + dlat, 90.0)
+    if south <= -90.0 or north >= 90.0:
+        return [(south, north, -180.0, 180.0)]  # the circle contains a pole
+    dlon = radius_km / (KM_PER_DEGREE * math.cos(math.radians(max(abs(south), abs(north)))))
+    if dlon >= 180.0:
+        return [(south, north, -180.0, 180.0)]
+    west, east = lon - dlon, lon + dlon
+    if west < -180.0:
+        return [(south, north, west + 360.0, 180.0), (south, north, -180.0, east)]
+    if east > 180.0:
+        return [(south, north, west, 180.0), (south, north, -180.0, east - 360.0)]
+    return [(south, north, west, east)]
+
+
+def _box_candidates(lat, lon, radius_km):
+    """(id, latitude, longitude) of events inside the bounding box(es)"""
+    boxes = bounding_boxes(lat, lon, radius_km)
+    if db.session.get_bind().dialect.name == 'sqlite':
+        r = events_rtree.c
+        matches = [and_(r.max_lat >= s, r.min_lat <= n, r.max_lon >= w, r.min_lon <= e)
+                   for s, n, w, e in boxes]
+        stmt = (select(Event.id, Event.latitude, Event.longitude)
+                .select_from(events_rtree)
+                .join(Event, Event.id == r.id)
+                .where(or_(*matches)))
+    else:
+        matches = [and_(Event.latitude.between(s, n), Event.longitude.between(w, e))
+                   for s, n, w, e in boxes]
+        stmt = select(Event.id, Event.latitude, Event.longitude).where(or_(*matches))
+    return db.session.execute(stmt).all()
+
+
+def haversine_km(lat, lon, lats, lons):
+    """Great-circle distances from one point to many, as a list of floats"""
+    if numpy is not None:
+        phi1, lam1 = math.radians(lat), math.radians(lon)
+        phi2, lam2 = numpy.radians(numpy.asarray(lats, dtype=float)), numpy.radians(numpy.asarray(lons, dtype=float))
+        a = (numpy.sin((phi2 - phi1) / 2) ** 2
+             + math.cos(phi1) * numpy.cos(phi2) * numpy.sin((lam2 - lam1) / 2) ** 2)
+        return (2 * EARTH_RADIUS_KM * numpy.arcsin(numpy.sqrt(numpy.minimum(a, 1.0)))).tolist()
+
+    phi1, lam1 = math.radians(lat), math.radians(lon)
+    cos_phi1 = math.cos(phi1)
+    sin, cos, radians = math.sin, math.cos, math.radians
+    distances = []
+    for lat2, lon2 in zip(lats, lons):
+        phi2 = radians(lat2)
+        a = sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos(phi2) * sin((radians(lon2) - lam1) / 2) ** 2
+        distances.append(2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(a, 1.0))))
+    return distances
+
+
+def _within(lat, lon, radius_km):
+    candidates = _box_candidates(lat, lon, radius_km)
+    if not candidates:
+        return []
+    distances = haversine_km(lat, lon, [c.latitude for c in candidates], [c.longitude for c in candidates])
+    hits = [(d, c.id) for c, d in zip(candidates, distances) if d <= radius_km]
+    hits.sort()
+    return hits
+
+
+def events_within(lat, lon, radius_km, limit=None):
+    """[(distance_km, event_id)] within radius_km of a point, nearest first"""
+    validate_point(lat, lon)
+    if radius_km is None or radius_km <= 0:
+        raise InvalidPoint('radius_km must be positive')
+    hits = _within(lat, lon, radius_km)
+    return hits[:limit] if limit else hits
+
+
+def nearest_events(lat, lon, k, start_radius_km=5.0):
+    """[(distance_km, event_id)] of the k events nearest a point"""
+    validate_point(lat, lon)
+    radius = start_radius_km
+    max_radius = math.pi * EARTH_RADIUS_KM  # half the circumference covers the globe
+    while True:
+        hits = _within(lat, lon, radius)
+        if len(hits) >= k or radius >= max_radius:
+            return hits[:k]
+        # Grow faster when the area is sparse: aim for k hits assuming uniform density
+        grow = 2.0 if not hits else max(2.0, math.sqrt(k / len(hits)))
+        radius = min(radius * grow, max_radius)
+
+
+def rebuild_geo_index():
+    """Create the R*Tree (SQLite) if missing and repopulate it from events"""
+    connection = db.session.connection()
+    if connection.dialect.name == 'sqlite':
+        for statement in RTREE_DDL:
+            connection.execute(text(statement))
+        connection.execute(text('DELETE FROM events_rtree'))
+        connection.execute(text(
+            'INSERT INTO events_rtree SELECT id, latitude, latitude, longitude, longitude '
+            'FROM events WHERE latitude IS NOT NULL AND longitude IS NOT NULL'
+        ))
+    db.session.commit()
@@ -0,0 +1,224 @@
+"""
+Streaming bulk guest import from CSV or JSON Lines.
+
+The upload is parsed one record at a time and processed in batches of
+IMPORT_BATCH_SIZE rows. For each batch:
+
+  * rows are validated with the precompiled patterns in validators.py
+  * venue capacity is reserved once per event, with the same conditional
+    UPDATE that admission.py uses (one statement per event per batch)
+  * accepted rows are inserted with bulk_insert_mappings (executemany)
+  * the batch is committed, so memory use stays bounded by the batch size
+
+Rows that fail are reported with their line number and reason.
+
+Expected columns: event_id, name, email, phone, rsvp_status, guest_count,
+dietary_requirements (only event_id and name are required).
+"""
+
+import csv
+import io
+import json
+from collections import defaultdict
+from itertools import islice
+from sqlalchemy import select
+from models import db, Event, Guest
+from admission import CapacityExceeded
+from counters import apply_deltas
+from cache import mark_events_dirty
+from validators import validate_gmail, validate_phone, validate_guest_count
+
+RSVP_CHOICES = set(Guest.rsvp_status.type.enums)
+FORMATS = ('csv', 'jsonl')
+
+
+class RowError(ValueError):
+    """A single row that cannot be imported"""
+
+
+class ImportReport:
+    """Outcome of an import: counts plus the first `max_errors` row errors"""
+
+    def __init__(self, max_errors=1000):
+        self.imported = 0
+        self.rejected = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def reject(self, line, message):
+        self.rejected += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'error': message})
+
+    def to_dict(self):
+        return {
+            'imported': self.imported,
+            'rejected': self.rejected,
+            'errors': self.errors,
+            'errors_truncated': self.rejected > len(self.errors)
+        }
+
+
+def detect_format(filename, default='csv'):
+    """Pick the parser from a file name's extension"""
+    if filename and filename.lower().endswith(('.jsonl', '.ndjson', '.json')):
+        return 'jsonl'
+    if filename and filename.lower().endswith('.csv'):
+        return 'csv'
+    return default
+
+
+def iter_records(stream, fmt):
+    """Yield (line_number, dict) pairs from a binary stream without reading it whole"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == 'jsonl':
+        for line_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                yield line_number, RowError(f'Invalid JSON: {e}')
+                continue
+            yield line_number, record if isinstance(record, dict) else RowError('Expected a JSON object')
+    else:
+        raise ValueError(f'Unsupported import format: {fmt}')
+
+
+def _clean(value):
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def parse_guest(record):
+    """Validate one record and turn it into a guests row mapping"""
+    if isinstance(record, RowError):
+        raise record
+    try:
+        event_id = int(record.get('event_id'))
+    except (TypeError, ValueError):
+        raise RowError('event_id must be an integer')
+
+    name = _clean(record.get('name'))
+    if not name:
+        raise RowError('name is required')
+
+    email = _clean(record.get('email'))
+    if not validate_gmail(email):
+        raise RowError('Only Gmail addresses are accepted')
+
+    phone = _clean(record.get('phone'))
+    if not validate_phone(phone):
+        raise RowError('Phone number must be exactly 10 digits')
+
+    rsvp_status = _clean(record.get('rsvp_status')) or 'Pending'
+    if rsvp_status not in RSVP_CHOICES:
+        raise RowError(f'rsvp_status must be one of {", ".join(sorted(RSVP_CHOICES))}')
+
+    try:
+        guest_count = int(_clean(record.get('guest_count')) or 1)
+    except ValueError:
+        raise RowError('guest_count must be an integer')
+    if not validate_guest_count(guest_count):
+        raise RowError('guest_count must be at least 1')
+
+    return {
+        'event_id': event_id,
+        'name': name,
+        'email': email,
+        'phone': phone,
+        'rsvp_status': rsvp_status,
+        'guest_count': guest_count,
+        'dietary_requirements': _clean(record.get('dietary_requirements'))
+    }
+
+
+def _reserve(connection, event_id, rows):
+    """Reserve seats for as many rows (in file order) as fit; return the admitted rows"""
+    try:
+        apply_deltas(connection, {event_id: {
+            'guest_row_count': len(rows),
+            'headcount': sum(r['guest_count'] for r in rows)
+        }})
+        return rows
+    except CapacityExceeded as e:
+        free = e.capacity - e.reserved
+
+    admitted = []
+    for row in rows:
+        if row['guest_count'] <= free:
+            admitted.append(row)
+            free -= row['guest_count']
+    if not admitted:
+        return []
+    try:
+        apply_deltas(connection, {event_id: {
+            'guest_row_count': len(admitted),
+            'headcount': sum(r['guest_count'] for r in admitted)
+        }})
+        return admitted
+    except CapacityExceeded:
+        # Seats were taken concurrently between the two statements
+        return []
+
+
+def _import_batch(batch, report):
+    """Validate, admit and insert one batch; commits on success"""
+    by_event = defaultdict(list)
+    for line, record in batch:
+        try:
+            row = parse_guest(record)
+        except RowError as e:
+            report.reject(line, str(e))
+            continue
+        row['_line'] = line
+        by_event[row['event_id']].append(row)
+
+    if not by_event:
+        return
+
+    existing = set(db.session.scalars(select(Event.id).where(Event.id.in_(list(by_event)))))
+    connection = db.session.connection()
+    accepted = []
+    for event_id in sorted(by_event):
+        rows = by_event[event_id]
+        if event_id not in existing:
+            for row in rows:
+                report.reject(row['_line'], f'Event {event_id} does not exist')
+            continue
+        admitted = _reserve(connection, event_id, rows)
+        admitted_ids = {id(r) for r in admitted}
+        for row in rows:
+            if id(row) not in admitted_ids:
+                report.reject(row['_line'], f'Event {event_id} is at venue capacity')
+        accepted.extend(admitted)
+
+    for row in accepted:
+        del row['_line']
+    if accepted:
+        db.session.bulk_insert_mappings(Guest, accepted)
+        mark_events_dirty(db.session, {row['event_id'] for row in accepted})
+    db.session.commit()
+    report.imported += len(accepted)
+
+
+def import_guests(stream, fmt='csv', batch_size=1000, max_errors=1000):
+    """Import guests from a binary stream; returns an ImportReport"""
+    report = ImportReport(max_errors)
+    records = iter_records(stream, fmt)
+    while True:
+        batch = list(islice(records, batch_size))
+        if not batch:
+            break
+        try:
+            _import_batch(batch, report)
+        except Exception:
+            db.session.rollback()
+            raise
+    return report
@@ -0,0 +1,204 @@
+"""
+Guest routes, including bulk import and OTP verification.
+"""
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify, abort, current_app
+from models import db, Event, Guest, with_event_name, event_choices
+from admission import CapacityExceeded
+from validators import validate_gmail, validate_phone, validate_guest_count
+from pagination import list_filters, paginate
+from guest_import import import_guests, detect_format, FORMATS
+from otp import issue_otp, verify_otp
+from auth import login_required
+import notifications
+
+guests_bp = Blueprint('guests', __name__)
+
+
+@guests_bp.route('/guests')
+def guests_list():
+    """List all guests"""
+    query, filters = list_filters(Guest.query.options(with_event_name(Guest.event)), {
+        'event_id': Guest.event_id,
+        'rsvp_status': Guest.rsvp_status
+    })
+    guests = paginate(query, (Guest.created_at, Guest.id))
+    return render_template('guests/list.html', guests=guests, filters=filters,
+                         events=event_choices())
+
+
+@guests_bp.route('/guests/create', methods=['GET', 'POST'])
+def guest_create():
+    """Create a new guest"""
+    if request.method == 'POST':
+        try:
+            email = request.form.get('email')
+            phone = request.form.get('phone')
+            event_id = int(request.form['event_id'])
+            guest_count = int(request.form.get('guest_count', 1))
+            
+            # Validate Gmail
+            if email and not validate_gmail(email):
+                flash('Error: Only Gmail addresses are accepted (e.g., user@gmail.com)', 'error')
+                events = Event.query.all()
+                return render_template('guests/create.html', events=events)
+            
+            # Validate Phone
+            if phone and not validate_phone(phone):
+                flash('Error: Phone number must be exactly 10 digits', 'error')
+                events = Event.query.all()
+                return render_template('guests/create.html', events=events)
+            
+            # Validate guest count
+            if not validate_guest_count(guest_count):
+                flash('Error: Guest count must be at least 1', 'error')
+                events = Event.query.all()
+                return render_template('guests/create.html', events=events)
+            
+            # Venue capacity is enforced atomically when the guest is flushed (admission.py)
+            guest = Guest(
+                event_id=event_id,
+                name=request.form['name'],
+                email=email,
+                phone=phone,
+                rsvp_status=request.form.get('rsvp_status', 'Pending'),
+                guest_count=guest_count,
+                dietary_requirements=request.form.get('dietary_requirements')
+            )
+            db.session.add(guest)
+            db.session.commit()
+            flash('Guest added successfully!', 'success')
+            return redirect(url_for('guests.guests_list'))
+        except CapacityExceeded as e:
+            db.session.rollback()
+            flash(f'Error: {e}', 'error')
+        except Exception as e:
+            flash(f'Error adding guest: {str(e)}', 'error')
+            db.session.rollback()
+    
+    events = Event.query.all()
+    return render_template('guests/create.html', events=events)
+
+
+@guests_bp.route('/guests/import', methods=['GET', 'POST'])
+def guest_import():
+    """Bulk-import guests from an uploaded CSV or JSONL file"""
+    if request.method == 'POST':
+        upload = request.files.get('file')
+        if not upload or not upload.filename:
+            flash('Error: Choose a CSV or JSONL file to import', 'error')
+            return render_template('guests/import.html')
+        
+        fmt = request.form.get('format') or detect_format(upload.filename)
+        if fmt not in FORMATS:
+            abort(400)
+        try:
+            report = import_guests(upload.stream, fmt,
+                                   batch_size=current_app.config['IMPORT_BATCH_SIZE'],
+                                   max_errors=current_app.config['IMPORT_MAX_ERRORS'])
+        except Exception as e:
+            flash(f'Error importing guests: {str(e)}', 'error')
+            return render_template('guests/import.html')
+        
+        if request.accept_mimetypes.best == 'application/json':
+            return jsonify(report.to_dict())
+        flash(f'Imported {report.imported} guests ({report.rejected} rejected)',
+              'success' if not report.rejected else 'error')
+        return render_template('guests/import.html', report=report)
+    
+    return render_template('guests/import.html')
+
+
+@guests_bp.route('/guests/<int:id>/edit', methods=['GET', 'POST'])
+def guest_edit(id):
+    """Edit a guest"""
+    guest = Guest.query.get_or_404(id)
+    
+    if request.method == 'POST':
+        try:
+            email = request.form.get('email')
+            phone = request.form.get('phone')
+            
+            # Validate Gmail
+            if email and not validate_gmail(email):
+                flash('Error: Only Gmail addresses are accepted (e.g., user@gmail.com)', 'error')
+                events = Event.query.all()
+                return render_template('guests/edit.html', guest=guest, events=events)
+            
+            # Validate Phone
+            if phone and not validate_phone(phone):
+                flash('Error: Phone number must be exactly 10 digits', 'error')
+                events = Event.query.all()
+                return render_template('guests/edit.html', guest=guest, events=events)
+            
+            # Validate guest count
+            guest_count = int(request.form.get('guest_count', 1))
+            if not validate_guest_count(guest_count):
+                flash('Error: Guest count must be at least 1', 'error')
+                events = Event.query.all()
+                return render_template('guests/edit.html', guest=guest, events=events)
+            
+            guest.event_id = int(request.form['event_id'])
+            guest.name = request.form['name']
+            guest.email = email
+            guest.phone = phone
+            guest.rsvp_status = request.form.get('rsvp_status', 'Pending')
+            guest.guest_count = guest_count
+            guest.dietary_requirements = request.form.get('dietary_requirements')
+            
+            db.session.commit()
+            flash('Guest updated successfully!', 'success')
+            return redirect(url_for('guests.guests_list'))
+        except CapacityExceeded as e:
+            db.session.rollback()
+            flash(f'Error: {e}', 'error')
+        except Exception as e:
+            flash(f'Error updating guest: {str(e)}', 'error')
+            db.session.rollback()
+    
+    events = Event.query.all()
+    return render_template('guests/edit.html', guest=guest, events=events)
+
+
+@guests_bp.route('/guests/<int:id>/delete', methods=['POST'])
+def guest_delete(id):
+    """Delete a guest"""
+    try:
+        guest = Guest.query.get_or_404(id)
+        db.session.delete(guest)
+        db.session.commit()
+        flash('Guest deleted successfully!', 'success')
+    except Exception as e:
+        flash(f'Error deleting guest: {str(e)}', 'error')
+        db.session.rollback()
+    
+    return redirect(url_for('guests.guests_list'))
+
+
+@guests_bp.route('/guests/<int:id>/send-otp', methods=['POST'])
+@login_required
+def guest_send_otp(id):
+    """Issue a new verification code and queue it for delivery"""
+    guest = Guest.query.get_or_404(id)
+    if not guest.phone and not guest.email:
+        flash('Error: Guest has no phone number or email address', 'error')
+        return redirect(url_for('guests.guests_list'))
+    code = issue_otp(guest)
+    notifications.enqueue_otp(db.session, guest, code)
+    db.session.commit()
+    flash(f'Verification code queued for {guest.name}', 'success')
+    return redirect(url_for('guests.guests_list'))
+
+
+@guests_bp.route('/guests/<int:id>/verify', methods=['GET', 'POST'])
+def guest_verify(id):
+    """Guest-facing page to confirm a verification code"""
+    guest = Guest.query.get_or_404(id)
+    if request.method == 'POST':
+        verified = verify_otp(guest, request.form.get('otp'))
+        db.session.commit()
+        if verified:
+            flash('Thank you, your details are verified!', 'success')
+        else:
+            flash('Error: Invalid or expired code', 'error')
+    return render_template('guests/verify.html', guest=guest)
@@ -0,0 +1,116 @@
+"""
+Dashboard, reports, search and export routes.
+"""
+
+from flask import Blueprint, render_template, request, jsonify, abort, current_app, Response, stream_with_context
+from models import db, Event
+from stats import get_dashboard_stats
+from pagination import paginate
+import exports
+from cache import cache, snapshot
+from rendering import fragments
+from search import SEARCH_INDEXES, search, highlight
+from analytics import spend_breakdown, monthly_spend, committed_spend_column
+from auth import login_required
+
+main_bp = Blueprint('main', __name__)
+
+
+@main_bp.route('/')
+@main_bp.route('/dashboard')
+@login_required
+def dashboard():
+    """Main dashboard showing overview of all events"""
+    def load_dashboard():
+        recent = Event.query.order_by(Event.created_at.desc()).limit(5).all()
+        return get_dashboard_stats(), [snapshot(e) for e in recent], spend_breakdown()
+    
+    stats, recent_events, spend = cache.get_or_set(cache.list_key('dashboard'), load_dashboard)
+    
+    return render_template('dashboard.html', 
+                         total_events=stats.total_events,
+                         upcoming_events=stats.upcoming_events,
+                         total_guests=stats.total_guests,
+                         total_bookings=stats.total_bookings,
+                         recent_events=recent_events,
+                         total_budget=stats.total_budget,
+                         rsvp_stats=stats.rsvp_stats,
+                         spend=spend)
+
+
+@main_bp.route('/api/dashboard/stats')
+@login_required
+def dashboard_stats_api():
+    """Dashboard statistics as JSON"""
+    return jsonify(get_dashboard_stats().to_dict())
+
+
+@main_bp.route('/cache/stats')
+@login_required
+def cache_stats():
+    """Cache hit/miss/eviction counters, for sizing the caches"""
+    return jsonify(dict(cache.stats(), fragments=fragments.stats()))
+
+
+@main_bp.route('/reports')
+@login_required
+def reports():
+    """Budget and spend reports, read from the booking rollups"""
+    months = min(max(request.args.get('months', 12, type=int), 1), 60)
+    filters = {'months': months} if 'months' in request.args else {}
+    
+    def load_reports():
+        query = db.session.query(
+            Event.id, Event.name, Event.event_date, Event.budget, Event.booking_cost_total,
+            committed_spend_column().label('committed')
+        )
+        page = paginate(query, (Event.event_date, Event.id))
+        page.items = [row._asdict() for row in page.items]
+        return spend_breakdown(), monthly_spend(months), page
+    
+    key = cache.list_key('reports', sorted(request.args.items()))
+    spend, series, events = cache.get_or_set(key, load_reports)
+    peak = max([planned for _, planned, _ in series] + [1])
+    return render_template('reports.html', spend=spend, series=series, events=events,
+                           peak=peak, months=months, filters=filters)
+
+
+
+@main_bp.route('/search')
+@login_required
+def search_page():
+    """Ranked full-text search over events, guests and bookings"""
+    q = request.args.get('q', '').strip()
+    kind = request.args.get('type')
+    if kind and kind not in SEARCH_INDEXES:
+        abort(400)
+    page = min(max(request.args.get('page', 1, type=int), 1), current_app.config['SEARCH_MAX_PAGES'])
+    
+    results = {}
+    if q:
+        if kind:
+            per_page = current_app.config['SEARCH_PAGE_SIZE']
+            results[kind] = search(kind, q, per_page, (page - 1) * per_page)
+        else:
+            for name in SEARCH_INDEXES:
+                results[name] = search(name, q, current_app.config['SEARCH_PREVIEW_SIZE'])
+    
+    return render_template('search.html', q=q, kind=kind, page=page, results=results,
+                           indexes=SEARCH_INDEXES, highlight=highlight)
+
+
+# ============= EXPORT ROUTES =============
+
+@main_bp.route('/export/<any(events, guests, bookings):dataset>.<any(csv, jsonl):fmt>')
+@login_required
+def export_data(dataset, fmt):
+    """Stream a dataset as CSV or JSONL; ?gzip=1 compresses, ?event_id= filters"""
+    gzip = request.args.get('gzip') in ('1', 'true')
+    filename = f'{dataset}.{fmt}' + ('.gz' if gzip else '')
+    chunks = exports.generate_export(dataset, fmt,
+                                     event_id=request.args.get('event_id', type=int),
+                                     gzip=gzip,
+                                     batch_size=current_app.config['EXPORT_BATCH_SIZE'])
+    return Response(stream_with_context(chunks),
+                    mimetype='application/gzip' if gzip else exports.FORMATS[fmt],
+                    headers={'Content-Disposition': f'attachment; filename={filename}'})
@@ -0,0 +1,45 @@
+"""
+Alembic environment: migrates the database of the Flask app.
+
+Run through `flask db ...` (see schema.py), which supplies the app context.
+The database URL and engine come from the app; models.metadata is the
+target for `flask db revision --autogenerate`. Full-text and spatial index
+tables (events_fts, events_rtree, ...) are not models and are left out of
+autogenerate comparisons.
+"""
+
+from alembic import context
+from flask import current_app, has_app_context
+from models import db
+
+if not has_app_context():  # plain `alembic -c migrations/alembic.ini ...`
+    from app import create_app
+    create_app().app_context().push()
+
+target_metadata = db.metadata
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    return not (type_ == 'table' and reflected and compare_to is None)
+
+
+def run_migrations_offline():
+    context.configure(url=current_app.config['SQLALCHEMY_DATABASE_URI'], target_metadata=target_metadata,
+                      literal_binds=True, include_object=include_object)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    with db.engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          include_object=include_object,
+                          render_as_batch=connection.dialect.name == 'sqlite')
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,86 @@
+"""Baseline: the original schema, as db.create_all() created it before migrations
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+
+Tables that already exist are left alone, so a database created earlier by
+create_all() or database.sql is adopted by running `flask db upgrade`; the
+columns, tables and indexes added since then come with 0004.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    yield 'users', [
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('username', sa.String(80), nullable=False, unique=True),
+        sa.Column('email', sa.String(120), nullable=False, unique=True),
+        sa.Column('phone', sa.String(10), unique=True),
+        sa.Column('password_hash', sa.String(255), nullable=False),
+        sa.Column('full_name', sa.String(200)),
+        sa.Column('created_at', sa.DateTime),
+    ]
+    yield 'events', [
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('name', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text),
+        sa.Column('event_date', sa.Date, nullable=False),
+        sa.Column('event_time', sa.Time),
+        sa.Column('location', sa.String(255)),
+        sa.Column('latitude', sa.Float),
+        sa.Column('longitude', sa.Float),
+        sa.Column('venue_capacity', sa.Integer),
+        sa.Column('budget', sa.Numeric(10, 2)),
+        sa.Column('status', sa.Enum('Planning', 'Confirmed', 'Completed', 'Cancelled')),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime),
+    ]
+    yield 'guests', [
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('event_id', sa.Integer, sa.ForeignKey('events.id'), nullable=False),
+        sa.Column('name', sa.String(200), nullable=False),
+        sa.Column('email', sa.String(255)),
+        sa.Column('phone', sa.String(20)),
+        sa.Column('otp', sa.String(6)),
+        sa.Column('otp_verified', sa.Boolean),
+        sa.Column('rsvp_status', sa.Enum('Pending', 'Accepted', 'Declined')),
+        sa.Column('guest_count', sa.Integer),
+        sa.Column('dietary_requirements', sa.Text),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime),
+    ]
+    yield 'bookings', [
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('event_id', sa.Integer, sa.ForeignKey('events.id'), nullable=False),
+        sa.Column('booking_type', sa.Enum('Venue', 'Catering', 'Photography', 'Music', 'Decoration', 'Other'),
+                  nullable=False),
+        sa.Column('vendor_name', sa.String(200), nullable=False),
+        sa.Column('description', sa.Text),
+        sa.Column('cost', sa.Numeric(10, 2)),
+        sa.Column('booking_date', sa.Date),
+        sa.Column('status', sa.Enum('Pending', 'Confirmed', 'Paid', 'Cancelled')),
+        sa.Column('contact_info', sa.String(255)),
+        sa.Column('notes', sa.Text),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('updated_at', sa.DateTime),
+    ]
+
+
+def upgrade():
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+    for name, elements in _tables():
+        if name not in existing:
+            op.create_table(name, *elements)
+
+
+def downgrade():
+    for name, _ in reversed(list(_tables())):
+        op.drop_table(name)
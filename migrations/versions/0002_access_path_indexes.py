@@ -0,0 +1,59 @@
+"""Composite and covering indexes for the list, filter and aggregate access paths
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Replaces the single-column idx_* indexes from database.sql that are now
+leading prefixes of a composite index. Indexes that already exist (a
+database created by create_all() from the current models) are skipped.
+Check the resulting plans with `flask explain-indexes`.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_events_date_id', 'events', ['event_date', 'id']),
+    ('ix_guests_event_rsvp', 'guests', ['event_id', 'rsvp_status']),
+    ('ix_guests_event_guest_count', 'guests', ['event_id', 'guest_count']),
+    ('ix_guests_created_id', 'guests', ['created_at', 'id']),
+    ('ix_bookings_event_status_cost', 'bookings', ['event_id', 'status', 'cost']),
+    ('ix_bookings_created_id', 'bookings', ['created_at', 'id']),
+]
+
+# database.sql indexes made redundant by the composites above
+SUPERSEDED = [
+    ('idx_event_date', 'events', ['event_date']),
+    ('idx_guest_event', 'guests', ['event_id']),
+    ('idx_booking_event', 'bookings', ['event_id']),
+]
+
+
+def _index_names(table):
+    return {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        if name not in _index_names(table):
+            op.create_index(name, table, columns)
+    for name, table, _ in SUPERSEDED:
+        if name in _index_names(table):
+            op.drop_index(name, table_name=table)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == 'mysql':
+        # MySQL needs an index on each foreign key column before the composites go
+        for name, table, columns in SUPERSEDED:
+            if name not in _index_names(table):
+                op.create_index(name, table, columns)
+    for name, table, _ in reversed(INDEXES):
+        if name in _index_names(table):
+            op.drop_index(name, table_name=table)
@@ -0,0 +1,91 @@
+"""ON DELETE CASCADE from guests and bookings to events; events.deleted_at
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+
+Deleting an event becomes one DELETE that the database cascades to its
+guests and bookings (see deletion.py). SQLite cannot alter a constraint,
+so the two tables are copied into new ones (batch mode); their full-text
+index triggers, if any, are dropped with the old tables and recreated here
+(the DDL is copied from search.py as of this revision, so later changes to
+the search indexes do not change what this migration does).
+Databases that already have the cascades and the column (database.sql)
+are left alone.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+TABLES = ['guests', 'bookings']
+
+# Columns of each table's full-text index (search.py)
+FTS_COLUMNS = {
+    'guests': ('name', 'email', 'phone'),
+    'bookings': ('vendor_name', 'description', 'notes'),
+}
+
+# Names for the unnamed foreign keys SQLite reports, so batch mode can drop them
+NAMING_CONVENTION = {'fk': 'fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s'}
+
+
+def _fts_triggers(table):
+    fts, columns = f'{table}_fts', FTS_COLUMNS[table]
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+    ]
+
+
+def _event_foreign_key(table):
+    for fk in sa.inspect(op.get_bind()).get_foreign_keys(table):
+        if fk['referred_table'] == 'events' and fk['constrained_columns'] == ['event_id']:
+            return fk
+    return None
+
+
+def _replace_event_foreign_key(table, ondelete):
+    fk = _event_foreign_key(table)
+    if fk is not None and (fk.get('options', {}).get('ondelete') or '').upper() == (ondelete or ''):
+        return
+    name = f'fk_{table}_event_id_events'
+    searchable = f'{table}_fts' in sa.inspect(op.get_bind()).get_table_names()
+    with op.batch_alter_table(table, naming_convention=NAMING_CONVENTION) as batch_op:
+        if fk is not None:
+            batch_op.drop_constraint(fk['name'] or name, type_='foreignkey')
+        batch_op.create_foreign_key(name, 'events', ['event_id'], ['id'], ondelete=ondelete)
+    if op.get_bind().dialect.name == 'sqlite' and searchable:
+        for statement in _fts_triggers(table):
+            op.execute(statement)
+
+
+def _has_deleted_at():
+    return 'deleted_at' in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('events')}
+
+
+def upgrade():
+    if not _has_deleted_at():
+        op.add_column('events', sa.Column('deleted_at', sa.DateTime, nullable=True))
+    for table in TABLES:
+        _replace_event_foreign_key(table, 'CASCADE')
+
+
+def downgrade():
+    for table in TABLES:
+        _replace_event_foreign_key(table, None)
+    if _has_deleted_at():
+        # Not batch mode: recreating events would cascade-delete every guest and booking
+        op.drop_column('events', 'deleted_at')
@@ -0,0 +1,217 @@
+"""Columns, tables and indexes added to the schema since the baseline
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+
+Brings a database adopted at 0001 (the original create_all() or
+database.sql schema) up to the models:
+
+  * events: the denormalized counters (counters.py), backfilled from the
+    guests and bookings tables, and the latitude/longitude index (geo.py)
+  * guests: hashed one-time codes (otp.py) replace the plaintext otp column
+  * booking_rollups (analytics.py), backfilled from bookings, and
+    outbox_messages (notifications.py)
+  * the full-text and spatial indexes (search.py, geo.py), filled from the
+    existing rows
+
+Anything that is already there, such as a database created from the
+current models, is left alone. Plaintext codes are dropped, not migrated:
+guests request a new code.
+
+The index DDL and the backfill SQL are copied here from search.py, geo.py,
+counters.py and analytics.py as of this revision rather than imported, so
+later changes to those modules do not change what this migration does.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+COLUMNS = {
+    'events': [
+        sa.Column('guest_row_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('headcount', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('booking_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('booking_cost_total', sa.Numeric(12, 2), nullable=False, server_default='0'),
+    ],
+    'guests': [
+        sa.Column('otp_hash', sa.String(64)),
+        sa.Column('otp_expires_at', sa.DateTime),
+        sa.Column('otp_attempts', sa.Integer, nullable=False, server_default='0'),
+    ],
+}
+
+
+# Full-text indexed columns per table (search.py)
+FTS_COLUMNS = {
+    'events': ('name', 'description', 'location'),
+    'guests': ('name', 'email', 'phone'),
+    'bookings': ('vendor_name', 'description', 'notes'),
+}
+
+# SQLite R*Tree over event coordinates and its sync triggers (geo.py)
+RTREE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS events_rtree USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    "CREATE TRIGGER IF NOT EXISTS events_rtree_ai AFTER INSERT ON events "
+    "WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN "
+    "INSERT INTO events_rtree VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude); END",
+    "CREATE TRIGGER IF NOT EXISTS events_rtree_ad AFTER DELETE ON events BEGIN "
+    "DELETE FROM events_rtree WHERE id = old.id; END",
+    "CREATE TRIGGER IF NOT EXISTS events_rtree_au AFTER UPDATE OF latitude, longitude ON events BEGIN "
+    "DELETE FROM events_rtree WHERE id = old.id; "
+    "INSERT INTO events_rtree SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude "
+    "WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL; END",
+]
+
+# Event counters from the guests and bookings tables (counters.py)
+BACKFILL_COUNTERS = """
+    UPDATE events SET
+        guest_row_count = (SELECT COUNT(guests.id) FROM guests WHERE guests.event_id = events.id),
+        headcount = (SELECT COALESCE(SUM(guests.guest_count), 0) FROM guests WHERE guests.event_id = events.id),
+        booking_count = (SELECT COUNT(bookings.id) FROM bookings WHERE bookings.event_id = events.id),
+        booking_cost_total = (SELECT COALESCE(SUM(bookings.cost), 0) FROM bookings
+                              WHERE bookings.event_id = events.id)
+"""
+
+# Booking rollups by event, type, status and month (analytics.py); {month} is dialect-specific
+BACKFILL_ROLLUPS = """
+    INSERT INTO booking_rollups (event_id, booking_type, status, month, booking_count, cost_total)
+    SELECT event_id, booking_type, COALESCE(status, 'Pending'), {month}, COUNT(id), COALESCE(SUM(cost), 0)
+    FROM bookings
+    GROUP BY event_id, booking_type, COALESCE(status, 'Pending'), {month}
+"""
+ROLLUP_MONTH = {
+    'mysql': "DATE_FORMAT(COALESCE(booking_date, created_at), '%Y-%m')",
+    'sqlite': "strftime('%Y-%m', COALESCE(booking_date, created_at))",
+}
+
+
+def _fts_ddl(table):
+    fts, columns = f'{table}_fts', FTS_COLUMNS[table]
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{c}' for c in columns)
+    old = ', '.join(f'old.{c}' for c in columns)
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({cols}, content='{table}', "
+        f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+    ]
+
+
+def _tables():
+    yield 'booking_rollups', [
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('event_id', sa.Integer, sa.ForeignKey('events.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('booking_type', sa.String(20), nullable=False),
+        sa.Column('status', sa.String(20), nullable=False),
+        sa.Column('month', sa.String(7), nullable=False),
+        sa.Column('booking_count', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('cost_total', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.UniqueConstraint('event_id', 'booking_type', 'status', 'month', name='uq_booking_rollup'),
+        sa.Index('ix_booking_rollups_month', 'month'),
+    ]
+    yield 'outbox_messages', [
+        sa.Column('id', sa.Integer, primary_key=True),
+        sa.Column('idempotency_key', sa.String(191), nullable=False, unique=True),
+        sa.Column('channel', sa.Enum('email', 'sms', name='outbox_channel'), nullable=False),
+        sa.Column('kind', sa.String(50), nullable=False),
+        sa.Column('recipient', sa.String(255), nullable=False),
+        sa.Column('subject', sa.String(255)),
+        sa.Column('body', sa.Text),
+        sa.Column('guest_id', sa.Integer),
+        sa.Column('status', sa.Enum('pending', 'sending', 'sent', 'failed', name='outbox_status'),
+                  nullable=False, server_default='pending'),
+        sa.Column('attempts', sa.Integer, nullable=False, server_default='0'),
+        sa.Column('next_attempt_at', sa.DateTime, nullable=False),
+        sa.Column('claimed_by', sa.String(32)),
+        sa.Column('lease_expires_at', sa.DateTime),
+        sa.Column('last_error', sa.Text),
+        sa.Column('created_at', sa.DateTime),
+        sa.Column('sent_at', sa.DateTime),
+        sa.Index('ix_outbox_due', 'status', 'next_attempt_at'),
+    ]
+
+
+def _column_names(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _index_names(table):
+    return {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    existing = set(sa.inspect(bind).get_table_names())
+
+    added = set()
+    for table, columns in COLUMNS.items():
+        present = _column_names(table)
+        for column in columns:
+            if column.name not in present:
+                op.add_column(table, column)
+                added.add(table)
+    if 'otp' in _column_names('guests'):
+        op.drop_column('guests', 'otp')
+    if 'ix_events_lat_lon' not in _index_names('events'):
+        op.create_index('ix_events_lat_lon', 'events', ['latitude', 'longitude'])
+
+    for name, elements in _tables():
+        if name not in existing:
+            op.create_table(name, *elements)
+
+    # Backfill on the migration's own connection, inside its transaction
+    if 'events' in added:
+        op.execute(BACKFILL_COUNTERS)
+    if 'booking_rollups' not in existing:
+        op.execute(BACKFILL_ROLLUPS.format(month=ROLLUP_MONTH.get(bind.dialect.name, ROLLUP_MONTH['sqlite'])))
+
+    # Full-text and spatial indexes, filled from the existing rows when new
+    for table, columns in FTS_COLUMNS.items():
+        if bind.dialect.name == 'sqlite':
+            for statement in _fts_ddl(table):
+                op.execute(statement)
+            if f'{table}_fts' not in existing:
+                op.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')")
+        elif bind.dialect.name == 'mysql' and f'ft_{table}' not in _index_names(table):
+            op.execute(f"CREATE FULLTEXT INDEX ft_{table} ON {table} ({', '.join(columns)})")
+    if bind.dialect.name == 'sqlite':
+        for statement in RTREE_DDL:
+            op.execute(statement)
+        if 'events_rtree' not in existing:
+            op.execute('INSERT INTO events_rtree SELECT id, latitude, latitude, longitude, longitude '
+                       'FROM events WHERE latitude IS NOT NULL AND longitude IS NOT NULL')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS events_rtree')
+        for table in FTS_COLUMNS:
+            for trigger in ('ai', 'ad', 'au'):
+                op.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{trigger}')
+            op.execute(f'DROP TABLE IF EXISTS {table}_fts')
+        for trigger in ('ai', 'ad', 'au'):
+            op.execute(f'DROP TRIGGER IF EXISTS events_rtree_{trigger}')
+    elif bind.dialect.name == 'mysql':
+        for table in FTS_COLUMNS:
+            if f'ft_{table}' in _index_names(table):
+                op.drop_index(f'ft_{table}', table_name=table)
+    for name, _ in reversed(list(_tables())):
+        op.drop_table(name)
+    op.drop_index('ix_events_lat_lon', table_name='events')
+    op.add_column('guests', sa.Column('otp', sa.String(6)))
+    for table, columns in COLUMNS.items():
+        for column in reversed(columns):
+            op.drop_column(table, column.name)
@@ -0,0 +1,32 @@
+"""Index on events.deleted_at
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+
+Guests and bookings of soft-deleted events are excluded from every query
+by their event id (deletion.py); the index keeps the lookup of those ids
+from scanning events. Skipped if the index exists (create_all()).
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def _index_names():
+    return {ix['name'] for ix in sa.inspect(op.get_bind()).get_indexes('events')}
+
+
+def upgrade():
+    if 'ix_events_deleted_at' not in _index_names():
+        op.create_index('ix_events_deleted_at', 'events', ['deleted_at'])
+
+
+def downgrade():
+    if 'ix_events_deleted_at' in _index_names():
+        op.drop_index('ix_events_deleted_at', table_name='events')
@@ -1,8 +1,10 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import joinedload
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from passwords import hash_password, verify_password
+from replicas import RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 
 class User(db.Model):
@@ -17,10 +19,10 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
     
     def to_dict(self):
         return {
@@ -33,6 +35,14 @@ class User(db.Model):
 
 class Event(db.Model):
     __tablename__ = 'events'
+    __table_args__ = (
+        # Bounding-box prefilter for proximity queries where there is no R*Tree (geo.py)
+        db.Index('ix_events_lat_lon', 'latitude', 'longitude'),
+        # Keyset pagination of the events list (pagination.py)
+        db.Index('ix_events_date_id', 'event_date', 'id'),
+        # Soft-deleted events, whose guests and bookings every query excludes (deletion.py)
+        db.Index('ix_events_deleted_at', 'deleted_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(200), nullable=False)
@@ -47,10 +57,20 @@ class Event(db.Model):
     status = db.Column(db.Enum('Planning', 'Confirmed', 'Completed', 'Cancelled'), default='Planning')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Set when a large event is deleted; hidden from queries until purged (deletion.py)
+    deleted_at = db.Column(db.DateTime)
     
-    # Relationships
-    guests = db.relationship('Guest', backref='event', lazy=True, cascade='all, delete-orphan')
-    bookings = db.relationship('Booking', backref='event', lazy=True, cascade='all, delete-orphan')
+    # Denormalized counters, maintained by counters.py
+    guest_row_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    headcount = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    booking_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    booking_cost_total = db.Column(db.Numeric(12, 2), nullable=False, default=0, server_default='0')
+    
+    # Relationships; children are deleted by ON DELETE CASCADE, not loaded and deleted one by one
+    guests = db.relationship('Guest', backref='event', lazy=True, cascade='all, delete-orphan',
+                             passive_deletes=True)
+    bookings = db.relationship('Booking', backref='event', lazy=True, cascade='all, delete-orphan',
+                               passive_deletes=True)
     
     def to_dict(self):
         return {
@@ -63,20 +83,33 @@ class Event(db.Model):
             'budget': float(self.budget) if self.budget else 0.00,
             'status': self.status,
             'created_at': self.created_at.strftime('%Y-%m-%d %H:%M:%S') if self.created_at else None,
-            'guest_count': len(self.guests),
-            'booking_count': len(self.bookings)
+            'guest_count': self.guest_row_count,
+            'headcount': self.headcount,
+            'booking_count': self.booking_count,
+            'booking_cost_total': float(self.booking_cost_total) if self.booking_cost_total else 0.00
         }
 
 
 class Guest(db.Model):
     __tablename__ = 'guests'
+    __table_args__ = (
+        # Guest list filtered by event and RSVP status
+        db.Index('ix_guests_event_rsvp', 'event_id', 'rsvp_status'),
+        # Covers SUM(guest_count) per event (counter rebuilds, capacity checks)
+        db.Index('ix_guests_event_guest_count', 'event_id', 'guest_count'),
+        # Keyset pagination of the guest list
+        db.Index('ix_guests_created_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
     name = db.Column(db.String(200), nullable=False)
     email = db.Column(db.String(255))
     phone = db.Column(db.String(20))
-    otp = db.Column(db.String(6))
+    # One-time code, stored only as a keyed hash (see otp.py)
+    otp_hash = db.Column(db.String(64))
+    otp_expires_at = db.Column(db.DateTime)
+    otp_attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     otp_verified = db.Column(db.Boolean, default=False)
     rsvp_status = db.Column(db.Enum('Pending', 'Accepted', 'Declined'), default='Pending')
     guest_count = db.Column(db.Integer, default=1)
@@ -100,9 +133,15 @@ class Guest(db.Model):
 
 class Booking(db.Model):
     __tablename__ = 'bookings'
+    __table_args__ = (
+        # Booking list filtered by event and status; covers spend per event and status
+        db.Index('ix_bookings_event_status_cost', 'event_id', 'status', 'cost'),
+        # Keyset pagination of the booking list
+        db.Index('ix_bookings_created_id', 'created_at', 'id'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
-    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
     booking_type = db.Column(db.Enum('Venue', 'Catering', 'Photography', 'Music', 'Decoration', 'Other'), nullable=False)
     vendor_name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
@@ -128,3 +167,60 @@ class Booking(db.Model):
             'contact_info': self.contact_info,
             'notes': self.notes
         }
+
+
+class BookingRollup(db.Model):
+    """Booking count and cost per (event, type, status, month), maintained by analytics.py"""
+    __tablename__ = 'booking_rollups'
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'booking_type', 'status', 'month', name='uq_booking_rollup'),
+        db.Index('ix_booking_rollups_month', 'month'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id', ondelete='CASCADE'), nullable=False)
+    booking_type = db.Column(db.String(20), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # YYYY-MM of booking_date, else created_at
+    booking_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    cost_total = db.Column(db.Numeric(14, 2), nullable=False, default=0, server_default='0')
+
+
+class OutboxMessage(db.Model):
+    """A notification waiting to be delivered by the outbox worker (notifications.py)"""
+    __tablename__ = 'outbox_messages'
+    __table_args__ = (
+        db.Index('ix_outbox_due', 'status', 'next_attempt_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    idempotency_key = db.Column(db.String(191), unique=True, nullable=False)
+    channel = db.Column(db.Enum('email', 'sms', name='outbox_channel'), nullable=False)
+    kind = db.Column(db.String(50), nullable=False)
+    recipient = db.Column(db.String(255), nullable=False)
+    subject = db.Column(db.String(255))
+    body = db.Column(db.Text)
+    guest_id = db.Column(db.Integer)
+    status = db.Column(db.Enum('pending', 'sending', 'sent', 'failed', name='outbox_status'),
+                       nullable=False, default='pending', server_default='pending')
+    attempts = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    next_attempt_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+    claimed_by = db.Column(db.String(32))
+    lease_expires_at = db.Column(db.DateTime)
+    last_error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime)
+
+
+def with_event_name(relationship):
+    """Loader option that fetches only the parent event's name in the same SELECT
+
+    Guest/Booking list views and to_dict() only need ``event.name``; joining it
+    in avoids one lazy SELECT per row.
+    """
+    return joinedload(relationship).load_only(Event.name)
+
+
+def event_choices():
+    """(id, name) pairs for event filter dropdowns"""
+    return db.session.query(Event.id, Event.name).order_by(Event.name).all()
@@ -0,0 +1,384 @@
+"""
+Outbox-based delivery of invitations and OTP codes.
+
+Request handlers never talk to an SMTP server or SMS gateway. They insert
+OutboxMessage rows in the same transaction as the change that caused them,
+and `flask outbox-worker` drains the table in the background:
+
+  * claim   - a worker leases up to OUTBOX_BATCH_SIZE due messages with one
+              conditional UPDATE (pending -> sending, tagged with its lease
+              token), so several worker processes can share the queue
+              without sending a message twice. Leases of crashed workers
+              expire and the messages become due again.
+  * deliver - messages are grouped by channel and handed to the configured
+              transport in one batch (one SMTP connection per batch).
+              Messages for a guest that was deleted, or whose event was,
+              are not sent: they fail at once.
+  * settle  - delivered messages are marked sent with one UPDATE; failures
+              are rescheduled with exponential backoff and jitter, or marked
+              failed after OUTBOX_MAX_ATTEMPTS.
+
+Every message has a unique idempotency key and is inserted with INSERT OR
+IGNORE / INSERT IGNORE, so retried requests and repeated invitations do
+not queue duplicates.
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import random
+import signal
+import smtplib
+import threading
+import uuid
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from flask import current_app
+from sqlalchemy import and_, cast, insert, literal, or_, select, update, String
+from models import db, Event, Guest, OutboxMessage
+
+logger = logging.getLogger(__name__)
+
+
+class PermanentDeliveryError(Exception):
+    """Raised by a transport when retrying a message cannot succeed"""
+
+
+# ---- Enqueueing ----
+
+def _insert_ignore(stmt):
+    return stmt.prefix_with('OR IGNORE', dialect='sqlite').prefix_with('IGNORE', dialect='mysql')
+
+
+def enqueue(session, key, channel, kind, recipient, subject=None, body=None, guest_id=None):
+    """Queue one message in the caller's transaction; returns False if the key was already queued"""
+    result = session.execute(_insert_ignore(insert(OutboxMessage)).values(
+        idempotency_key=key, channel=channel, kind=kind, recipient=recipient,
+        subject=subject, body=body, guest_id=guest_id
+    ))
+    return result.rowcount > 0
+
+
+def enqueue_invitations(session, event_id):
+    """Queue an invitation email for every guest of an event that has an address
+
+    One INSERT ... SELECT regardless of the number of guests; the text is
+    rendered by the worker at send time. Returns the number of new messages.
+    """
+    key = literal('invite:') + cast(Guest.event_id, String) + literal(':') + cast(Guest.id, String)
+    rows = select(
+        key, literal('email'), literal('invitation'), Guest.email, Guest.id
+    ).where(Guest.event_id == event_id, Guest.email.isnot(None), Guest.email != '')
+    stmt = _insert_ignore(insert(OutboxMessage)).from_select(
+        ['idempotency_key', 'channel', 'kind', 'recipient', 'guest_id'], rows
+    )
+    return session.execute(stmt).rowcount
+
+
+def enqueue_otp(session, guest, code):
+    """Queue delivery of a freshly issued OTP by SMS, falling back to email"""
+    channel, recipient = ('sms', guest.phone) if guest.phone else ('email', guest.email)
+    if not recipient:
+        return False
+    minutes = current_app.config['OTP_TTL_SECONDS'] // 60
+    body = f'Your verification code for {guest.event.name} is {code}. It expires in {minutes} minutes.'
+    return enqueue(session, f'otp:{guest.id}:{uuid.uuid4().hex}', channel, 'otp', recipient,
+                   subject='Your verification code', body=body, guest_id=guest.id)
+
+
+# ---- Transports ----
+
+class FileTransport:
+    """Writes each message to <directory>/<id>.json; a stand-in for tests and development"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def send_batch(self, messages):
+        for message in messages:
+            path = os.path.join(self.directory, f'{message.id}.json')
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'id': message.id, 'channel': message.channel, 'kind': message.kind,
+                    'to': message.recipient, 'subject': message.subject, 'body': message.body,
+                }, f)
+        return {message.id: None for message in messages}
+
+
+class SMTPTransport:
+    """Sends a batch over one SMTP connection (point it at an SMTP debugging server locally)"""
+
+    def __init__(self, host, port, sender, username=None, password=None, use_tls=False, timeout=10):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send_batch(self, messages):
+        results = {}
+        with smtplib.SMTP(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password)
+            for message in messages:
+                email = EmailMessage()
+                email['From'] = self.sender
+                email['To'] = message.recipient
+                email['Subject'] = message.subject or ''
+                email.set_content(message.body or '')
+                try:
+                    smtp.send_message(email)
+                    results[message.id] = None
+                except smtplib.SMTPRecipientsRefused as e:
+                    results[message.id] = PermanentDeliveryError(str(e))
+                except smtplib.SMTPException as e:
+                    results[message.id] = e
+        return results
+
+
+class MSG91Transport:
+    """Sends SMS through the MSG91 flow API"""
+
+    URL = 'https://control.msg91.com/api/v5/flow/'
+
+    def __init__(self, auth_key, template_id, timeout=10):
+        self.auth_key = auth_key
+        self.template_id = template_id
+        self.timeout = timeout
+
+    def send_batch(self, messages):
+        import requests
+        results = {}
+        with requests.Session() as http:
+            for message in messages:
+                mobile = ''.join(ch for ch in message.recipient if ch.isdigit())
+                if len(mobile) == 10:
+                    mobile = '91' + mobile
+                try:
+                    response = http.post(self.URL, timeout=self.timeout, headers={'authkey': self.auth_key}, json={
+                        'template_id': self.template_id,
+                        'recipients': [{'mobiles': mobile, 'message': message.body}],
+                    })
+                    if 400 <= response.status_code < 500 and response.status_code != 429:
+                        results[message.id] = PermanentDeliveryError(response.text[:500])
+                    else:
+                        response.raise_for_status()
+                        results[message.id] = None
+                except requests.RequestException as e:
+                    results[message.id] = e
+        return results
+
+
+def make_transport(name, config):
+    """Build the transport named by NOTIFY_EMAIL_TRANSPORT / NOTIFY_SMS_TRANSPORT"""
+    if name == 'file':
+        return FileTransport(config['OUTBOX_SPOOL_DIR'])
+    if name == 'smtp':
+        return SMTPTransport(config['SMTP_HOST'], config['SMTP_PORT'], config['MAIL_SENDER'],
+                             config['SMTP_USERNAME'], config['SMTP_PASSWORD'], config['SMTP_USE_TLS'])
+    if name == 'msg91':
+        return MSG91Transport(config['MSG91_AUTH_KEY'], config['MSG91_TEMPLATE_ID'])
+    raise ValueError(f'Unknown notification transport: {name}')
+
+
+# ---- Worker ----
+
+def _due(now):
+    return or_(
+        and_(OutboxMessage.status == 'pending', OutboxMessage.next_attempt_at <= now),
+        and_(OutboxMessage.status == 'sending', OutboxMessage.lease_expires_at < now),
+    )
+
+
+def claim_batch(batch_size, lease_seconds):
+    """Lease up to batch_size due messages to this worker; returns them detached"""
+    now = datetime.utcnow()
+    token = uuid.uuid4().hex
+    candidates = select(OutboxMessage.id).where(_due(now)).order_by(
+        OutboxMessage.next_attempt_at
+    ).limit(batch_size).with_for_update(skip_locked=True)
+    ids = list(db.session.scalars(candidates))
+    if not ids:
+        db.session.rollback()
+        return []
+    # Re-check the due condition so a message leased by another worker in between is skipped
+    db.session.execute(
+        update(OutboxMessage)
+        .where(OutboxMessage.id.in_(ids), _due(now))
+        .values(status='sending', claimed_by=token, attempts=OutboxMessage.attempts + 1,
+                lease_expires_at=now + timedelta(seconds=lease_seconds))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    messages = db.session.scalars(
+        select(OutboxMessage).where(OutboxMessage.claimed_by == token)
+    ).all()
+    db.session.expunge_all()
+    return messages
+
+
+def render(messages):
+    """Fill in subject/body of messages rendered at send time (invitations); returns
+    {id: error} for messages whose guest or event has since been deleted"""
+    guest_ids = {m.guest_id for m in messages if m.guest_id is not None}
+    if not guest_ids:
+        return {}
+    # Soft-deleted events and their guests are hidden by the loader criteria (deletion.py)
+    rows = db.session.execute(
+        select(Guest.id, Guest.name, Event.name.label('event_name'), Event.event_date,
+               Event.event_time, Event.location)
+        .join(Event, Event.id == Guest.event_id)
+        .where(Guest.id.in_(guest_ids))
+    )
+    details = {row.id: row for row in rows}
+    db.session.rollback()
+    undeliverable = {}
+    for message in messages:
+        if message.guest_id is None:
+            continue
+        row = details.get(message.guest_id)
+        if row is None:
+            undeliverable[message.id] = PermanentDeliveryError(f'guest {message.guest_id} or its event was deleted')
+            continue
+        if message.body is not None:
+            continue
+        when = row.event_date.strftime('%d %B %Y')
+        if row.event_time:
+            when += ' at ' + row.event_time.strftime('%I:%M %p')
+        message.subject = f'You are invited: {row.event_name}'
+        message.body = (f'Dear {row.name},\n\nYou are invited to {row.event_name} on {when}'
+                        f'{" at " + row.location if row.location else ""}.\n\nWe hope to see you there!')
+    return undeliverable
+
+
+def backoff_delay(attempts, base, cap):
+    """Exponential backoff with full jitter"""
+    return random.uniform(0, min(cap, base * 2 ** (attempts - 1)))
+
+
+def settle(messages, results, config):
+    """Record the outcome of one delivery batch"""
+    now = datetime.utcnow()
+    token = messages[0].claimed_by
+    sent = [message.id for message in messages if results.get(message.id, KeyError()) is None]
+    if sent:
+        # Bodies may hold one-time codes; they are not needed once delivered
+        db.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id.in_(sent), OutboxMessage.claimed_by == token)
+            .values(status='sent', sent_at=now, body=None, last_error=None,
+                    claimed_by=None, lease_expires_at=None)
+            .execution_options(synchronize_session=False)
+        )
+    for message in messages:
+        error = results.get(message.id, KeyError('no result from transport'))
+        if error is None:
+            continue
+        permanent = isinstance(error, PermanentDeliveryError)
+        if permanent or message.attempts >= config['OUTBOX_MAX_ATTEMPTS']:
+            values = {'status': 'failed'}
+        else:
+            delay = backoff_delay(message.attempts, config['OUTBOX_BACKOFF_SECONDS'],
+                                  config['OUTBOX_BACKOFF_MAX_SECONDS'])
+            values = {'status': 'pending', 'next_attempt_at': now + timedelta(seconds=delay)}
+        db.session.execute(
+            update(OutboxMessage)
+            .where(OutboxMessage.id == message.id, OutboxMessage.claimed_by == token)
+            .values(last_error=f'{type(error).__name__}: {error}'[:2000],
+                    claimed_by=None, lease_expires_at=None, **values)
+            .execution_options(synchronize_session=False)
+        )
+        logger.warning('Outbox message %s (%s) attempt %s failed: %s',
+                       message.id, message.kind, message.attempts, error)
+    db.session.commit()
+    return len(sent)
+
+
+def deliver(messages, transports):
+    """Send claimed messages through the transport for their channel; {id: error or None}"""
+    results = {}
+    for channel, transport in transports.items():
+        batch = [message for message in messages if message.channel == channel]
+        if not batch:
+            continue
+        try:
+            results.update(transport.send_batch(batch))
+        except Exception as e:  # connection-level failure: retry the whole batch
+            results.update({message.id: e for message in batch})
+    return results
+
+
+def drain_once(app, transports=None):
+    """Claim, deliver and settle one batch; returns the number of messages claimed"""
+    config = app.config
+    if transports is None:
+        transports = {
+            'email': make_transport(config['NOTIFY_EMAIL_TRANSPORT'], config),
+            'sms': make_transport(config['NOTIFY_SMS_TRANSPORT'], config),
+        }
+    messages = claim_batch(config['OUTBOX_BATCH_SIZE'], config['OUTBOX_LEASE_SECONDS'])
+    if not messages:
+        return 0
+    results = render(messages)
+    results.update(deliver([m for m in messages if m.id not in results], transports))
+    settle(messages, results, config)
+    return len(messages)
+
+
+def run_worker(app, once=False, stop=None):
+    """Drain the outbox until stopped (or until it is empty, with once=True)"""
+    stop = stop or threading.Event()
+    with app.app_context():
+        config = app.config
+        transports = {
+            'email': make_transport(config['NOTIFY_EMAIL_TRANSPORT'], config),
+            'sms': make_transport(config['NOTIFY_SMS_TRANSPORT'], config),
+        }
+        while not stop.is_set():
+            try:
+                claimed = drain_once(app, transports)
+            except Exception:
+                db.session.rollback()
+                logger.exception('Outbox worker iteration failed')
+                claimed = 0
+            if claimed == 0:
+                if once:
+                    break
+                stop.wait(config['OUTBOX_POLL_SECONDS'])
+        db.session.remove()
+
+
+def _worker_process(once, profile):
+    from app import create_app
+
+    # A fresh app per process: its engine and pool are never shared across a fork
+    app = create_app(profile)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    run_worker(app, once=once, stop=stop)
+
+
+def run_workers(app, processes=1, once=False):
+    """Run `processes` worker processes (or one in-process worker) until interrupted"""
+    if processes <= 1:
+        run_worker(app, once=once)
+        return
+    workers = [multiprocessing.Process(target=_worker_process, args=(once, app.config['DB_PROFILE']), daemon=False)
+               for _ in range(processes)]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            worker.join()
@@ -0,0 +1,68 @@
+"""
+One-time verification codes for guests.
+
+Codes come from the `secrets` CSPRNG. Only an HMAC-SHA256 of the code is
+stored, keyed with SECRET_KEY and bound to the guest id. A six-digit code
+is only as strong as its expiry and the attempt limit, so a slow password
+hash would add nothing. The plaintext code exists only in the outbox
+message that delivers it, and that body is cleared once it has been sent.
+
+Each guess first claims an attempt with one conditional UPDATE
+(otp_attempts < OTP_MAX_ATTEMPTS), before the code is compared. A guess
+that does not get a row back is refused, so parallel requests cannot each
+read the same count and all get a guess.
+"""
+
+import hashlib
+import hmac
+import secrets
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import update
+from sqlalchemy.orm import object_session
+from models import Guest
+
+OTP_DIGITS = 6
+
+
+def generate_otp():
+    """Generate a uniformly random 6-digit OTP"""
+    return f'{secrets.randbelow(10 ** OTP_DIGITS):0{OTP_DIGITS}d}'
+
+
+def hash_otp(guest_id, code):
+    key = current_app.config['SECRET_KEY'].encode()
+    return hmac.new(key, f'{guest_id}:{code}'.encode(), hashlib.sha256).hexdigest()
+
+
+def issue_otp(guest):
+    """Give the guest a fresh code (invalidating any earlier one) and return it"""
+    code = generate_otp()
+    guest.otp_hash = hash_otp(guest.id, code)
+    guest.otp_expires_at = datetime.utcnow() + timedelta(seconds=current_app.config['OTP_TTL_SECONDS'])
+    guest.otp_attempts = 0
+    return code
+
+
+def claim_attempt(session, guest_id):
+    """Count one guess against the guest's code unless the attempts are used up; returns success"""
+    stmt = (update(Guest)
+            .where(Guest.id == guest_id, Guest.otp_attempts < current_app.config['OTP_MAX_ATTEMPTS'])
+            .values(otp_attempts=Guest.otp_attempts + 1))
+    return session.execute(stmt, execution_options={'synchronize_session': False}).rowcount == 1
+
+
+def verify_otp(guest, code):
+    """Check a submitted code; a correct one marks the guest verified and is single-use"""
+    if not guest.otp_hash or guest.otp_expires_at is None:
+        return False
+    if guest.otp_expires_at < datetime.utcnow():
+        return False
+    if not claim_attempt(object_session(guest), guest.id):
+        return False
+    if not hmac.compare_digest(guest.otp_hash, hash_otp(guest.id, (code or '').strip())):
+        return False
+    guest.otp_verified = True
+    guest.otp_hash = None
+    guest.otp_expires_at = None
+    return True
@@ -0,0 +1,178 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are addressed by the sort key of the row at their edge instead of an
+OFFSET, so fetching page 1000 costs the same index range scan as page 1.
+Lists are ordered newest-first on a (sort column, id) pair; cursors are
+opaque URL-safe tokens encoding that pair.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from flask import abort, current_app, request
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor token cannot be decoded"""
+
+
+class KeysetPage:
+    """One page of results plus the cursors needed to move to its neighbours"""
+
+    def __init__(self, items, per_page, next_cursor=None, prev_cursor=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __bool__(self):
+        return bool(self.items)
+
+
+def _serialize(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def _deserialize(value, column):
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is date:
+        return date.fromisoformat(value)
+    return python_type(value)
+
+
+def encode_cursor(values):
+    """Encode a tuple of sort-key values as a URL-safe token"""
+    raw = json.dumps([_serialize(v) for v in values], separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token, columns):
+    """Decode a token produced by encode_cursor back into typed values"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if len(values) != len(columns):
+            raise ValueError('cursor has the wrong number of keys')
+        return tuple(_deserialize(v, c) for v, c in zip(values, columns))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor(str(e)) from e
+
+
+def _seek(columns, values, older):
+    """WHERE clause selecting rows strictly after (older) or before a key, in DESC order"""
+    (key_col, id_col), (key_val, id_val) = columns, values
+    if older:
+        return or_(key_col < key_val, and_(key_col == key_val, id_col < id_val))
+    return or_(key_col > key_val, and_(key_col == key_val, id_col > id_val))
+
+
+def keyset_statement(query, columns, after=None, before=None, per_page=50):
+    """
+    Restrict a Query or Select to one page of a (sort column, id) descending list.
+
+    `after` fetches the page following a next_cursor, `before` the page
+    preceding a prev_cursor. At most per_page + 1 rows are read; pass them
+    to keyset_page().
+    """
+    if before:
+        return (query.filter(_seek(columns, decode_cursor(before, columns), older=False))
+                     .order_by(*[c.asc() for c in columns])
+                     .limit(per_page + 1))
+    if after:
+        query = query.filter(_seek(columns, decode_cursor(after, columns), older=True))
+    return query.order_by(*[c.desc() for c in columns]).limit(per_page + 1)
+
+
+def keyset_page(rows, columns, after=None, before=None, per_page=50):
+    """KeysetPage from the rows read by a keyset_statement() with the same arguments"""
+    key_fn = lambda obj: tuple(getattr(obj, c.key) for c in columns)
+    has_more = len(rows) > per_page
+
+    if before:
+        items = list(reversed(rows[:per_page]))
+        prev_cursor = encode_cursor(key_fn(items[0])) if has_more and items else None
+        next_cursor = encode_cursor(key_fn(items[-1])) if items else None
+        return KeysetPage(items, per_page, next_cursor, prev_cursor)
+
+    items = rows[:per_page]
+    next_cursor = encode_cursor(key_fn(items[-1])) if has_more and items else None
+    prev_cursor = encode_cursor(key_fn(items[0])) if after and items else None
+    return KeysetPage(items, per_page, next_cursor, prev_cursor)
+
+
+def paginate_keyset(query, columns, after=None, before=None, per_page=50):
+    """Return a KeysetPage of `query` ordered by `columns` (sort column, id) descending"""
+    rows = keyset_statement(query, columns, after, before, per_page).all()
+    return keyset_page(rows, columns, after, before, per_page)
+
+
+# ---- Request helpers shared by the HTML views and the JSON API ----
+
+def page_args(args=None, config=None):
+    """Cursor and page size from the query string, with page size clamped to config"""
+    args = request.args if args is None else args
+    config = current_app.config if config is None else config
+    try:
+        per_page = int(args.get('per_page') or 0) or config['PAGE_SIZE']
+    except ValueError:
+        per_page = config['PAGE_SIZE']
+    return {
+        'after': args.get('after'),
+        'before': args.get('before'),
+        'per_page': max(1, min(per_page, config['MAX_PAGE_SIZE']))
+    }
+
+
+def filter_values(args, columns):
+    """Typed ?name=value equality filters for a {name: column} map; ValueError on bad values"""
+    filters = {}
+    for name, column in columns.items():
+        value = args.get(name)
+        if not value:
+            continue
+        choices = getattr(column.type, 'enums', None)
+        if choices is not None and value not in choices:
+            raise ValueError(f'{name} must be one of {", ".join(choices)}')
+        if choices is None:
+            value = column.type.python_type(value)
+        filters[name] = value
+    return filters
+
+
+def list_filters(query, columns):
+    """Apply ?name=value filters for the given {name: column} map"""
+    try:
+        filters = filter_values(request.args, columns)
+    except ValueError:
+        abort(400)
+    for name, value in filters.items():
+        query = query.filter(columns[name] == value)
+    return query, filters
+
+
+def paginate(query, columns):
+    """Keyset-paginate a query from request arguments, turning bad cursors into a 400"""
+    try:
+        return paginate_keyset(query, columns, **page_args())
+    except InvalidCursor:
+        abort(400)
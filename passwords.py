@@ -0,0 +1,77 @@
+"""
+Password hashing with a configurable algorithm and cost.
+
+PASSWORD_HASH_METHOD selects the algorithm for new hashes:
+
+    scrypt  - memory-hard, standard library (default; N=2^14, r=8, p=1 is
+              ~60ms and 16 MiB per check, vs ~240ms for Werkzeug's default
+              PBKDF2 with 600k iterations)
+    pbkdf2  - PBKDF2-SHA256 with PASSWORD_PBKDF2_ITERATIONS
+    argon2  - argon2id, needs the argon2-cffi package
+
+Hashes of every algorithm are verified regardless of the setting, so the
+method or cost can change at any time: a user whose stored hash does not
+match the current settings is rehashed on their next successful login
+(see needs_rehash()). scrypt and PBKDF2 hashes use Werkzeug's
+"method$salt$hash" format; argon2 hashes use the PHC "$argon2id$..." format.
+"""
+
+from flask import current_app
+from werkzeug.security import generate_password_hash, check_password_hash
+
+try:
+    import argon2
+    from argon2.exceptions import InvalidHashError, VerificationError
+except ImportError:  # pragma: no cover - optional algorithm
+    argon2 = None
+
+METHODS = ('scrypt', 'pbkdf2', 'argon2')
+
+
+def _argon2_hasher(config):
+    if argon2 is None:
+        raise RuntimeError('PASSWORD_HASH_METHOD=argon2 needs the argon2-cffi package')
+    return argon2.PasswordHasher(time_cost=config['PASSWORD_ARGON2_TIME_COST'],
+                                 memory_cost=config['PASSWORD_ARGON2_MEMORY_COST'],
+                                 parallelism=config['PASSWORD_ARGON2_PARALLELISM'])
+
+
+def werkzeug_method(config):
+    """Werkzeug method string for the configured scrypt/PBKDF2 cost"""
+    method = config['PASSWORD_HASH_METHOD']
+    if method == 'scrypt':
+        return (f"scrypt:{config['PASSWORD_SCRYPT_N']}:{config['PASSWORD_SCRYPT_R']}:"
+                f"{config['PASSWORD_SCRYPT_P']}")
+    if method == 'pbkdf2':
+        return f"pbkdf2:sha256:{config['PASSWORD_PBKDF2_ITERATIONS']}"
+    raise ValueError(f'Unknown PASSWORD_HASH_METHOD: {method}')
+
+
+def hash_password(password):
+    config = current_app.config
+    if config['PASSWORD_HASH_METHOD'] == 'argon2':
+        return _argon2_hasher(config).hash(password)
+    return generate_password_hash(password, method=werkzeug_method(config))
+
+
+def verify_password(password_hash, password):
+    if not password_hash or password is None:
+        return False
+    if password_hash.startswith('$argon2'):
+        try:
+            return _argon2_hasher(current_app.config).verify(password_hash, password)
+        except (VerificationError, InvalidHashError):
+            return False
+    return check_password_hash(password_hash, password)
+
+
+def needs_rehash(password_hash):
+    """True if a stored hash was made with another algorithm or cost than configured"""
+    config = current_app.config
+    if config['PASSWORD_HASH_METHOD'] == 'argon2':
+        if not password_hash.startswith('$argon2'):
+            return True
+        return _argon2_hasher(config).check_needs_rehash(password_hash)
+    if password_hash.startswith('$argon2'):
+        return True
+    return password_hash.split('$', 1)[0] != werkzeug_method(config)
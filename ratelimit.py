@@ -0,0 +1,105 @@
+"""
+Token-bucket rate limiting, used to throttle login attempts.
+
+Each key (an IP address, an account) has a bucket holding up to `burst`
+tokens that refills at `rate` tokens per second. An attempt takes a token
+or is refused with the time until one is available. Logins are checked
+against per-IP and per-account buckets (auth.py) *before* the password hash is
+computed, so a credential-stuffing burst is refused in microseconds
+instead of occupying a worker for the length of a hash.
+
+Backends (RATELIMIT_BACKEND):
+    memory  - buckets in this process (default; each worker limits separately)
+    socket  - buckets kept by `flask cache-server` on CACHE_SOCKET_PATH,
+              shared by all workers; attempts are allowed if it is down
+    null    - no limiting
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from cache import SocketCache
+
+
+class TokenBuckets:
+    """Thread-safe token buckets by key, at most max_keys (least recently used go first)"""
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+        self.allowed = self.refused = 0
+
+    def take(self, key, rate, burst, cost=1):
+        """Take `cost` tokens from key's bucket; returns (allowed, retry_after_seconds)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+                self.allowed += 1
+            else:
+                self.refused += 1
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (cost - tokens) / rate
+
+    def reset(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._buckets.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            return {'keys': len(self._buckets), 'allowed': self.allowed, 'refused': self.refused}
+
+
+class SocketBuckets(SocketCache):
+    """Client for the buckets served by serve_cache(); fails open"""
+
+    def take(self, key, rate, burst, cost=1):
+        return tuple(self._call('take', key, rate, burst, cost, default=(True, 0.0)))
+
+    def reset(self, *keys):
+        self._call('reset', *keys)
+
+
+class NullBuckets:
+    """Backend that allows everything"""
+
+    def take(self, key, rate, burst, cost=1):
+        return True, 0.0
+
+    def reset(self, *keys):
+        pass
+
+
+class RateLimiter:
+    """Facade over the configured backend; safe to import before init_app()"""
+
+    def __init__(self):
+        self.backend = NullBuckets()
+
+    def init_app(self, app):
+        kind = app.config.get('RATELIMIT_BACKEND', 'memory')
+        if kind == 'memory':
+            self.backend = TokenBuckets()
+        elif kind == 'socket':
+            self.backend = SocketBuckets(app.config['CACHE_SOCKET_PATH'])
+        elif kind == 'null':
+            self.backend = NullBuckets()
+        else:
+            raise ValueError(f'Unknown RATELIMIT_BACKEND: {kind}')
+
+    def take(self, key, per_minute, burst, cost=1):
+        """(allowed, retry_after_seconds) for one attempt against key's bucket"""
+        return self.backend.take(key, per_minute / 60.0, burst, cost)
+
+    def reset(self, *keys):
+        self.backend.reset(*keys)
+
+
+limiter = RateLimiter()
@@ -0,0 +1,112 @@
+"""
+Template rendering: a shared Jinja bytecode cache and per-row fragment caching.
+
+Bytecode cache: compiled templates are written to TEMPLATE_CACHE_DIR, which
+every worker on the host shares, so a freshly booted worker loads bytecode
+instead of parsing and compiling each template on its first request. Jinja
+checks the source checksum on load, so an edited template is recompiled.
+
+Row fragments: list pages render their table rows with
+
+    {{ render_rows('guests/_row.html', guests, 'guest', depends='event.name') }}
+
+which renders each item through the row template once and caches the HTML
+under (row template, template version, id, updated_at[, depends value]).
+Any change to a row bumps its updated_at (counter updates included), so
+stale fragments are never looked up again and simply age out of the LRU;
+`depends` names an attribute shown in the row that lives on another table,
+such as the parent event's name. The template version is a hash of the row
+template's source, so a deploy that changes the markup starts a fresh set
+of keys even in a shared cache. A page fetches all of its fragments with
+one get_many() and stores the misses with one set_many().
+
+Backends (FRAGMENT_CACHE_BACKEND), sized separately from the route cache so
+a long page does not evict cached list pages:
+    memory  - in-process LRU of FRAGMENT_CACHE_MAX_ENTRIES rows (default)
+    socket  - the `flask cache-server` on CACHE_SOCKET_PATH, shared by all
+              workers (size it with CACHE_MAX_ENTRIES)
+    null    - render every row
+"""
+
+import hashlib
+import os
+from operator import attrgetter
+from flask import current_app
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup
+from cache import LRUCache, NullCache, SocketCache
+
+
+class FragmentCache:
+    """Facade over the configured fragment backend; safe to import before init_app()"""
+
+    def __init__(self):
+        self.backend = NullCache()
+
+    def init_app(self, app):
+        kind = app.config.get('FRAGMENT_CACHE_BACKEND', 'memory')
+        if kind == 'memory':
+            self.backend = LRUCache(app.config.get('FRAGMENT_CACHE_MAX_ENTRIES', 20000),
+                                    app.config.get('FRAGMENT_CACHE_TTL', 3600))
+        elif kind == 'socket':
+            self.backend = SocketCache(app.config['CACHE_SOCKET_PATH'])
+        elif kind == 'null':
+            self.backend = NullCache()
+        else:
+            raise ValueError(f'Unknown FRAGMENT_CACHE_BACKEND: {kind}')
+
+    def stats(self):
+        return self.backend.stats()
+
+
+fragments = FragmentCache()
+
+
+def _template_version(template):
+    """Short hash of a template's source, computed once per loaded template"""
+    version = getattr(template, 'fragment_version', None)
+    if version is None:
+        source, _, _ = template.environment.loader.get_source(template.environment, template.name)
+        version = template.fragment_version = hashlib.sha1(source.encode()).hexdigest()[:12]
+    return version
+
+
+def render_rows(template_name, items, name, depends=None):
+    """Rendered HTML of one row template per item, reusing cached fragments of unchanged rows"""
+    template = current_app.jinja_env.get_template(template_name)
+    prefix = f'row:{template_name}:{_template_version(template)}'
+    extra = attrgetter(depends) if depends else None
+
+    # Rows without an updated_at have no version to key on and are always rendered
+    keys = []
+    for item in items:
+        key = None
+        if item.updated_at is not None:
+            key = f'{prefix}:{item.id}:{item.updated_at.isoformat()}'
+            if extra:
+                key = f'{key}:{extra(item)}'
+        keys.append(key)
+    cached = fragments.backend.get_many([key for key in keys if key])
+
+    rendered, missing = [], {}
+    for key, item in zip(keys, items):
+        html = cached.get(key) if key else None
+        if html is None:
+            html = template.render({name: item})
+            if key:
+                missing[key] = html
+        rendered.append(html)
+    if missing:
+        fragments.backend.set_many(missing)
+    return Markup(''.join(rendered))
+
+
+def init_app(app):
+    """Install the bytecode cache and the render_rows() template global"""
+    cache_dir = app.config.get('TEMPLATE_CACHE_DIR')
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        # Must be set before app.jinja_env is first created
+        app.jinja_options = dict(app.jinja_options, bytecode_cache=FileSystemBytecodeCache(cache_dir))
+    fragments.init_app(app)
+    app.add_template_global(render_rows)
@@ -0,0 +1,123 @@
+"""
+Read/write splitting between the primary database and a read replica.
+
+With REPLICA_DATABASE_URL set, the replica is the 'replica' bind and
+RoutingSession (the session class of db.session) picks an engine per
+statement:
+
+  * GET/HEAD/OPTIONS requests read from the replica: plain SELECTs, and
+    textual SQL that starts with SELECT or WITH
+  * everything else goes to the primary: flushes, INSERT/UPDATE/DELETE,
+    SELECT ... FOR UPDATE, bare session.connection() calls, and every
+    statement of non-GET requests, CLI commands and workers
+  * once a request has written, the rest of it reads from the primary,
+    so it sees its own writes
+  * after a request that wrote, the client's session cookie pins it to
+    the primary for REPLICA_STICKY_SECONDS, so the page a form redirects
+    to shows the change even if the replica has not caught up yet.
+    Replication lag must stay below that window
+  * cache fills (cache.get_or_set) read from the primary: entries are
+    recomputed right after a write invalidated them, when the replica is
+    most likely to be behind, and would otherwise stay stale until expiry
+
+Without a replica every statement goes to the primary, as before.
+
+Trying it locally with two SQLite files, the replica refreshed through
+SQLite's online backup API:
+
+    export DATABASE_URL=sqlite:////tmp/primary.db REPLICA_DATABASE_URL=sqlite:////tmp/replica.db
+    flask db upgrade
+    flask replica-sync --interval 1 &      # "replication" with up to ~1s of lag
+    flask run
+"""
+
+import contextlib
+import sqlite3
+import time
+from flask import request, session as cookie_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import TextClause
+from sqlalchemy.engine import make_url
+
+REPLICA_BIND = 'replica'
+READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+STICKY_KEY = 'db_primary_until'
+_READ_PREFIXES = ('SELECT', 'WITH')
+
+
+def is_read(clause):
+    """True for statements that are safe to run on a replica"""
+    if isinstance(clause, TextClause):
+        return clause.text.lstrip().upper().startswith(_READ_PREFIXES)
+    return getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+
+
+class RoutingSession(Session):
+    """Session that sends reads to the replica while session.info['use_replica'] is set"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if (bind is None and self.info.get('use_replica') and not self._flushing
+                and clause is not None and is_read(clause)):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        if self._flushing or (clause is not None and getattr(clause, 'is_dml', False)):
+            self.info['wrote'] = True
+            self.info.pop('use_replica', None)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@contextlib.contextmanager
+def use_primary():
+    """Route the current session's reads to the primary inside the block"""
+    from models import db
+    info = db.session.info
+    previous = info.pop('use_replica', None)
+    try:
+        yield
+    finally:
+        if previous and not info.get('wrote'):
+            info['use_replica'] = previous
+
+
+def replica_configured(app):
+    return REPLICA_BIND in app.config.get('SQLALCHEMY_BINDS', {})
+
+
+def init_app(app, db):
+    """Route each request's reads to the replica when one is configured"""
+    if not replica_configured(app):
+        return
+
+    @app.before_request
+    def _choose_database():
+        if request.method in READ_METHODS and cookie_session.get(STICKY_KEY, 0) < time.time():
+            db.session.info['use_replica'] = True
+
+    @app.after_request
+    def _stick_to_primary(response):
+        if db.session.info.get('wrote'):
+            cookie_session[STICKY_KEY] = time.time() + app.config['REPLICA_STICKY_SECONDS']
+        return response
+
+
+# ---- Local replica for development (flask replica-sync) ----
+
+def sqlite_path(uri):
+    url = make_url(uri)
+    if url.get_backend_name() != 'sqlite' or not url.database or url.database == ':memory:':
+        return None
+    return url.database
+
+
+def sync_sqlite_replica(primary_path, replica_path, timeout=5.0):
+    """Copy the primary file onto the replica with the online backup API; returns seconds taken"""
+    started = time.perf_counter()
+    source = sqlite3.connect(primary_path, timeout=timeout)
+    target = sqlite3.connect(replica_path, timeout=timeout)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+    return time.perf_counter() - started
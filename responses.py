@@ -0,0 +1,78 @@
+"""
+Conditional GET and compression for dynamic responses.
+
+HTML pages get a weak ETag (a hash of the rendered body) and
+`Cache-Control: private, no-cache`, so browsers revalidate every page and a
+page that has not changed since the last visit costs a 304 with no body.
+Pages carry no Last-Modified: they embed per-session content (the signed-in
+user, flash messages) that has no modification time, and the ETag already
+covers revalidation. Static files get both validators from send_file().
+
+Bodies of compressible types (HTML, JSON, CSS, JS, CSV, ...) of at least
+COMPRESS_MIN_SIZE bytes are then compressed: brotli when the client accepts
+it and the brotli package is installed, gzip otherwise. Streamed responses
+(exports) and files are left alone; exports compress themselves with
+?gzip=1, and built assets are precompressed (see assets.py).
+
+Validators are computed before compression, so one ETag serves every
+encoding of a response. An ETag names specific bytes only while it is
+strong, so compressing a response weakens any strong ETag it carries;
+pages and the API (api.py) set weak ones to begin with.
+"""
+
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+COMPRESSIBLE = {'text/html', 'text/css', 'text/plain', 'text/csv', 'text/javascript',
+                'application/javascript', 'application/json', 'application/x-ndjson',
+                'image/svg+xml'}
+
+
+def _add_validators(response):
+    if request.method not in ('GET', 'HEAD') or response.status_code != 200:
+        return response
+    if response.mimetype != 'text/html' or response.is_streamed or response.direct_passthrough:
+        return response
+    if not response.cache_control.no_store:
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
+
+
+def _compress(response, config):
+    if (response.status_code < 200 or response.status_code in (204, 206, 304)
+            or response.is_streamed or response.direct_passthrough
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE):
+        return response
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < config['COMPRESS_MIN_SIZE']:
+        return response
+    if brotli is not None and request.accept_encodings['br']:
+        response.set_data(brotli.compress(data, quality=config['COMPRESS_BROTLI_QUALITY']))
+        response.content_encoding = 'br'
+    elif request.accept_encodings['gzip']:
+        response.set_data(gzip.compress(data, compresslevel=config['COMPRESS_LEVEL']))
+        response.content_encoding = 'gzip'
+    else:
+        return response
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_app(app):
+    @app.after_request
+    def _finish_response(response):
+        response = _add_validators(response)
+        if app.config['COMPRESS_RESPONSES']:
+            response = _compress(response, app.config)
+        return response
@@ -0,0 +1,129 @@
+"""
+Schema migrations and index checks.
+
+Migrations live in migrations/ (Alembic) and run against the app's database:
+
+    flask db upgrade [rev]          apply pending migrations; creates a new database
+    flask db downgrade <rev>        step back to an earlier revision
+    flask db current | history      show where the database is
+    flask db stamp <rev>            record a revision without running it
+    flask db revision -m "..." [--autogenerate]
+
+ACCESS_PATHS lists the hot queries that the indexes exist for, each with
+the index it must use. `flask explain-indexes` EXPLAINs every one (EXPLAIN
+QUERY PLAN on SQLite, EXPLAIN on MySQL) and fails if a query scans its
+whole table or does not use its index. Run it against a seeded database:
+with a handful of rows MySQL prefers full scans regardless of indexes.
+tests/test_access_paths.py runs the same check on SQLite against the test
+suite's migrated database.
+
+Alembic is imported only when a migration command runs, so it adds nothing
+to app startup.
+"""
+
+import os
+from datetime import date, datetime
+from sqlalchemy import and_, func, or_, select, text
+from models import db, User, Event, Guest, Booking
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+
+# ---- Migrations ----
+
+def alembic_config():
+    from alembic.config import Config as AlembicConfig
+    config = AlembicConfig(os.path.join(MIGRATIONS_DIR, 'alembic.ini'))
+    config.set_main_option('script_location', MIGRATIONS_DIR)
+    return config
+
+
+def upgrade(revision='head'):
+    """Migrate the current app's database up to revision"""
+    from alembic import command
+    command.upgrade(alembic_config(), revision)
+
+
+# ---- Access paths ----
+
+class AccessPath:
+    """A hot query and the index that should serve it (None: any index, no full scan)"""
+
+    def __init__(self, name, table, index, statement):
+        self.name = name
+        self.table = table
+        self.index = index
+        self.statement = statement
+
+
+def _keyset_page(model, key):
+    """Second page of a newest-first list, as paginate_keyset() reads it"""
+    cursor_key, cursor_id = datetime(2025, 1, 1), 1000
+    return (select(model.id).where(or_(key < cursor_key, and_(key == cursor_key, model.id < cursor_id)))
+            .order_by(key.desc(), model.id.desc()).limit(51))
+
+
+ACCESS_PATHS = [
+    AccessPath('events list page', 'events', 'ix_events_date_id',
+               lambda: select(Event.id).where(or_(Event.event_date < date(2025, 1, 1),
+                                                  and_(Event.event_date == date(2025, 1, 1), Event.id < 1000)))
+               .order_by(Event.event_date.desc(), Event.id.desc()).limit(51)),
+    AccessPath('soft-deleted events', 'events', 'ix_events_deleted_at',
+               lambda: select(Event.__table__.c.id).where(Event.__table__.c.deleted_at.is_not(None))),
+    AccessPath('guests list page', 'guests', 'ix_guests_created_id',
+               lambda: _keyset_page(Guest, Guest.created_at)),
+    AccessPath('guests by event and RSVP', 'guests', 'ix_guests_event_rsvp',
+               lambda: select(Guest.id).where(Guest.event_id == 1, Guest.rsvp_status == 'Accepted')),
+    AccessPath('event headcount', 'guests', 'ix_guests_event_guest_count',
+               lambda: select(func.sum(Guest.guest_count)).where(Guest.event_id == 1)),
+    AccessPath('bookings list page', 'bookings', 'ix_bookings_created_id',
+               lambda: _keyset_page(Booking, Booking.created_at)),
+    AccessPath('bookings by event and status', 'bookings', 'ix_bookings_event_status_cost',
+               lambda: select(Booking.id).where(Booking.event_id == 1, Booking.status == 'Confirmed')),
+    AccessPath('event spend by status', 'bookings', 'ix_bookings_event_status_cost',
+               lambda: select(Booking.status, func.sum(Booking.cost))
+               .where(Booking.event_id == 1).group_by(Booking.status)),
+    AccessPath('login lookup', 'users', None,
+               lambda: select(User.id).where(or_(User.username == 'bench', User.email == 'bench'))),
+]
+
+
+def explain(statement):
+    """Plan lines for a statement on the current database"""
+    connection = db.session.connection()
+    sql = str(statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True}))
+    if connection.dialect.name == 'sqlite':
+        return [row[-1] for row in connection.execute(text(f'EXPLAIN QUERY PLAN {sql}'))]
+    rows = connection.execute(text(f'EXPLAIN {sql}')).mappings().all()
+    return [f"{row['table']}: type={row['type']} key={row['key']} rows={row['rows']} {row['Extra'] or ''}"
+            for row in rows]
+
+
+def plan_problem(path, plan):
+    """Why a plan does not serve its access path, or None"""
+    if db.session.get_bind().dialect.name == 'sqlite':
+        if any(line == f'SCAN {path.table}' for line in plan):
+            return f'full scan of {path.table}'
+        if path.index and not any(f'INDEX {path.index}' in line for line in plan):
+            return f'{path.index} not used'
+        return None
+    if any(line.startswith(f'{path.table}: type=ALL') for line in plan):
+        return f'full scan of {path.table}'
+    if path.index and not any(path.index in line.split('key=', 1)[-1].split(' ')[0].split(',')
+                              for line in plan if line.startswith(f'{path.table}:')):
+        return f'{path.index} not used'
+    return None
+
+
+def check_access_paths():
+    """Print the plan of every access path; returns the (name, problem) failures"""
+    failures = []
+    for path in ACCESS_PATHS:
+        plan = explain(path.statement())
+        problem = plan_problem(path, plan)
+        print(f"{path.name}: {'FAIL - ' + problem if problem else 'ok'}")
+        for line in plan:
+            print(f'    {line}')
+        if problem:
+            failures.append((path.name, problem))
+    return failures
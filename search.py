@@ -0,0 +1,162 @@
+"""
+Full-text search over events, guests and bookings.
+
+SQLite: one external-content FTS5 table per searched table (events_fts,
+guests_fts, bookings_fts). Triggers keep it in step with inserts, deletes
+and updates of the indexed columns, so counter updates on events never touch
+it. The unicode61 tokenizer splits emails and phone numbers into words, and
+prefix indexes make "typed so far" queries (sh -> "sh"*) index lookups.
+Results are ranked with bm25(), with the name column weighted highest.
+
+MySQL: a FULLTEXT index per table, queried with MATCH ... AGAINST in boolean
+mode (+term* for each word) and ordered by relevance. InnoDB ignores words
+shorter than innodb_ft_min_token_size (3 by default).
+
+The indexes are created together with their tables. `flask search-rebuild`
+adds them to an existing database and repopulates them.
+"""
+
+import re
+from markupsafe import Markup, escape
+from sqlalchemy import DDL, event, func, literal_column, select, text, table, column
+from sqlalchemy.dialects.mysql import match
+from models import db, Event, Guest, Booking
+from deletion import join_live_event
+
+SNIPPET_START, SNIPPET_END = '\x02', '\x03'
+MAX_TERMS = 8
+
+
+class SearchIndex:
+    """Searchable columns, ranking weights and result columns for one table"""
+
+    def __init__(self, model, columns, weights, results, link):
+        self.model = model
+        self.table = model.__tablename__
+        self.fts = f'{self.table}_fts'
+        self.columns = columns
+        self.weights = weights
+        self.results = results
+        self.link = link
+
+    def sqlite_ddl(self):
+        cols = ', '.join(self.columns)
+        new = ', '.join(f'new.{c}' for c in self.columns)
+        old = ', '.join(f'old.{c}' for c in self.columns)
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {self.fts} USING fts5({cols}, content='{self.table}', "
+            f"content_rowid='id', tokenize='unicode61 remove_diacritics 2', prefix='2 3 4')",
+            f"CREATE TRIGGER IF NOT EXISTS {self.fts}_ai AFTER INSERT ON {self.table} BEGIN "
+            f"INSERT INTO {self.fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.fts}_ad AFTER DELETE ON {self.table} BEGIN "
+            f"INSERT INTO {self.fts}({self.fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {self.fts}_au AFTER UPDATE OF {cols} ON {self.table} BEGIN "
+            f"INSERT INTO {self.fts}({self.fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); "
+            f"INSERT INTO {self.fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        ]
+
+    def mysql_ddl(self):
+        return [f"CREATE FULLTEXT INDEX ft_{self.table} ON {self.table} ({', '.join(self.columns)})"]
+
+
+SEARCH_INDEXES = {
+    'events': SearchIndex(
+        Event, ('name', 'description', 'location'), (10.0, 1.0, 3.0),
+        lambda: [Event.id, Event.name, Event.event_date, Event.location, Event.status],
+        'events.event_detail'
+    ),
+    'guests': SearchIndex(
+        Guest, ('name', 'email', 'phone'), (10.0, 5.0, 5.0),
+        lambda: [Guest.id, Guest.name, Guest.email, Guest.phone, Guest.rsvp_status,
+                 Event.name.label('event_name')],
+        'guests.guest_edit'
+    ),
+    'bookings': SearchIndex(
+        Booking, ('vendor_name', 'description', 'notes'), (10.0, 2.0, 1.0),
+        lambda: [Booking.id, Booking.vendor_name, Booking.booking_type, Booking.status,
+                 Event.name.label('event_name')],
+        'bookings.booking_edit'
+    ),
+}
+
+
+# ---- Index DDL ----
+
+for _index in SEARCH_INDEXES.values():
+    for _statement in _index.sqlite_ddl():
+        event.listen(_index.model.__table__, 'after_create', DDL(_statement).execute_if(dialect='sqlite'))
+    for _statement in _index.mysql_ddl():
+        event.listen(_index.model.__table__, 'after_create', DDL(_statement).execute_if(dialect='mysql'))
+
+
+def _mysql_index_exists(connection, index):
+    return connection.execute(text(
+        'SELECT 1 FROM information_schema.statistics '
+        'WHERE table_schema = DATABASE() AND table_name = :table AND index_name = :name LIMIT 1'
+    ), {'table': index.table, 'name': f'ft_{index.table}'}).first() is not None
+
+
+def rebuild_search_index():
+    """Create any missing search indexes and repopulate them from the base tables"""
+    connection = db.session.connection()
+    dialect = connection.dialect.name
+    for index in SEARCH_INDEXES.values():
+        if dialect == 'sqlite':
+            for statement in index.sqlite_ddl():
+                connection.execute(text(statement))
+            connection.execute(text(f"INSERT INTO {index.fts}({index.fts}) VALUES ('rebuild')"))
+        elif dialect == 'mysql' and not _mysql_index_exists(connection, index):
+            for statement in index.mysql_ddl():
+                connection.execute(text(statement))
+    db.session.commit()
+
+
+# ---- Queries ----
+
+def query_terms(q):
+    """Lower-cased word tokens of a user query, at most MAX_TERMS"""
+    return re.findall(r'\w+', (q or '').lower())[:MAX_TERMS]
+
+
+def _sqlite_query(index, terms):
+    fts = table(index.fts, column('rowid'))
+    fts_ref = literal_column(index.fts)
+    score = func.bm25(fts_ref, *index.weights).label('score')
+    snippet = func.snippet(fts_ref, -1, SNIPPET_START, SNIPPET_END, '…', 10).label('snippet')
+    expression = ' '.join(f'"{term}"*' for term in terms)
+    return (select(*index.results(), score, snippet)
+            .select_from(fts)
+            .join(index.model, index.model.id == fts.c.rowid)
+            .where(fts_ref.op('MATCH')(expression))
+            .order_by(score, index.model.id))
+
+
+def _mysql_query(index, terms):
+    relevance = match(*[getattr(index.model, c) for c in index.columns],
+                      against=' '.join(f'+{term}*' for term in terms)).in_boolean_mode()
+    return (select(*index.results(), relevance.label('score'), literal_column('NULL').label('snippet'))
+            .select_from(index.model)
+            .where(relevance)
+            .order_by(relevance.desc(), index.model.id))
+
+
+def search(kind, q, limit=20, offset=0):
+    """Ranked rows of one kind matching q; returns (rows, has_more)"""
+    terms = query_terms(q)
+    if not terms:
+        return [], False
+    index = SEARCH_INDEXES[kind]
+    dialect = db.session.get_bind().dialect.name
+    stmt = _sqlite_query(index, terms) if dialect == 'sqlite' else _mysql_query(index, terms)
+    if index.model is not Event:
+        stmt = join_live_event(stmt, index.model)
+    rows = db.session.execute(stmt.limit(limit + 1).offset(offset)).all()
+    return rows[:limit], len(rows) > limit
+
+
+def highlight(snippet):
+    """Render an FTS5 snippet with matches wrapped in <mark>, escaping everything else"""
+    if not snippet:
+        return ''
+    html = str(escape(snippet))
+    return Markup(html.replace(SNIPPET_START, '<mark>').replace(SNIPPET_END, '</mark>'))
@@ -3,8 +3,9 @@ SQLite Database setup script for Event Management System
 This script creates the database and tables using SQLite (no MySQL needed)
 """
 
-from app import app, db
-from models import Event, Guest, Booking
+from app import create_app
+from schema import upgrade
+from models import db, Event, Guest, Booking
 from datetime import datetime, date, time
 
 def setup_sqlite_database():
@@ -14,10 +15,11 @@ def setup_sqlite_database():
         print("Setting up SQLite Database...")
         print("="*50)
         
+        app = create_app()
         with app.app_context():
-            # Create all tables
+            # Create all tables (runs the migrations)
             print("\nCreating database tables...")
-            db.create_all()
+            upgrade()
             print("✓ Tables created successfully!")
             
             # Check if data already exists
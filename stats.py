@@ -0,0 +1,77 @@
+"""
+Dashboard statistics service.
+
+Computes every dashboard figure with two aggregate queries instead of one
+round trip per number, so the HTML dashboard and the JSON endpoint share
+the same (cheap) code path.
+"""
+
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from sqlalchemy import func, case, select
+from models import db, Event, Guest
+from deletion import join_live_event
+
+
+@dataclass
+class DashboardStats:
+    """All figures shown on the dashboard"""
+    total_events: int = 0
+    upcoming_events: int = 0
+    total_guests: int = 0
+    total_bookings: int = 0
+    total_budget: float = 0.0
+    rsvp_accepted: int = 0
+    rsvp_pending: int = 0
+    rsvp_declined: int = 0
+
+    @property
+    def rsvp_stats(self):
+        return {
+            'accepted': self.rsvp_accepted,
+            'pending': self.rsvp_pending,
+            'declined': self.rsvp_declined
+        }
+
+    def to_dict(self):
+        data = asdict(self)
+        data['rsvp_stats'] = self.rsvp_stats
+        return data
+
+
+def dashboard_queries(today=None):
+    """The two aggregate SELECTs behind the dashboard"""
+    today = today or datetime.now().date()
+
+    # Query 1: event aggregates; the booking total comes from the per-event counters
+    event_totals = select(
+        func.count(Event.id),
+        func.coalesce(func.sum(case((Event.event_date >= today, 1), else_=0)), 0),
+        func.coalesce(func.sum(Event.budget), 0),
+        func.coalesce(func.sum(Event.booking_count), 0)
+    )
+
+    # Query 2: guest totals grouped by RSVP status, read event by event from ix_guests_event_rsvp
+    rsvp_totals = join_live_event(select(Guest.rsvp_status, func.count(Guest.id)), Guest).group_by(Guest.rsvp_status)
+    return event_totals, rsvp_totals
+
+
+def build_dashboard_stats(event_row, rsvp_counts):
+    """DashboardStats from the results of dashboard_queries()"""
+    return DashboardStats(
+        total_events=event_row[0],
+        upcoming_events=int(event_row[1]),
+        total_guests=sum(rsvp_counts.values()),
+        total_bookings=int(event_row[3]),
+        total_budget=float(event_row[2]),
+        rsvp_accepted=rsvp_counts.get('Accepted', 0),
+        rsvp_pending=rsvp_counts.get('Pending', 0),
+        rsvp_declined=rsvp_counts.get('Declined', 0)
+    )
+
+
+def get_dashboard_stats(today=None):
+    """Compute dashboard statistics in two queries"""
+    event_totals, rsvp_totals = dashboard_queries(today)
+    return build_dashboard_stats(db.session.execute(event_totals).one(),
+                                 dict(db.session.execute(rsvp_totals).all()))
@@ -0,0 +1,69 @@
+"""
+Shared fixtures: the app on a small migrated SQLite database.
+
+The database is created once per test session in a temporary directory by
+running the migrations (as `flask db upgrade` does) and seeding a few
+events with guests and bookings through the ORM, so the counters, rollups
+and search/spatial indexes are maintained as in production. Caches are
+off so every request takes the database path.
+"""
+
+import os
+import tempfile
+from datetime import date, time
+
+import pytest
+
+_DB_DIR = tempfile.mkdtemp(prefix='nexus-event-tests-')
+# Before config is imported: it reads the environment once, at import
+os.environ['DATABASE_URL'] = f'sqlite:///{os.path.join(_DB_DIR, "test.db")}'
+os.environ['CACHE_BACKEND'] = 'null'
+os.environ['FRAGMENT_CACHE_BACKEND'] = 'null'
+os.environ['RATELIMIT_BACKEND'] = 'null'
+os.environ['TEMPLATE_CACHE_DIR'] = ''
+
+EVENTS = [
+    ('Delhi Tech Conference event', date(2025, 11, 15), 'Convention Center, Delhi', 28.61, 77.21),
+    ('Mumbai Gala Dinner event', date(2025, 12, 20), 'Grand Hotel, Mumbai', 19.08, 72.88),
+    ('Pune Workshop event', date(2026, 1, 10), 'Lakeside Resort, Pune', 18.52, 73.86),
+]
+
+
+def seed(db):
+    from models import User, Event, Guest, Booking
+    user = User(username='tester', email='tester@gmail.com', full_name='Test User')
+    user.set_password('tester')
+    db.session.add(user)
+    for name, event_date, location, lat, lon in EVENTS:
+        event = Event(name=name, event_date=event_date, event_time=time(10, 0), location=location,
+                      latitude=lat, longitude=lon, venue_capacity=100, budget=100000, status='Planning')
+        db.session.add(event)
+        db.session.flush()
+        for i in range(5):
+            db.session.add(Guest(event_id=event.id, name=f'Guest {event.id}-{i}',
+                                 email=f'guest{event.id}{i}@gmail.com', phone=f'98765{event.id}{i:04d}',
+                                 rsvp_status='Accepted' if i % 2 else 'Pending', guest_count=1 + i % 3))
+        for booking_type in ('Venue', 'Catering'):
+            db.session.add(Booking(event_id=event.id, booking_type=booking_type, vendor_name=f'{booking_type} Co',
+                                   description=f'{booking_type} services', cost=25000, status='Confirmed',
+                                   booking_date=event_date))
+    db.session.commit()
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app
+    from models import db
+    from schema import upgrade
+    app = create_app('testing')
+    with app.app_context():
+        upgrade()
+        seed(db)
+        db.session.remove()
+    return app
+
+
+@pytest.fixture
+def app_context(app):
+    with app.app_context():
+        yield app
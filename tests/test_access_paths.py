@@ -0,0 +1,10 @@
+"""Every hot query's plan uses its index (as `flask explain-indexes`)"""
+
+import pytest
+from schema import ACCESS_PATHS, explain, plan_problem
+
+
+@pytest.mark.parametrize('path', ACCESS_PATHS, ids=lambda path: path.name)
+def test_plan_uses_index(app_context, path):
+    plan = explain(path.statement())
+    assert plan_problem(path, plan) is None, '\n'.join(plan)
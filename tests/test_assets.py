@@ -0,0 +1,37 @@
+"""Vendored assets are self-hosted and checked, never a hard dependency on the CDN"""
+
+import hashlib
+import os
+
+import assets
+
+
+def test_pages_render_without_the_cdn(app):
+    response = app.test_client().get('/login')
+    assert response.status_code == 200
+    assert b'cdn.jsdelivr.net' not in response.data
+    assert b'/static/vendor/bootstrap/bootstrap.min.css' in response.data
+
+
+def _write(static_folder, path, data):
+    target = os.path.join(static_folder, path)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    with open(target, 'wb') as f:
+        f.write(data)
+
+
+def test_check_reports_missing_and_modified_files(tmp_path):
+    static_folder = str(tmp_path)
+    assert assets.check_vendor_assets(static_folder) == [f'{path}: missing' for path in assets.VENDOR_ASSETS]
+
+    sums = []
+    for path in assets.VENDOR_ASSETS:
+        data = path.encode()
+        _write(static_folder, path, data)
+        sums.append(f'{hashlib.sha256(data).hexdigest()}  {path}\n')
+    _write(static_folder, assets.VENDOR_CHECKSUMS, ''.join(sums).encode())
+    assert assets.check_vendor_assets(static_folder) == []
+
+    modified = next(iter(assets.VENDOR_ASSETS))
+    _write(static_folder, modified, b'tampered')
+    assert assets.check_vendor_assets(static_folder) == [f'{modified}: checksum mismatch']
@@ -0,0 +1,44 @@
+"""Cache invalidation on commit"""
+
+from cache import Cache, LRUCache
+
+
+def test_value_computed_before_a_commit_is_not_served_after_it():
+    cache = Cache()
+    cache.backend = LRUCache()
+    # A reader misses and computes from the state before the write commits...
+    stale_key = cache.event_key('event_detail', 1)
+    # ...the write commits and invalidates the event...
+    cache.invalidate_events({1})
+    # ...and the reader stores its stale value afterwards
+    cache.backend.set(stale_key, 'stale')
+    assert cache.get_or_set(cache.event_key('event_detail', 1), lambda: 'fresh') == 'fresh'
+
+
+def test_invalidation_is_per_event():
+    cache = Cache()
+    cache.backend = LRUCache()
+    cache.get_or_set(cache.event_key('event_detail', 1), lambda: 'one')
+    cache.get_or_set(cache.event_key('event_detail', 2), lambda: 'two')
+    cache.invalidate_events({1})
+    assert cache.get_or_set(cache.event_key('event_detail', 1), lambda: 'one again') == 'one again'
+    assert cache.get_or_set(cache.event_key('event_detail', 2), lambda: 'recomputed') == 'two'
+
+
+def test_event_page_shows_a_committed_rename(app, monkeypatch):
+    import cache as cache_module
+    from models import db, Event
+    monkeypatch.setattr(cache_module.cache, 'backend', LRUCache())
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 0
+    assert b'Delhi Tech Conference' in client.get('/events/1').data
+    with app.app_context():
+        db.session.get(Event, 1).name = 'Renamed Conference'
+        db.session.commit()
+    try:
+        assert b'Renamed Conference' in client.get('/events/1').data
+    finally:
+        with app.app_context():
+            db.session.get(Event, 1).name = 'Delhi Tech Conference event'
+            db.session.commit()
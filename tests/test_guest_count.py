@@ -0,0 +1,33 @@
+"""guest_count must be at least 1 on every path that writes it"""
+
+import pytest
+from bulk import BulkUpdateError, parse_patch
+from guest_import import RowError, parse_guest
+from models import Guest
+
+
+@pytest.mark.parametrize('value', ['0', '-2'])
+def test_import_rejects_seatless_guests(value):
+    with pytest.raises(RowError):
+        parse_guest({'event_id': '1', 'name': 'Asha', 'guest_count': value})
+
+
+def test_import_defaults_to_one_seat():
+    assert parse_guest({'event_id': '1', 'name': 'Asha'})['guest_count'] == 1
+
+
+@pytest.mark.parametrize('value', [0, -2, True, '2'])
+def test_bulk_update_rejects_invalid_counts(value):
+    with pytest.raises(BulkUpdateError):
+        parse_patch(Guest, {'guest_count': value})
+
+
+def test_form_rejects_zero(app):
+    from models import db
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 0
+    response = client.post('/guests/create', data={'event_id': '2', 'name': 'Zero Seats', 'guest_count': '0'})
+    assert b'Guest count must be at least 1' in response.data
+    with app.app_context():
+        assert db.session.query(Guest.id).filter_by(name='Zero Seats').first() is None
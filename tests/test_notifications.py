@@ -0,0 +1,50 @@
+"""Outbox delivery"""
+
+from datetime import datetime
+from models import db, Event, Guest, OutboxMessage
+from notifications import drain_once, enqueue_invitations
+
+
+class RecordingTransport:
+    def __init__(self):
+        self.sent = []
+
+    def send_batch(self, messages):
+        self.sent.extend(message.guest_id for message in messages)
+        return {message.id: None for message in messages}
+
+
+def _drain(app):
+    transport = RecordingTransport()
+    while drain_once(app, {'email': transport, 'sms': transport}):
+        pass
+    return transport.sent
+
+
+def _statuses(guest_ids):
+    return dict(db.session.execute(
+        db.select(OutboxMessage.guest_id, OutboxMessage.status).where(OutboxMessage.guest_id.in_(guest_ids))).all())
+
+
+def test_invitations_for_deleted_guests_are_not_sent(app_context):
+    guest_ids = db.session.scalars(db.select(Guest.id).where(Guest.event_id == 3).order_by(Guest.id)).all()
+    enqueue_invitations(db.session, 3)
+    db.session.delete(db.session.get(Guest, guest_ids[0]))
+    db.session.commit()
+
+    sent = _drain(app_context)
+    assert guest_ids[0] not in sent and set(sent) == set(guest_ids[1:])
+    assert _statuses(guest_ids)[guest_ids[0]] == 'failed'
+
+
+def test_invitations_for_soft_deleted_events_are_not_sent(app_context):
+    guest_ids = db.session.scalars(db.select(Guest.id).where(Guest.event_id == 2)).all()
+    enqueue_invitations(db.session, 2)
+    db.session.get(Event, 2).deleted_at = datetime.utcnow()
+    db.session.commit()
+    try:
+        assert _drain(app_context) == []
+        assert set(_statuses(guest_ids).values()) == {'failed'}
+    finally:
+        db.session.execute(db.update(Event).where(Event.id == 2).values(deleted_at=None))
+        db.session.commit()
@@ -0,0 +1,28 @@
+"""Guest verification codes"""
+
+from models import db, Guest
+from otp import claim_attempt, issue_otp, verify_otp
+
+
+def test_attempts_are_claimed_in_the_database(app_context):
+    guest = db.session.get(Guest, 1)
+    code = issue_otp(guest)
+    db.session.commit()
+    limit = app_context.config['OTP_MAX_ATTEMPTS']
+    for _ in range(limit):
+        assert claim_attempt(db.session, guest.id)
+    assert not claim_attempt(db.session, guest.id)
+    # Once the attempts are used up even the right code is refused
+    assert not verify_otp(guest, code)
+    db.session.rollback()
+
+
+def test_correct_code_verifies_once(app_context):
+    guest = db.session.get(Guest, 2)
+    code = issue_otp(guest)
+    db.session.commit()
+    assert not verify_otp(guest, 'nope')
+    assert verify_otp(guest, code)
+    db.session.commit()
+    assert not verify_otp(guest, code)
+    db.session.rollback()
@@ -0,0 +1,16 @@
+"""Every budgeted route stays within its QUERY_BUDGETS entry (as `flask check-query-budgets`)"""
+
+from commands import budget_sample_args
+from db_metrics import check_query_budgets
+
+
+def test_routes_within_query_budget(app_context):
+    failures = check_query_budgets(app_context, budget_sample_args())
+    assert failures == [], f'(endpoint, queries, budget, status): {failures}'
+
+
+def test_over_budget_route_fails(app_context, monkeypatch):
+    budgets = dict(app_context.config['QUERY_BUDGETS'], **{'guests.guests_list': 0})
+    monkeypatch.setitem(app_context.config, 'QUERY_BUDGETS', budgets)
+    failures = check_query_budgets(app_context, budget_sample_args())
+    assert [endpoint for endpoint, *_ in failures] == ['guests.guests_list']
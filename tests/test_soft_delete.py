@@ -0,0 +1,66 @@
+"""Soft-deleted events hide their guests and bookings from reads and bulk writes"""
+
+from contextlib import contextmanager
+from datetime import datetime
+
+from sqlalchemy import func, select
+
+from bulk import bulk_update
+from conftest import EVENTS
+from exports import export_query
+from models import db, Event, Guest, Booking
+from search import search
+from stats import get_dashboard_stats
+
+EVENT_NAMES = [name for name, *_ in EVENTS]
+
+
+@contextmanager
+def soft_deleted(event_id):
+    db.session.get(Event, event_id).deleted_at = datetime.utcnow()
+    db.session.commit()
+    try:
+        yield
+    finally:
+        db.session.execute(db.update(Event).where(Event.id == event_id).values(deleted_at=None))
+        db.session.commit()
+
+
+def test_children_of_soft_deleted_events_are_hidden(app_context):
+    with soft_deleted(2):
+        assert db.session.scalars(select(Guest.event_id).distinct()).all() != []
+        assert 2 not in db.session.scalars(select(Guest.event_id).distinct()).all()
+        assert 2 not in db.session.scalars(select(Booking.event_id).distinct()).all()
+        assert db.session.scalar(select(func.count(Guest.id)).where(Guest.event_id == 2),
+                                 execution_options={'include_deleted': True}) == 5
+
+
+def test_bulk_update_skips_guests_of_soft_deleted_events(app_context):
+    guests = db.session.execute(select(Guest.id, Guest.guest_count).where(Guest.event_id.in_([1, 2]))).all()
+    headcounts = dict(db.session.execute(select(Event.id, Event.headcount).where(Event.id.in_([1, 2]))).all())
+    ids = [guest_id for guest_id, _ in guests]
+    try:
+        with soft_deleted(2):
+            assert bulk_update(Guest, ids, {'guest_count': 1}) == 5
+        counts = dict(db.session.execute(select(Guest.event_id, func.sum(Guest.guest_count))
+                                         .where(Guest.id.in_(ids)).group_by(Guest.event_id)).all())
+        assert counts == {1: 5, 2: headcounts[2]}
+        assert db.session.get(Event, 2).headcount == headcounts[2]
+        assert db.session.get(Event, 1).headcount == 5
+    finally:
+        for guest_id, guest_count in guests:
+            db.session.execute(db.update(Guest).where(Guest.id == guest_id).values(guest_count=guest_count))
+        db.session.execute(db.update(Event).where(Event.id == 1).values(headcount=headcounts[1]))
+        db.session.commit()
+
+
+def test_search_and_exports_skip_soft_deleted_events(app_context):
+    with soft_deleted(2):
+        assert {row.event_name for row in search('guests', 'guest')[0]} == {EVENT_NAMES[0], EVENT_NAMES[2]}
+        assert {row.event_name for row in db.session.execute(export_query('bookings'))} == {EVENT_NAMES[0], EVENT_NAMES[2]}
+
+
+def test_dashboard_counts_skip_soft_deleted_events(app_context):
+    live_guests = db.session.scalar(select(func.count(Guest.id)).where(Guest.event_id != 2))
+    with soft_deleted(2):
+        assert get_dashboard_stats().total_guests == live_guests
@@ -0,0 +1,30 @@
+"""
+Field validation shared by the web forms, bulk import and bulk updates.
+
+Patterns are compiled once at import time; bulk import calls these for
+every row.
+"""
+
+import re
+
+GMAIL_PATTERN = re.compile(r'^[a-zA-Z0-9._%+-]+@gmail\.com$')
+PHONE_PATTERN = re.compile(r'^[0-9]{10}$')
+
+
+def validate_gmail(email):
+    """Validate that email is a Gmail address"""
+    if not email:
+        return True  # Allow empty email
+    return GMAIL_PATTERN.match(email) is not None
+
+
+def validate_phone(phone):
+    """Validate that phone is exactly 10 digits"""
+    if not phone:
+        return True  # Allow empty phone
+    return PHONE_PATTERN.match(phone) is not None
+
+
+def validate_guest_count(guest_count):
+    """Validate that guest_count is a whole number of seats, at least 1"""
+    return isinstance(guest_count, int) and not isinstance(guest_count, bool) and guest_count >= 1